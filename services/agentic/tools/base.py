@@ -1,6 +1,100 @@
+import asyncio
+import functools
+import inspect
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from haystack.tools import Tool
+from business.domain.supabase.connection import in_shared_snapshot
+from contracts.arrow_ipc import rows_to_ipc
+from contracts.serialization import dumps
+
+
+def tool_result_to_string(result: Any) -> str:
+    """Serialize a tool result (DB rows, datetimes, ...) for the LLM with orjson."""
+    return result if isinstance(result, str) else dumps(result).decode("utf-8")
+
+
+def compact_rows(
+    rows: Sequence[Dict[str, Any]], columns: List[str], max_text_length: int = 0
+) -> Tuple[List[List[Any]], int]:
+    """Row dicts as value lists in `columns` order, for a `{"columns": [...], "rows": [[...]]}` result.
+
+    Strings longer than `max_text_length` (when > 0) are cut to that length and end
+    with "…". Returns the rows and how many values were cut.
+    """
+    if max_text_length <= 0:
+        return [[row[col] for col in columns] for row in rows], 0
+    truncated = 0
+    compact: List[List[Any]] = []
+    for row in rows:
+        values = [row[col] for col in columns]
+        for index, value in enumerate(values):
+            if isinstance(value, str) and len(value) > max_text_length:
+                values[index] = value[:max_text_length] + "…"
+                truncated += 1
+        compact.append(values)
+    return compact, truncated
+
+
+def tool_result_to_arrow(result: Dict[str, Any]) -> bytes:
+    """Arrow IPC stream of a tool result, for programmatic callers (the LLM keeps the JSON string).
+
+    The row payload (`results`, `summary`, `time_series`, the compact `columns` + `rows`, or
+    the columnar `distinct_values`) becomes the table; the other fields (count, next_cursor,
+    errors, ...) go to the schema metadata.
+    """
+    rows: Optional[List[Dict[str, Any]]] = None
+    metadata: Dict[str, Any] = {}
+    if isinstance(result.get("columns"), list) and isinstance(result.get("rows"), list):
+        rows = [dict(zip(result["columns"], row)) for row in result["rows"]]
+        result = {key: value for key, value in result.items() if key not in ("columns", "rows")}
+    for key, value in result.items():
+        if rows is None and isinstance(value, list):
+            rows = value
+        elif rows is None and isinstance(value, dict) and value and all(isinstance(v, list) for v in value.values()):
+            rows = [dict(zip(value, row)) for row in zip(*value.values())]
+        else:
+            metadata[key] = value
+    return rows_to_ipc(rows or [], metadata=metadata)
+
+
+def cached_result(method: Callable) -> Callable:
+    """Serve a tool's `run` / `arun` from `self.cache`, keyed by `self.cache_key(**kwargs)`.
+
+    Error results (cost guard / timeout rejections) are returned but not cached. Inside a
+    `shared_snapshot` the cache is bypassed both ways: an entry could come from another
+    state, and a result read on the snapshot may already be older than the generation.
+    """
+    def lookup(self: Any, kwargs: Dict[str, Any]):
+        key = self.cache_key(**kwargs)
+        return key, self.cache.get(key), self.cache.generation(key[0])
+
+    def store(self: Any, key: Any, result: Any, generation: int) -> Any:
+        if not (isinstance(result, dict) and "error" in result):
+            self.cache.put(key, result, generation)
+        return result
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self: Any, **kwargs: Any) -> Any:
+            if in_shared_snapshot():
+                return await method(self, **kwargs)
+            key, cached, generation = lookup(self, kwargs)
+            if cached is not None:
+                return cached
+            return store(self, key, await method(self, **kwargs), generation)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self: Any, **kwargs: Any) -> Any:
+        if in_shared_snapshot():
+            return method(self, **kwargs)
+        key, cached, generation = lookup(self, kwargs)
+        if cached is not None:
+            return cached
+        return store(self, key, method(self, **kwargs), generation)
+    return wrapper
+
 
 class BaseTool(ABC):
     @property
@@ -17,6 +111,10 @@ class BaseTool(ABC):
     def run(self, **kwargs) -> Dict[str, Any]:
         """Run the tool with parameters"""
 
+    async def arun(self, **kwargs) -> Dict[str, Any]:
+        """Async variant of `run`; tools with a native async path override this."""
+        return await asyncio.to_thread(self.run, **kwargs)
+
     def to_haystack_tool(self) -> Tool:
         """
         Convert this BaseTool subclass into a haystack.tools.Tool
@@ -29,6 +127,8 @@ class BaseTool(ABC):
             name=self.name,
             description=self.description,
             parameters=parameters,
-            function=self.run
+            function=self.run,
+            # orjson instead of haystack's generic deep-copy + json.dumps conversion
+            outputs_to_string={"handler": tool_result_to_string},
         )
 
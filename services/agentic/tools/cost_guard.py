@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Sequence
+import psycopg
+import psycopg2
+from config import get_settings
+
+
+class QueryCostGuard:
+    """Pre-execution guard for SQL generated from LLM tool arguments.
+
+    - `estimate` runs `EXPLAIN (FORMAT JSON)` and returns the planner's total cost,
+      output rows and the largest row estimate of any plan node.
+    - `exceeds` compares an estimate with the configured cost/row budget.
+    - `begin` applies a per-statement `statement_timeout` to the current transaction.
+    Tools turn a blown budget into a structured "narrow your filters" result.
+    """
+
+    def __init__(self, max_cost: float, max_rows: int, statement_timeout_ms: int) -> None:
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self.statement_timeout_ms = statement_timeout_ms
+
+    @classmethod
+    def from_settings(cls) -> "QueryCostGuard":
+        settings = get_settings()
+        return cls(
+            max_cost=settings.tool_max_query_cost,
+            max_rows=settings.tool_max_query_rows,
+            statement_timeout_ms=settings.tool_statement_timeout_ms,
+        )
+
+    # -------------------------------------------
+    # psycopg2 (sync)
+    # -------------------------------------------
+    def begin(self, cur: psycopg2.extensions.cursor) -> None:
+        """Limit every statement of the current transaction to `statement_timeout_ms`."""
+        cur.execute("SELECT set_config('statement_timeout', %s, true)", (str(self.statement_timeout_ms),))
+
+    def estimate(self, cur: psycopg2.extensions.cursor, sql: str, params: Sequence[Any]) -> Dict[str, float]:
+        cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        return self._summarize(cur.fetchone())
+
+    # -------------------------------------------
+    # psycopg 3 (async)
+    # -------------------------------------------
+    async def abegin(self, cur: psycopg.AsyncCursor) -> None:
+        await cur.execute("SELECT set_config('statement_timeout', %s, true)", (str(self.statement_timeout_ms),))
+
+    async def aestimate(self, cur: psycopg.AsyncCursor, sql: str, params: Sequence[Any]) -> Dict[str, float]:
+        await cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        return self._summarize(await cur.fetchone())
+
+    # -------------------------------------------
+    # Decisions
+    # -------------------------------------------
+    def exceeds(self, estimate: Dict[str, float]) -> bool:
+        return estimate["cost"] > self.max_cost or estimate["max_rows"] > self.max_rows
+
+    def rejection(self, estimate: Dict[str, float]) -> Dict[str, Any]:
+        """Structured result the agent can act on instead of running the query."""
+        return {
+            "error": "query_too_expensive",
+            "message": (
+                "This query is too expensive to run as asked. Narrow your filters "
+                "(e.g. a date range on trans_date_trans_time, exact values instead of patterns, "
+                "fewer or lower-cardinality columns) and try again."
+            ),
+            "estimated_cost": round(estimate["cost"], 2),
+            "estimated_rows": int(estimate["max_rows"]),
+            "max_cost": self.max_cost,
+            "max_rows": self.max_rows,
+        }
+
+    def timeout_rejection(self) -> Dict[str, Any]:
+        return {
+            "error": "query_timeout",
+            "message": (
+                f"The query was cancelled after {self.statement_timeout_ms} ms. "
+                "Narrow your filters and try again."
+            ),
+            "statement_timeout_ms": self.statement_timeout_ms,
+        }
+
+    @staticmethod
+    def _summarize(row: Any) -> Dict[str, float]:
+        plan = row["QUERY PLAN"][0]["Plan"]
+
+        max_rows = 0.0
+        stack: List[Dict[str, Any]] = [plan]
+        while stack:
+            node = stack.pop()
+            max_rows = max(max_rows, float(node.get("Plan Rows", 0)))
+            stack.extend(node.get("Plans", []))
+
+        return {"cost": float(plan["Total Cost"]), "rows": float(plan["Plan Rows"]), "max_rows": max_rows}
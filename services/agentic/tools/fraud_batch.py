@@ -0,0 +1,160 @@
+import asyncio
+import contextvars
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from agentic.tools.base import BaseTool
+from agentic.tools.fraud_query import FraudQueryTool, FraudSummaryTool
+from contracts.errors import AppError
+from config import get_settings
+
+
+class FraudBatchTool(BaseTool):
+    """Run several fraud_query_tool / fraud_summary_tool calls in one tool call.
+
+    Sub-queries run concurrently, each on its own pooled connection, and all of them
+    read the snapshot exported at the start of the batch (`shared_snapshot`), so their
+    numbers agree with each other. Inside it the tools skip the result cache, the
+    in-process columnar snapshot and the sketches, which hold other states.
+    """
+
+    def __init__(self, query_tool: Optional[FraudQueryTool] = None, summary_tool: Optional[FraudSummaryTool] = None):
+        query_tool = query_tool or FraudQueryTool()
+        summary_tool = summary_tool or FraudSummaryTool()
+        self.tools: Dict[str, BaseTool] = {query_tool.name: query_tool, summary_tool.name: summary_tool}
+        self.db = query_tool.db
+        self.async_db = query_tool.async_db
+        self.max_queries = get_settings().tool_batch_max_queries
+        # The connection holding the exported snapshot counts against the pool too
+        self.concurrency = max(1, min(get_settings().tool_batch_concurrency, get_settings().db_pool_max_size - 1))
+
+    @property
+    def name(self) -> str:
+        return "fraud_batch_tool"
+
+    @property
+    def description(self) -> str:
+        return f"""
+Tool name: fraud_batch_tool
+Purpose: Run several fraud_query_tool and fraud_summary_tool calls at once when a question needs more than one
+result (e.g. fraud count by state and by category plus a sample of rows). Faster than calling the tools one by one,
+and every sub-query sees the same data.
+
+Arguments:
+- queries: List (at most {self.max_queries}) of sub-queries, each with:
+  - id: Name of the sub-query in the result (default: 'q1', 'q2', ... by position).
+  - tool: 'fraud_query_tool' or 'fraud_summary_tool'.
+  - arguments: The arguments that tool takes, exactly as when calling it directly.
+
+Example:
+{{'queries': [
+    {{'id': 'by_state', 'tool': 'fraud_summary_tool', 'arguments': {{'columns': ['state'], 'filters': {{'is_fraud': True}}}}}},
+    {{'id': 'by_category', 'tool': 'fraud_summary_tool', 'arguments': {{'columns': ['category'], 'filters': {{'is_fraud': True}}}}}},
+    {{'id': 'sample', 'tool': 'fraud_query_tool', 'arguments': {{'is_fraud': True, 'limit': 5}}}}
+]}}
+
+Returns: 'results' with each sub-query's result under its id (the same result the tool gives on its own),
+and 'failed', the ids whose result is an error ('error' and 'message', 'invalid_arguments' when the tool could not
+use them); the other sub-queries still answer.
+"""
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "queries": {
+                    "type": "array",
+                    "maxItems": self.max_queries,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "tool": {"type": "string", "enum": list(self.tools)},
+                            "arguments": {"type": "object"},
+                        },
+                        "required": ["tool", "arguments"],
+                    },
+                }
+            },
+            "required": ["queries"],
+        }
+
+    def _queries(self, kwargs: Dict[str, Any]) -> List[Tuple[str, BaseTool, Dict[str, Any]]]:
+        """(id, tool, arguments) per sub-query, validated."""
+        queries = kwargs.get("queries")
+        if not isinstance(queries, list) or not queries:
+            raise AppError(status_code=400, code="invalid_batch", message="queries must be a non-empty list")
+        if len(queries) > self.max_queries:
+            raise AppError(
+                status_code=400,
+                code="batch_too_large",
+                message=f"A batch takes at most {self.max_queries} queries, got {len(queries)}",
+            )
+
+        parsed: List[Tuple[str, BaseTool, Dict[str, Any]]] = []
+        for index, query in enumerate(queries):
+            if not isinstance(query, dict) or query.get("tool") not in self.tools:
+                raise AppError(
+                    status_code=400,
+                    code="invalid_batch",
+                    message=f"Query {index + 1}: 'tool' must be one of: {', '.join(self.tools)}",
+                )
+            query_id = str(query.get("id") or f"q{index + 1}")
+            if any(query_id == seen for seen, _, _ in parsed):
+                raise AppError(status_code=400, code="invalid_batch", message=f"Duplicate query id '{query_id}'")
+            arguments = query.get("arguments") or {}
+            if not isinstance(arguments, dict):
+                raise AppError(status_code=400, code="invalid_batch", message=f"Query '{query_id}': arguments must be an object")
+            parsed.append((query_id, self.tools[query["tool"]], arguments))
+        return parsed
+
+    @staticmethod
+    def _error(e: Exception) -> Dict[str, Any]:
+        if isinstance(e, AppError):
+            return {"error": e.code, "message": e.message}
+        # Anything else comes from arguments the tool could not use (e.g. limit='ten')
+        return {"error": "invalid_arguments", "message": f"{type(e).__name__}: {e}"}
+
+    def _run_one(self, tool: BaseTool, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return tool.run(**arguments)
+        except Exception as e:
+            return self._error(e)
+
+    @staticmethod
+    def _format(ids: List[str], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "results": dict(zip(ids, results)),
+            "failed": [query_id for query_id, result in zip(ids, results) if "error" in result],
+        }
+
+    def run(self, **kwargs) -> Dict[str, Any]:
+        queries = self._queries(kwargs)
+        # A single query is consistent with itself: no snapshot to export
+        shared = self.db.shared_snapshot(caller=self.name) if len(queries) > 1 else nullcontext()
+        with shared, ThreadPoolExecutor(max_workers=min(self.concurrency, len(queries))) as pool:
+            # Each worker runs in a copy of this context, so its cursors import the shared snapshot
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._run_one, tool, arguments)
+                for _, tool, arguments in queries
+            ]
+            results = [future.result() for future in futures]
+        return self._format([query_id for query_id, _, _ in queries], results)
+
+    async def arun(self, **kwargs) -> Dict[str, Any]:
+        queries = self._queries(kwargs)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_one(tool: BaseTool, arguments: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await tool.arun(**arguments)
+                except Exception as e:
+                    return self._error(e)
+
+        shared = self.async_db.shared_snapshot(caller=self.name) if len(queries) > 1 else nullcontext()
+        async with shared:
+            # gather's tasks copy the context, shared snapshot included
+            results = await asyncio.gather(*(run_one(tool, arguments) for _, tool, arguments in queries))
+        return self._format([query_id for query_id, _, _ in queries], list(results))
@@ -1,9 +1,70 @@
-from typing import Any, Dict, List, Optional
-from agentic.tools.base import BaseTool
-from business.domain.supabase.connection import SupabaseDB
+import asyncio
+import json
+import logging
+import uuid
+from datetime import date, datetime
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple
+import psycopg
+import psycopg2
+import psycopg2.errors
+from agentic.tools.base import BaseTool, cached_result, compact_rows
+from agentic.tools.cost_guard import QueryCostGuard
+from agentic.tools.rollup_rewriter import RollupRewriter
+from agentic.tools.snapshot_engine import SnapshotEngine, results_match
+from business.domain.supabase.connection import AsyncSupabaseDB, SupabaseDB, in_shared_snapshot, primary_fallback
+from business.domain.supabase.result_cache import CacheKey, get_result_cache
+from business.domain.supabase.rollups import arollups_ready, rollups_ready
 from contracts.errors import AppError
 from config import get_settings
 from business.model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
+from business.usecase.fraud_transactions.filters import build_filter_clause, build_where
+from business.usecase.fraud_transactions.pagination import KEYSET_ORDER, keyset_clause, split_page
+from business.usecase.fraud_transactions.sketches import SKETCH_COLUMNS, get_sketches
+from business.usecase.fraud_transactions.snapshot import SNAPSHOT_MODES, get_snapshot
+from business.usecase.fraud_transactions.time_buckets import GRANULARITIES, fill_gaps, open_bucket
+
+
+logger = logging.getLogger("services.tools")
+
+# Tool arguments that are not column filters
+_NON_FILTER_ARGS = ["or_filters", "limit", "offset", "cursor", "count_strategy", "columns", "format", "max_text_length"]
+COUNT_STRATEGIES = ["exact", "capped", "estimate", "window"]
+# fraud_query_tool rows: 'columnar' is a column list plus one value list per row, 'records' one dict per row
+RESULT_FORMATS = ["columnar", "records"]
+# Selected even when not projected: the next page's cursor is built from them
+_KEYSET_COLUMNS = ["trans_date_trans_time", "id"]
+# Columns a time series can bucket; closed buckets are only cached for the (NOT NULL) timestamps
+_DATE_COLUMNS = [
+    name for name, field in FraudTransactionModel.model_fields.items()
+    if field.annotation in (datetime, date, Optional[datetime], Optional[date])
+]
+_TIMESTAMP_COLUMNS = [
+    name for name, field in FraudTransactionModel.model_fields.items() if field.annotation is datetime
+]
+_BOOLEAN_COLUMNS = [
+    name for name, field in FraudTransactionModel.model_fields.items() if field.annotation in (bool, Optional[bool])
+]
+
+
+METRIC_AGGREGATES = ["count", "sum", "avg", "min", "max", "rate"]
+
+
+def _metric_sql(column: str, agg: str, valid_columns: List[str]) -> str:
+    """Aggregate expression of a `metrics` entry; `rate` is the share of true values of a boolean column.
+
+    Both parts end up in the SQL (and in the `{column}_{agg}` alias), so they are checked here.
+    """
+    if column not in valid_columns or not isinstance(agg, str) or agg.lower() not in METRIC_AGGREGATES:
+        raise AppError(
+            status_code=400,
+            code="invalid_metric",
+            message=f"metrics map a column from the available columns to one of {METRIC_AGGREGATES}, got {column!r}: {agg!r}",
+        )
+    if agg.lower() == "rate":
+        if column not in _BOOLEAN_COLUMNS:
+            raise AppError(status_code=400, code="invalid_metric", message=f"'rate' needs a boolean column: {_BOOLEAN_COLUMNS}")
+        return f"AVG({column}::int)::double precision"
+    return f"{agg.upper()}({column})"
 
 
 class FraudQueryTool(BaseTool):
@@ -11,6 +72,13 @@ class FraudQueryTool(BaseTool):
 
     def __init__(self):
         self.db = SupabaseDB(settings_module=get_settings())
+        self.async_db = AsyncSupabaseDB(settings_module=get_settings())
+        self.guard = QueryCostGuard.from_settings()
+        self.cache = get_result_cache(get_settings().tool_cache_max_entries, get_settings().tool_cache_ttl)
+        self.count_strategy = get_settings().tool_count_strategy
+        self.count_cap = get_settings().tool_count_cap
+        self.result_format = get_settings().tool_result_format
+        self.max_text_length = get_settings().tool_max_text_length
         self.table_name = "fraud_transactions"
         self._valid_columns = list(FraudTransactionModel.model_fields.keys())
         self._column_descriptions = {
@@ -36,12 +104,23 @@ Available columns:
 {chr(10).join(col_desc_list)}
 
 Arguments:
-- Direct filters: Pass column=value for AND condition.
+- Direct filters: Pass column=value for AND condition. Text values match case-insensitively;
+  use '%' as a wildcard only when a partial match is needed (e.g. 'fraud_Kirlin%'), exact values are faster.
 - Comparison filters: Pass column={{'gt': val, 'lt': val, 'gte': val, 'lte': val}}.
 - NOT condition: Pass column={{'not': value}} to exclude a value.
 - or_filters: Dictionary of columns for OR conditions (can also use comparison or NOT).
 - limit: Max number of rows to return.
-- offset: Starting index for pagination.
+- cursor: Continuation token from a previous result's 'next_cursor' to get the next page (preferred).
+- offset: Starting index for pagination (ignored when cursor is given; slow for deep pages).
+- count_strategy: How 'count' is computed (default: capped):
+  'capped' exact up to {self.count_cap:,} matches, otherwise "more than {self.count_cap:,}" plus an estimate;
+  'exact' full COUNT(*); 'estimate' planner estimate only (fastest); 'window' count and page in one query.
+- columns: Only return these columns (e.g. ['trans_date_trans_time', 'merchant', 'amt']). Ask only for the
+  columns the answer needs; default is every column.
+- format (default: {self.result_format}): 'columnar' returns 'columns' (the column names) and 'rows'
+  (one list of values per row, in that order); 'records' returns 'results', one object per row.
+- max_text_length: Cut text values longer than this many characters (they end with '…'); 0 keeps them whole.
+  Do not reuse a cut value as a filter.
 
 Example:
 1. Simple AND:
@@ -63,11 +142,17 @@ Example:
     'city': {{'not': 'Bogota'}},
     'is_fraud': True,
     'trans_date_trans_time': {{'gte': '2023-01-01'}},
+    'columns': ['trans_date_trans_time', 'merchant', 'amt', 'city'],
     'limit': 10,
     'offset': 0
 }}
 
-Returns: List of matching transactions and total count of all matching rows.
+Returns: The matching transactions ('columns' + 'rows', or 'results' with format 'records'), total count
+of all matching rows and 'next_cursor' (null on the last page). Results are ordered newest first.
+'truncated' (when present) is how many text values were cut.
+'count_type' says how to read 'count': 'exact', 'more_than' (count is the cap; 'estimated_count'
+gives the planner's guess) or 'estimate'. Queries too large to count exactly always get an estimate.
+If the result has 'error': 'query_too_expensive' or 'query_timeout', narrow the filters and retry.
 """
 
     @property
@@ -98,7 +183,12 @@ Returns: List of matching transactions and total count of all matching rows.
             }
 
         full_props["limit"] = {"type": "number"}
+        full_props["cursor"] = {"type": "string"}
         full_props["offset"] = {"type": "number"}
+        full_props["count_strategy"] = {"type": "string", "enum": COUNT_STRATEGIES}
+        full_props["columns"] = {"type": "array", "items": {"type": "string", "enum": self._valid_columns}}
+        full_props["format"] = {"type": "string", "enum": RESULT_FORMATS}
+        full_props["max_text_length"] = {"type": "number"}
 
         return {
             "type": "object",
@@ -106,79 +196,253 @@ Returns: List of matching transactions and total count of all matching rows.
             "required": []
         }
 
-    def _build_filter_clause(self, filters: Dict[str, Any], valid_columns: List[str]):
-        """Helper to build SQL filter strings and params."""
-        clauses: List[str] = []
-        params: List[Any] = []
-
-        for key, value in filters.items():
-            if key not in valid_columns:
-                continue
-            if isinstance(value, dict):
-                # NOT
-                if "not" in value:
-                    clauses.append(f"{key} != %s")
-                    params.append(value["not"])
-                # Comparisons
-                for op in ["gt", "lt", "gte", "lte"]:
-                    if op in value:
-                        sql_op = {"gt": ">", "lt": "<", "gte": ">=", "lte": "<="}[op]
-                        clauses.append(f"{key} {sql_op} %s")
-                        params.append(value[op])
-            elif isinstance(value, str):
-                clauses.append(f"{key} ILIKE %s")
-                params.append(value)
-            else:
-                clauses.append(f"{key} = %s")
-                params.append(value)
+    def _build_where(self, filters: Dict[str, Any], or_filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Combine AND filters and OR filters into a single WHERE clause."""
+        return build_where(filters, or_filters, self._valid_columns)
 
-        return clauses, params
+    def _count_strategy_arg(self, kwargs: Dict[str, Any]) -> str:
+        strategy = kwargs.get("count_strategy") or self.count_strategy
+        if strategy not in COUNT_STRATEGIES:
+            raise AppError(
+                status_code=400,
+                code="invalid_count_strategy",
+                message=f"count_strategy must be one of: {', '.join(COUNT_STRATEGIES)}",
+            )
+        return strategy
 
-    def run(self, **kwargs) -> Dict[str, Any]:
-        filters: Dict[str, Any] = {k: v for k, v in kwargs.items() if k not in ["or_filters", "limit", "offset"]}
-        or_filters: Dict[str, Any] = kwargs.pop("or_filters", {})
-        limit: int = int(kwargs.pop("limit", 10))
+    def _result_format_arg(self, kwargs: Dict[str, Any]) -> str:
+        result_format = kwargs.get("format") or self.result_format
+        if result_format not in RESULT_FORMATS:
+            raise AppError(
+                status_code=400,
+                code="invalid_format",
+                message=f"format must be one of: {', '.join(RESULT_FORMATS)}",
+            )
+        return result_format
+
+    def _projection(self, kwargs: Dict[str, Any]) -> Optional[List[str]]:
+        """The requested `columns` (duplicates dropped, order kept); None for every column."""
+        columns = kwargs.get("columns")
+        if not columns:
+            return None
+        if isinstance(columns, str):
+            columns = [columns]
+        unknown = [col for col in columns if col not in self._valid_columns]
+        if unknown:
+            raise AppError(
+                status_code=400,
+                code="invalid_columns",
+                message=f"Unknown columns {unknown}; valid columns: {self._valid_columns}",
+            )
+        return list(dict.fromkeys(columns))
+
+    def _max_text_length_arg(self, kwargs: Dict[str, Any]) -> int:
+        max_text_length = kwargs.get("max_text_length")
+        return self.max_text_length if max_text_length is None else int(max_text_length)
+
+    def _select_list(self, projection: Optional[List[str]], keyset: bool = True) -> str:
+        if projection is None:
+            return "*"
+        extra = [col for col in _KEYSET_COLUMNS if col not in projection] if keyset else []
+        return ", ".join(projection + extra)
+
+    def _encode_rows(self, kwargs: Dict[str, Any], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """The page in the requested format, limited to the projected columns, long text cut."""
+        projection = self._projection(kwargs)
+        columns = projection or (list(records[0]) if records else self._valid_columns)
+        rows, truncated = compact_rows(records, columns, self._max_text_length_arg(kwargs))
+        if self._result_format_arg(kwargs) == "columnar":
+            encoded: Dict[str, Any] = {"columns": columns, "rows": rows}
+        else:
+            encoded = {"results": [dict(zip(columns, row)) for row in rows]}
+        if truncated:
+            encoded["truncated"] = truncated
+        return encoded
+
+    def _split_args(self, kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], int, int, Optional[str]]:
+        """(filters, or_filters, limit, offset, cursor) from the tool arguments, with the page clamped."""
+        filters: Dict[str, Any] = {k: v for k, v in kwargs.items() if k not in _NON_FILTER_ARGS}
+        or_filters: Dict[str, Any] = kwargs.get("or_filters", {})
+        limit: int = int(kwargs.get("limit", 10))
         limit =  min(limit, 20)
-        offset: int = int(kwargs.pop("offset", 0))
-
-        # AND filters
-        and_clauses, and_params = self._build_filter_clause(filters, self._valid_columns)
-        # OR filters
-        or_clauses, or_params = self._build_filter_clause(or_filters, self._valid_columns)
-
-        where_clause = ""
-        params: List[Any] = []
-
-        if and_clauses and or_clauses:
-            where_clause = f"WHERE {' AND '.join(and_clauses)} AND ({' OR '.join(or_clauses)})"
-            params.extend(and_params + or_params)
-        elif and_clauses:
-            where_clause = f"WHERE {' AND '.join(and_clauses)}"
-            params.extend(and_params)
-        elif or_clauses:
-            where_clause = f"WHERE {' OR '.join(or_clauses)}"
-            params.extend(or_params)
+        offset: int = int(kwargs.get("offset", 0))
+        cursor: Optional[str] = kwargs.get("cursor") or None
+        if cursor is not None:
+            offset = 0  # the cursor already says where the page starts
+        return filters, or_filters, limit, offset, cursor
+
+    def cache_key(self, **kwargs) -> CacheKey:
+        """Result cache key: filters on known columns (key order ignored) and the clamped page."""
+        filters, or_filters, limit, offset, cursor = self._split_args(kwargs)
+        args = {
+            "filters": {k: v for k, v in filters.items() if k in self._valid_columns},
+            "or_filters": {k: v for k, v in or_filters.items() if k in self._valid_columns},
+            "limit": limit,
+            "offset": offset,
+            "cursor": cursor,
+            "count_strategy": kwargs.get("count_strategy") or self.count_strategy,
+            "columns": self._projection(kwargs),
+            "format": kwargs.get("format") or self.result_format,
+            "max_text_length": self._max_text_length_arg(kwargs),
+        }
+        return self.table_name, self.name, json.dumps(args, sort_keys=True, default=str)
+
+    def _build_queries(self, **kwargs) -> Tuple[Dict[str, Tuple[str, List[Any]]], int]:
+        """Build the page, count (one per strategy) and scan (cost estimate) queries, plus the page size."""
+        filters, or_filters, limit, offset, cursor = self._split_args(kwargs)
+        select = self._select_list(self._projection(kwargs))
+
+        where_clause, params = self._build_where(filters, or_filters)
+        page_where, cursor_params = keyset_clause(where_clause, cursor)
 
         count_query = f"SELECT COUNT(*) AS total_count FROM {self.table_name} {where_clause};"
+        # Stops reading after cap + 1 matches, however many rows match
+        capped_query = (
+            f"SELECT COUNT(*) AS total_count FROM (SELECT 1 FROM {self.table_name} {where_clause} LIMIT %s) AS capped;"
+        )
+        # One extra row tells whether there is a next page
         query = f"""
-            SELECT *
+            SELECT {select}
             FROM {self.table_name}
-            {where_clause}
-            ORDER BY trans_date_trans_time DESC
+            {page_where}
+            {KEYSET_ORDER}
+            LIMIT %s OFFSET %s;
+        """
+        # The page with the size of the whole matching set on every row (counted before the cursor applies)
+        window_where, _ = keyset_clause("", cursor)
+        window_query = f"""
+            SELECT *
+            FROM (SELECT {select}, COUNT(*) OVER () AS total_count FROM {self.table_name} {where_clause}) AS matched
+            {window_where}
+            {KEYSET_ORDER}
             LIMIT %s OFFSET %s;
         """
-        params_with_limit = params + [limit, offset]
+        # Planned (never executed) to estimate how many rows the filters match
+        scan_query = f"SELECT 1 FROM {self.table_name} {where_clause}"
+        queries = {
+            "exact": (count_query, params),
+            "capped": (capped_query, params + [self.count_cap + 1]),
+            "page": (query, params + cursor_params + [limit + 1, offset]),
+            "window": (window_query, params + cursor_params + [limit + 1, offset]),
+            "scan": (scan_query, params),
+        }
+        return queries, limit
+
+    def _count_fields(self, strategy: str, total_count: int, scan_estimate: Dict[str, float]) -> Dict[str, Any]:
+        """`count` and how to read it: exact, more_than (the cap) or estimate."""
+        estimated = int(scan_estimate["rows"])
+        if strategy == "estimate":
+            return {"count": estimated, "count_type": "estimate", "count_is_estimate": True}
+        if strategy == "capped" and total_count > self.count_cap:
+            return {
+                "count": self.count_cap,
+                "count_type": "more_than",
+                "count_is_estimate": True,
+                "estimated_count": max(estimated, self.count_cap + 1),
+            }
+        return {"count": total_count, "count_type": "exact", "count_is_estimate": False}
+
+    @staticmethod
+    def _split_window(rows: List[Dict[str, Any]]) -> Tuple[Optional[int], List[Dict[str, Any]]]:
+        """Take the window count off the page rows (None for an empty page)."""
+        total_count = rows[0]["total_count"] if rows else None
+        for row in rows:
+            del row["total_count"]
+        return total_count, rows
+
+    @cached_result
+    @primary_fallback
+    def run(self, **kwargs) -> Dict[str, Any]:
+        strategy = self._count_strategy_arg(kwargs)
+        self._result_format_arg(kwargs)
+        queries, limit = self._build_queries(**kwargs)
+
+        try:
+            with self.db.get_cursor(readonly=True, caller=self.name) as cur:
+                try:
+                    self.guard.begin(cur)
+                    page_estimate = self.guard.estimate(cur, *queries["page"])
+                    if page_estimate["cost"] > self.guard.max_cost:
+                        return self.guard.rejection(page_estimate)
+
+                    # Counting runs only when the matching set is cheap to scan; otherwise estimate
+                    scan_estimate = self.guard.estimate(cur, *queries["scan"])
+                    if self.guard.exceeds(scan_estimate):
+                        strategy = "estimate"
+
+                    total_count: Optional[int] = 0
+                    if strategy in ("exact", "capped"):
+                        self.db.execute_prepared(cur, *queries[strategy])
+                        row = cur.fetchone()
+                        total_count = row["total_count"] if row is not None else 0 # type: ignore
+
+                    self.db.execute_prepared(cur, *queries["window" if strategy == "window" else "page"])
+                    rows = cur.fetchall()
+                    if strategy == "window":
+                        total_count, rows = self._split_window(rows)
+                        if total_count is None:  # empty page: past the end, or nothing matches
+                            self.db.execute_prepared(cur, *queries["exact"])
+                            total_count = cur.fetchone()["total_count"] # type: ignore
+                    records, next_cursor = split_page(rows, limit)
+                except psycopg2.errors.QueryCanceled:
+                    return self.guard.timeout_rejection()
+
+            return {
+                **self._encode_rows(kwargs, records),
+                **self._count_fields(strategy, total_count or 0, scan_estimate),
+                "next_cursor": next_cursor,
+            }
+
+        except AppError:
+            raise
+        except Exception as e:
+            raise AppError(
+                status_code=500,
+                code="fraud_query_failed",
+                message=f"Unexpected error during fraud query: {str(e)}"
+            )
+
+    @cached_result
+    @primary_fallback
+    async def arun(self, **kwargs) -> Dict[str, Any]:
+        strategy = self._count_strategy_arg(kwargs)
+        self._result_format_arg(kwargs)
+        queries, limit = self._build_queries(**kwargs)
 
         try:
-            with self.db.get_cursor() as cur:
-                cur.execute(count_query, params)
-                row = cur.fetchone()
-                total_count = row["total_count"] if row is not None else 0 # type: ignore
+            async with self.async_db.get_cursor(readonly=True, caller=self.name) as cur:
+                try:
+                    await self.guard.abegin(cur)
+                    page_estimate = await self.guard.aestimate(cur, *queries["page"])
+                    if page_estimate["cost"] > self.guard.max_cost:
+                        return self.guard.rejection(page_estimate)
+
+                    scan_estimate = await self.guard.aestimate(cur, *queries["scan"])
+                    if self.guard.exceeds(scan_estimate):
+                        strategy = "estimate"
 
-                cur.execute(query, params_with_limit)
-                records = cur.fetchall()
+                    total_count: Optional[int] = 0
+                    if strategy in ("exact", "capped"):
+                        await self.async_db.execute_prepared(cur, *queries[strategy])
+                        row = await cur.fetchone()
+                        total_count = row["total_count"] if row is not None else 0 # type: ignore
 
-            return {"results": records, "count": total_count}
+                    await self.async_db.execute_prepared(cur, *queries["window" if strategy == "window" else "page"])
+                    rows = await cur.fetchall()
+                    if strategy == "window":
+                        total_count, rows = self._split_window(rows)
+                        if total_count is None:
+                            await self.async_db.execute_prepared(cur, *queries["exact"])
+                            total_count = (await cur.fetchone())["total_count"] # type: ignore
+                    records, next_cursor = split_page(rows, limit)
+                except psycopg.errors.QueryCanceled:
+                    return self.guard.timeout_rejection()
+
+            return {
+                **self._encode_rows(kwargs, records),
+                **self._count_fields(strategy, total_count or 0, scan_estimate),
+                "next_cursor": next_cursor,
+            }
 
         except AppError:
             raise
@@ -189,12 +453,67 @@ Returns: List of matching transactions and total count of all matching rows.
                 message=f"Unexpected error during fraud query: {str(e)}"
             )
 
+    def stream(self, batch_size: Optional[int] = None, **kwargs) -> Generator[List[Dict[str, Any]], None, None]:
+        """Yield every matching row in batches from a server-side cursor.
+
+        Same filter arguments (and `columns` projection) as `run` but without the 20-row
+        cap or the count query, meant for analytics jobs and streamed responses rather
+        than the LLM. Rows stay dicts.
+        """
+        filters: Dict[str, Any] = {k: v for k, v in kwargs.items() if k not in _NON_FILTER_ARGS}
+        or_filters: Dict[str, Any] = kwargs.get("or_filters", {})
+        where_clause, params = self._build_where(filters, or_filters)
+        select = self._select_list(self._projection(kwargs), keyset=False)
+        query = f"SELECT {select} FROM {self.table_name} {where_clause} ORDER BY trans_date_trans_time DESC;"
+
+        cursor_name = f"fraud_query_stream_{uuid.uuid4().hex}"
+        with self.db.get_cursor(name=cursor_name, itersize=batch_size, readonly=True, caller=self.name) as cur:
+            cur.execute(query, params)
+            while True:
+                records = cur.fetchmany(cur.itersize)
+                if not records:
+                    break
+                yield records
+
+    async def astream(self, batch_size: Optional[int] = None, **kwargs) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """Async version of `stream`."""
+        filters: Dict[str, Any] = {k: v for k, v in kwargs.items() if k not in _NON_FILTER_ARGS}
+        or_filters: Dict[str, Any] = kwargs.get("or_filters", {})
+        where_clause, params = self._build_where(filters, or_filters)
+        select = self._select_list(self._projection(kwargs), keyset=False)
+        query = f"SELECT {select} FROM {self.table_name} {where_clause} ORDER BY trans_date_trans_time DESC;"
+
+        cursor_name = f"fraud_query_stream_{uuid.uuid4().hex}"
+        async with self.async_db.get_cursor(name=cursor_name, itersize=batch_size, readonly=True, caller=self.name) as cur:
+            await cur.execute(query, params)
+            while True:
+                records = await cur.fetchmany(cur.itersize)
+                if not records:
+                    break
+                yield records
+
 
 class FraudSummaryTool(BaseTool):
     """Tool for summarizing fraud transactions and fetching distinct column values."""
 
     def __init__(self):
         self.db = SupabaseDB(settings_module=get_settings())
+        self.async_db = AsyncSupabaseDB(settings_module=get_settings())
+        self.guard = QueryCostGuard.from_settings()
+        self.cache = get_result_cache(get_settings().tool_cache_max_entries, get_settings().tool_cache_ttl)
+        self.closed_bucket_ttl = get_settings().tool_closed_bucket_ttl
+        self.max_time_series_points = get_settings().tool_max_time_series_points
+        self.rollups = RollupRewriter() if get_settings().db_rollups else None
+        self.snapshot_mode = get_settings().tool_snapshot_mode
+        self.snapshot = (
+            get_snapshot(get_settings().tool_snapshot_refresh, get_settings().tool_snapshot_max_age)
+            if self.snapshot_mode in SNAPSHOT_MODES else None
+        )
+        self.engine = SnapshotEngine()
+        self.sketches = (
+            get_sketches(get_settings().tool_sketch_refresh, get_settings().tool_sketch_max_age)
+            if get_settings().tool_sketches else None
+        )
         self.table_name = "fraud_transactions"
         self._valid_columns = list(FraudTransactionModel.model_fields.keys())
         self._column_descriptions = {
@@ -209,6 +528,7 @@ class FraudSummaryTool(BaseTool):
     @property
     def description(self) -> str:
         col_desc_list = [f"- {col} ({self._column_descriptions.get(col)})" for col in self._valid_columns]
+        sketch_columns = ", ".join(SKETCH_COLUMNS)
         return f"""
     Tool name: fraud_summary_tool
     Purpose: Summarize fraud transaction data and fetch distinct values.
@@ -219,12 +539,29 @@ class FraudSummaryTool(BaseTool):
     Arguments:
     - columns: List of columns to summarize or group by.
     - distinct: Boolean. If true, returns distinct values (max 50) per column along with total count.
-    - filters: Optional AND/OR/NOT/comparison filters.
+    - approximate: Boolean, with distinct on one column and no filters: an estimated distinct count
+      and the most frequent values with their counts ('top_values', up to 'limit'), answered in
+      milliseconds from sketches. Use it for high-cardinality columns ({sketch_columns}).
+    - filters: Optional AND/OR/NOT/comparison filters. Text values match case-insensitively;
+      '%' is a wildcard (e.g. 'fraud_Kirlin%'), exact values are faster.
     - limit: Maximum number of rows to return.
     - order_by: Optional list of dicts with 'column' and 'order' (asc/desc).
-    - time_series: Optional dict for time-based aggregation:
+    - metrics: Optional aggregations per group (or per time bucket), e.g. {{"amt": "sum"}}:
+      count, sum, avg, min, max, or 'rate' (share of true values of a boolean, e.g. {{"is_fraud": "rate"}}).
+    - time_series: Optional dict for time-based aggregation; each bucket has 'fraud_count' (rows)
+      plus the requested metrics:
         - 'date_column': str
-        - 'granularity': str ('day', 'month', 'year')
+        - 'granularity': str ('hour', 'day', 'week', 'month', 'year')
+        - 'group_by': Optional list of columns splitting every bucket (e.g. ["category"])
+        - 'fill_gaps': Optional bool; also return empty buckets (count 0, other metrics null)
+
+    Cost limits:
+    - Queries estimated to be too expensive are not run; the result is
+      {{"error": "query_too_expensive", ...}} or {{"error": "query_timeout", ...}}.
+      Narrow the filters (date range, exact values, fewer columns) and retry.
+    - A distinct count that is too expensive is replaced by an estimate ("count_is_estimate": true).
+    - A time series returns at most {self.max_time_series_points} buckets x groups; longer ones give
+      {{"error": "too_many_points", ...}}: use a coarser granularity, fewer group_by columns or a shorter range.
 
     Ordering rules:
     - Any column used in 'order_by' must also appear in 'columns'.
@@ -258,6 +595,14 @@ class FraudSummaryTool(BaseTool):
     "filters": {{"city": "Los Angeles", "is_fraud": true}}
     }}
 
+    # 3b. Weekly fraud rate and amount per category, one call, no missing weeks
+    {{
+    "columns": [],
+    "metrics": {{"is_fraud": "rate", "amt": "sum"}},
+    "time_series": {{"date_column": "trans_date_trans_time", "granularity": "week",
+                    "group_by": ["category"], "fill_gaps": true}}
+    }}
+
     # 4. Group by state and gender, average transaction amount, filter by amount range
     {{
     "columns": ["state", "gender", "amt"],
@@ -299,7 +644,15 @@ class FraudSummaryTool(BaseTool):
                     "description": "Return distinct values (max 50) per column"
                    
                 },
-                "metrics": {"type": "object", "description": "Optional aggregations, e.g., {'city_pop': 'sum'}"},
+                "approximate": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "With distinct on one column and no filters: estimated count and most frequent values",
+                },
+                "metrics": {
+                    "type": "object",
+                    "description": "Optional aggregations (count/sum/avg/min/max/rate), e.g., {'amt': 'sum', 'is_fraud': 'rate'}",
+                },
                 "filters": {"type": "object", "description": "AND/OR/NOT/comparison filters"},
                 "limit": {"type": "number", "default": 20, "description": "Max rows to return"},
                 "order_by": {
@@ -323,119 +676,405 @@ class FraudSummaryTool(BaseTool):
                             "required": ["column"]
                         }
                     },
-                "time_series": {"type": "object", "description": "Optional time series aggregation"},
+                "time_series": {
+                    "type": "object",
+                    "description": "Optional time series aggregation",
+                    "properties": {
+                        "date_column": {"type": "string", "enum": _DATE_COLUMNS},
+                        "granularity": {"type": "string", "enum": list(GRANULARITIES), "default": "day"},
+                        "group_by": {"type": "array", "items": {"type": "string", "enum": self._valid_columns}},
+                        "fill_gaps": {"type": "boolean", "default": False},
+                    },
+                    "required": ["date_column"],
+                },
             },
             "required": ["columns", "metrics"],  # <-- remove 'columns' from required
         }
         
 
-    def _build_filter_clause(self, filters: Dict[str, Any]):
-        clauses, params = [], []
-        for key, value in filters.items():
-            if key not in self._valid_columns:
-                continue
-            if isinstance(value, dict):
-                if "not" in value:
-                    clauses.append(f"{key} != %s")
-                    params.append(value["not"])
-                for op in ["gt", "lt", "gte", "lte"]:
-                    if op in value:
-                        sql_op = {"gt": ">", "lt": "<", "gte": ">=", "lte": "<="}[op]
-                        clauses.append(f"{key} {sql_op} %s")
-                        params.append(value[op])
-            elif isinstance(value, str):
-                clauses.append(f"{key} ILIKE %s")
-                params.append(value)
-            else:
-                clauses.append(f"{key} = %s")
-                params.append(value)
-        return clauses, params
+    def _summary_args(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """The arguments a summary depends on: unknown filter columns dropped, limit clamped to 20."""
+        return {
+            "columns": kwargs.get("columns", []),
+            "metrics": kwargs.get("metrics", {}),
+            "distinct": kwargs.get("distinct", False),
+            "approximate": kwargs.get("approximate", False),
+            "filters": {k: v for k, v in kwargs.get("filters", {}).items() if k in self._valid_columns},
+            "limit": min(int(kwargs.get("limit", 1000)), 20),
+            "order_by": kwargs.get("order_by", []),
+            "time_series": kwargs.get("time_series"),
+        }
 
-    def run(self, **kwargs) -> Dict[str, Any]:
-        columns: List[str] = kwargs.get("columns", [])
-        metrics: Dict[str, str] = kwargs.get("metrics", {})
-        distinct: bool = kwargs.get("distinct", False)
-        filters: Dict[str, Any] = kwargs.get("filters", {})
-        limit: int = int(kwargs.get("limit", 1000))
-        limit = min(limit, 20)
-        order_by: List[Dict[str, str]] = kwargs.get("order_by", [])
-        time_series: Optional[Dict[str, str]] = kwargs.get("time_series")
+    def cache_key(self, **kwargs) -> CacheKey:
+        """Result cache key: `_summary_args` with dict keys sorted."""
+        args = self._summary_args(kwargs)
+        return self.table_name, self.name, json.dumps(args, sort_keys=True, default=str)
+
+    def _build_filter_clause(self, filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        # Same grammar as fraud_query_tool, so both emit the index-friendly string predicates
+        return build_filter_clause(filters, self._valid_columns)
+
+    def _time_series_spec(self, time_series: Dict[str, Any]) -> Tuple[str, str, List[str]]:
+        """(date column, DATE_TRUNC field, group-by columns) of a `time_series` argument."""
+        date_col = time_series.get("date_column")
+        trunc = GRANULARITIES.get(time_series.get("granularity", "day"))
+        group_by = time_series.get("group_by") or []
+        if date_col not in _DATE_COLUMNS or trunc is None or any(col not in self._valid_columns for col in group_by):
+            raise AppError(
+                status_code=400,
+                code="invalid_time_series",
+                message=f"time_series needs a date_column in {_DATE_COLUMNS}, a granularity in "
+                        f"{list(GRANULARITIES)} and group_by columns from the available columns",
+            )
+        return date_col, trunc, group_by
+
+    def _build_statements(
+        self, use_rollups: bool = False, since: Optional[datetime] = None, **kwargs
+    ) -> Tuple[str, List[str], List[Tuple[str, List[Any]]], Dict[int, Tuple[str, List[Any]]]]:
+        """Translate the tool arguments into (mode, columns, [(sql, params), ...], estimates).
+
+        `estimates` maps a statement index to a query that is only planned, never run,
+        whose row estimate replaces that statement's result when it is too expensive.
+        With `use_rollups`, eligible requests read the daily rollup instead of the base table.
+        `since` limits a time series to buckets from that start on (the others are cached).
+        """
+        args = self._summary_args(kwargs)
+        columns: List[str] = args["columns"]
+        metrics: Dict[str, str] = args["metrics"]
+        distinct: bool = args["distinct"]
+        filters: Dict[str, Any] = args["filters"]
+        limit: int = args["limit"]
+        order_by: List[Dict[str, str]] = args["order_by"]
+        time_series: Optional[Dict[str, str]] = args["time_series"]
 
         if not columns and not time_series and not distinct:
             raise AppError(status_code=400, code="missing_columns", message="Specify at least one column or time_series")
 
+        if time_series:
+            date_col, trunc, group_by = self._time_series_spec(time_series)
+
+        if use_rollups and self.rollups is not None:
+            rewritten = self.rollups.rewrite(
+                columns, metrics, distinct, filters, limit, order_by, time_series, since=since
+            )
+            if rewritten is not None:
+                return rewritten
+
+        # WHERE clause
+        conditions, params = self._build_filter_clause(filters)
+        if time_series and since is not None:
+            conditions.append(f"{date_col} >= %s")
+            params.append(since)
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        # --- Time-series: one scan, every bucket x group with its row count and metrics ---
+        if time_series:
+            keys = ", ".join(["period", *group_by])
+            select_parts = [f"DATE_TRUNC('{trunc}', {date_col}) AS period", *group_by, "COUNT(*) AS fraud_count"]
+            select_parts += [f"{_metric_sql(col, agg, self._valid_columns)} AS {col}_{agg}" for col, agg in metrics.items()]
+            # One row past the cap is enough to know the series is too long (see `_cap_points`)
+            query = f"""
+                SELECT {', '.join(select_parts)}
+                FROM {self.table_name} {where_clause}
+                GROUP BY {keys}
+                ORDER BY {keys}
+                LIMIT %s;
+            """
+            return "time_series", columns, [(query, params + [self.max_time_series_points + 1])], {}
+
+        # --- Distinct ---
+        if distinct:
+            cols_str = ", ".join(columns)
+            query = f"SELECT DISTINCT {cols_str} FROM {self.table_name} {where_clause} LIMIT 50;"
+
+            # Total distinct count
+            if len(columns) == 1:
+                count_query = f"SELECT COUNT(DISTINCT {columns[0]}) AS total_count FROM {self.table_name} {where_clause};"
+            else:
+                count_query = f"SELECT COUNT(*) AS total_count FROM (SELECT DISTINCT {cols_str} FROM {self.table_name} {where_clause}) AS sub;"
+            estimate_query = f"SELECT DISTINCT {cols_str} FROM {self.table_name} {where_clause}"
+            return "distinct", columns, [(query, params), (count_query, params)], {1: (estimate_query, params)}
+
+        # --- Grouped summary with metrics ---
+        select_parts = columns.copy()
+        metric_aliases = {}
+        for col, agg in metrics.items():
+            alias = f"{col}_{agg}"
+            metric_aliases[alias] = f"{_metric_sql(col, agg, self._valid_columns)} AS {alias}"
+            select_parts.append(metric_aliases[alias])
+
+        group_by_cols = ", ".join(columns) if columns else ""
+        select_sql = ", ".join(select_parts) if select_parts else "COUNT(*) AS count"
+        query = f"SELECT {select_sql} FROM {self.table_name} {where_clause}"
+        if columns:
+            query += f" GROUP BY {group_by_cols}"
+
+        # Order by (support metrics aliases)
+        if order_by:
+            order_clauses = []
+            for o in order_by:
+                col = o.get("column")
+                order = str(o.get("order", "asc")).upper()
+                # Both go into the SQL: only known columns / metric aliases and ASC / DESC
+                if (col not in self._valid_columns and col not in metric_aliases) or order not in ("ASC", "DESC"):
+                    raise AppError(
+                        status_code=400,
+                        code="invalid_order_by",
+                        message="order_by items need a column (or a metric alias like 'amt_sum') and an order of 'asc' or 'desc'",
+                    )
+                order_clauses.append(f"{col} {order}")
+            query += f" ORDER BY {', '.join(order_clauses)}"
+
+        # LIMIT is a parameter so every limit value shares one prepared statement
+        query += " LIMIT %s;"
+        return "summary", columns, [(query, params + [limit])], {}
+
+    def _format_result(self, mode: str, columns: List[str], results: List[List[Any]]) -> Dict[str, Any]:
+        """Shape the fetched rows of each statement into the tool response."""
+        if mode == "time_series":
+            rows = results[0]
+            return self._cap_points({"time_series": rows, "count": len(rows)})
+
+        if mode == "distinct":
+            rows, count_rows = results
+            result = {col: [row[col] for row in rows] for col in columns}  # type: ignore
+            total_count = count_rows[0]["total_count"] if count_rows else 0  # type: ignore
+            return {"distinct_values": result, "count": total_count}
+
+        rows = results[0]
+        return {"summary": rows, "count": len(rows)}
+
+    # -------------------------------------------
+    # Columnar snapshot
+    # -------------------------------------------
+    def _run_snapshot(self, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The request answered in-process from the snapshot; None when the database has to answer it."""
+        args = self._summary_args(kwargs)
+        args.pop("approximate")  # the snapshot answers exactly
+        if not args["columns"] and not args["time_series"] and not args["distinct"]:
+            return None  # the database path raises missing_columns
         try:
-            with self.db.get_cursor() as cur:
-                # WHERE clause
-                where_clause, params = self._build_filter_clause(filters)
-                where_clause = "WHERE " + " AND ".join(where_clause) if where_clause else ""
-
-                # --- Time-series ---
-                if time_series:
-                    date_col = time_series["date_column"]
-                    trunc = {"day": "DAY", "month": "MONTH", "year": "YEAR"}.get(time_series.get("granularity", "day"))
-                    query = f"""
-                        SELECT DATE_TRUNC('{trunc}', {date_col}) AS period, COUNT(*) AS fraud_count
-                        FROM {self.table_name} {where_clause}
-                        GROUP BY period
-                        ORDER BY period ASC;
-                    """
-                    cur.execute(query, params)
-                    rows = cur.fetchall()
-                    return {"time_series": rows, "count": len(rows)}
+            result = self.engine.summarize(self.snapshot.data(self.db), **args)  # type: ignore
+        except Exception as e:
+            logger.warning("Snapshot summary failed, using the database: %s", e)
+            result = None
+        if result is None:
+            self.snapshot.record("unsupported")  # type: ignore
+            return None
+        return self._cap_points(result) if "time_series" in result else result
 
-                # --- Distinct ---
-                if distinct:
-                    cols_str = ", ".join(columns)
-                    query = f"SELECT DISTINCT {cols_str} FROM {self.table_name} {where_clause} LIMIT 50;"
-                    cur.execute(query, params)
-                    rows = cur.fetchall()
-                    result = {col: [row[col] for row in rows] for col in columns}  # type: ignore
-
-                    # Total distinct count
-                    if len(columns) == 1:
-                        count_query = f"SELECT COUNT(DISTINCT {columns[0]}) AS total_count FROM {self.table_name} {where_clause};"
-                    else:
-                        count_query = f"SELECT COUNT(*) AS total_count FROM (SELECT DISTINCT {cols_str} FROM {self.table_name} {where_clause}) AS sub;"
-                    cur.execute(count_query, params)
-                    row = cur.fetchone()
-                    total_count = row["total_count"] if row else 0  # type: ignore
-                    return {"distinct_values": result, "count": total_count}
-
-                # --- Grouped summary with metrics ---
-                select_parts = columns.copy()
-                metric_aliases = {}
-                for col, agg in metrics.items():
-                    alias = f"{col}_{agg}"
-                    metric_aliases[alias] = f"{agg.upper()}({col}) AS {alias}"
-                    select_parts.append(metric_aliases[alias])
-
-                group_by_cols = ", ".join(columns) if columns else ""
-                select_sql = ", ".join(select_parts) if select_parts else "COUNT(*) AS count"
-                query = f"SELECT {select_sql} FROM {self.table_name} {where_clause}"
-                if columns:
-                    query += f" GROUP BY {group_by_cols}"
-
-                # Order by (support metrics aliases)
-                if order_by:
-                    order_clauses = []
-                    for o in order_by:
-                        col = o["column"]
-                        order = o.get("order", "asc").upper()
-                        if col in metric_aliases:
-                            order_clauses.append(f"{col} {order}")
-                        else:
-                            order_clauses.append(f"{col} {order}")
-                    query += f" ORDER BY {', '.join(order_clauses)}"
-
-                query += f" LIMIT {limit};"
-
-                cur.execute(query, params)
-                rows = cur.fetchall()
-                return {"summary": rows, "count": len(rows)}
+    def _verify(self, kwargs: Dict[str, Any], local: Dict[str, Any], remote: Dict[str, Any]) -> None:
+        """verify mode: compare the snapshot's answer with the database's (which is the one returned)."""
+        if "error" in remote:
+            return
+        args = self._summary_args(kwargs)
+        if results_match(local, remote, args["limit"], args["order_by"]):
+            self.snapshot.record("verified")  # type: ignore
+            return
+        self.snapshot.record("mismatches")  # type: ignore
+        logger.warning("Snapshot result differs from the database for %s", json.dumps(args, sort_keys=True, default=str))
+
+    # -------------------------------------------
+    # Approximate distinct (column sketches)
+    # -------------------------------------------
+    def _run_sketches(self, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """`approximate` distinct of one unfiltered sketched column; None when the exact path has to answer."""
+        args = self._summary_args(kwargs)
+        columns = args["columns"]
+        if (
+            self.sketches is None or not args["approximate"] or not args["distinct"] or args["time_series"]
+            or args["filters"] or len(columns) != 1 or columns[0] not in SKETCH_COLUMNS
+        ):
+            return None
+        sketch = self.sketches.sketches(self.db)[0][columns[0]]
+        top = sketch.items.top(args["limit"])
+        # While every value still has its own counter, the summary is exact
+        exact = sketch.items.error == 0
+        return {
+            "distinct_values": {columns[0]: [value for value, _ in top]},
+            "count": len(sketch.items.counts) if exact else sketch.hll.estimate(),
+            "count_is_estimate": not exact,
+            "top_values": [{"value": value, "count": count} for value, count in top],
+            # Each top count is at most this much below the true one
+            "top_values_max_error": sketch.items.error,
+        }
+
+    # -------------------------------------------
+    # Time series
+    # -------------------------------------------
+    def _closed_buckets(self, kwargs: Dict[str, Any]) -> Optional[Tuple[CacheKey, int, Optional[Dict[str, Any]]]]:
+        """Cache slot of a time series' closed buckets: (key, generation, cached entry); None if not cacheable.
+
+        The entry holds the rows of every bucket before `open_from`; later calls only query
+        from there on. Writes drop it like any cached result.
+        """
+        args = self._summary_args(kwargs)
+        time_series = args["time_series"]
+        if (
+            not time_series or not self.cache.enabled or in_shared_snapshot()
+            or time_series.get("date_column") not in _TIMESTAMP_COLUMNS
+        ):
+            return None
+        spec = {
+            "metrics": args["metrics"],
+            "filters": args["filters"],
+            "time_series": {k: v for k, v in time_series.items() if k != "fill_gaps"},
+        }
+        key = (self.table_name, f"{self.name}:closed_buckets", json.dumps(spec, sort_keys=True, default=str))
+        return key, self.cache.generation(self.table_name), self.cache.get(key)
+
+    def _merge_closed(
+        self, kwargs: Dict[str, Any], closed: Tuple[CacheKey, int, Optional[Dict[str, Any]]], result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Cached closed buckets + the freshly queried ones; caches the buckets that are closed now."""
+        key, generation, cached = closed
+        rows = (cached["rows"] if cached else []) + [dict(row) for row in result["time_series"]]
+        open_from = open_bucket(self._summary_args(kwargs)["time_series"].get("granularity", "day"))
+        entry = {"open_from": open_from, "rows": [row for row in rows if row["period"] < open_from]}
+        self.cache.put(key, entry, generation, ttl=self.closed_bucket_ttl)
+        return self._cap_points({"time_series": rows, "count": len(rows)})
+
+    def _cap_points(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """A time series with more than `max_time_series_points` bucket x group rows becomes a rejection.
+
+        Hourly buckets split by a column reach tens of thousands of rows, far more than the
+        agent can read; it is asked for a coarser request instead of getting a cut series.
+        """
+        if result["count"] <= self.max_time_series_points:
+            return result
+        return {
+            "error": "too_many_points",
+            "message": (
+                f"This time series has more than {self.max_time_series_points} buckets x groups. "
+                "Use a coarser granularity (e.g. day or week instead of hour), fewer group_by columns, "
+                "or a narrower date range and try again."
+            ),
+            "max_points": self.max_time_series_points,
+        }
+    def _fill_gaps(self, kwargs: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        time_series = self._summary_args(kwargs)["time_series"]
+        if not time_series or not time_series.get("fill_gaps") or "time_series" not in result:
+            return result
+        filled = fill_gaps(result["time_series"], time_series.get("granularity", "day"), time_series.get("group_by") or [])
+        if filled is None:
+            return {**result, "gaps_filled": False}  # too many buckets: left sparse
+        return {"time_series": filled, "count": len(filled)}
+
+    def _local_paths(self) -> bool:
+        """Sketches and the columnar snapshot answer from their own copy, never from a shared snapshot."""
+        return not in_shared_snapshot()
+
+    @cached_result
+    def run(self, **kwargs) -> Dict[str, Any]:
+        local_paths = self._local_paths()
+        approximate = self._run_sketches(kwargs) if local_paths else None
+        if approximate is not None:
+            return approximate
+        local = self._run_snapshot(kwargs) if self.snapshot is not None and local_paths else None
+        if local is not None and self.snapshot_mode == "on":
+            self.snapshot.record("served")  # type: ignore
+            return self._fill_gaps(kwargs, local)
+        result = self._run_database(**kwargs)
+        if local is not None:
+            self._verify(kwargs, local, result)
+        return self._fill_gaps(kwargs, result)
+
+    @cached_result
+    async def arun(self, **kwargs) -> Dict[str, Any]:
+        # Refreshes COPY through the sync pool and group-bys are CPU work: both off the event loop
+        local_paths = self._local_paths()
+        approximate = (
+            await asyncio.to_thread(self._run_sketches, kwargs) if kwargs.get("approximate") and local_paths else None
+        )
+        if approximate is not None:
+            return approximate
+        local = await asyncio.to_thread(self._run_snapshot, kwargs) if self.snapshot is not None and local_paths else None
+        if local is not None and self.snapshot_mode == "on":
+            self.snapshot.record("served")  # type: ignore
+            return self._fill_gaps(kwargs, local)
+        result = await self._arun_database(**kwargs)
+        if local is not None:
+            self._verify(kwargs, local, result)
+        return self._fill_gaps(kwargs, result)
+
+    # -------------------------------------------
+    # Database
+    # -------------------------------------------
+    @primary_fallback
+    def _run_database(self, **kwargs) -> Dict[str, Any]:
+        use_rollups = self.rollups is not None and rollups_ready(self.db)
+        closed = self._closed_buckets(kwargs)
+        since = closed[2]["open_from"] if closed and closed[2] else None
+        mode, columns, statements, estimates = self._build_statements(use_rollups, since=since, **kwargs)
+
+        try:
+            with self.db.get_cursor(readonly=True, caller=self.name) as cur:
+                try:
+                    self.guard.begin(cur)
+                    results: List[List[Any]] = []
+                    count_is_estimate = False
+                    for index, (query, params) in enumerate(statements):
+                        estimate = self.guard.estimate(cur, query, params)
+                        if self.guard.exceeds(estimate):
+                            if index not in estimates:
+                                return self.guard.rejection(estimate)
+                            # Downgrade to the planner's row estimate
+                            fallback = self.guard.estimate(cur, *estimates[index])
+                            results.append([{"total_count": int(fallback["rows"])}])
+                            count_is_estimate = True
+                            continue
+                        self.db.execute_prepared(cur, query, params)
+                        results.append(cur.fetchall())
+                except psycopg2.errors.QueryCanceled:
+                    return self.guard.timeout_rejection()
+
+            result = self._format_result(mode, columns, results)
+            if count_is_estimate:
+                result["count_is_estimate"] = True
+            if closed is not None and "error" not in result:
+                result = self._merge_closed(kwargs, closed, result)
+            return result
 
         except AppError:
             raise
         except Exception as e:
             raise AppError(status_code=500, code="fraud_summary_failed", message=f"Unexpected error: {str(e)}")
 
+    @primary_fallback
+    async def _arun_database(self, **kwargs) -> Dict[str, Any]:
+        use_rollups = self.rollups is not None and await arollups_ready(self.async_db)
+        closed = self._closed_buckets(kwargs)
+        since = closed[2]["open_from"] if closed and closed[2] else None
+        mode, columns, statements, estimates = self._build_statements(use_rollups, since=since, **kwargs)
+
+        try:
+            async with self.async_db.get_cursor(readonly=True, caller=self.name) as cur:
+                try:
+                    await self.guard.abegin(cur)
+                    results: List[List[Any]] = []
+                    count_is_estimate = False
+                    for index, (query, params) in enumerate(statements):
+                        estimate = await self.guard.aestimate(cur, query, params)
+                        if self.guard.exceeds(estimate):
+                            if index not in estimates:
+                                return self.guard.rejection(estimate)
+                            fallback = await self.guard.aestimate(cur, *estimates[index])
+                            results.append([{"total_count": int(fallback["rows"])}])
+                            count_is_estimate = True
+                            continue
+                        await self.async_db.execute_prepared(cur, query, params)
+                        results.append(await cur.fetchall())
+                except psycopg.errors.QueryCanceled:
+                    return self.guard.timeout_rejection()
+
+            result = self._format_result(mode, columns, results)
+            if count_is_estimate:
+                result["count_is_estimate"] = True
+            if closed is not None and "error" not in result:
+                result = self._merge_closed(kwargs, closed, result)
+            return result
+
+        except AppError:
+            raise
+        except Exception as e:
+            raise AppError(status_code=500, code="fraud_summary_failed", message=f"Unexpected error: {str(e)}")
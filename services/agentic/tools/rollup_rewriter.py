@@ -0,0 +1,194 @@
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Tuple
+from business.domain.supabase.rollups import ROLLUP_DATE_COLUMN, ROLLUP_DIMENSIONS, ROLLUP_TABLE, TOTAL_DIMENSION
+from business.model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
+from business.usecase.fraud_transactions.filters import text_match
+
+
+Statements = List[Tuple[str, List[Any]]]
+Rewrite = Tuple[str, List[str], Statements, Dict[int, Tuple[str, List[Any]]]]
+
+_COMPARISONS = {"gt": ">", "lt": "<", "gte": ">=", "lte": "<="}
+_TRUNCS = {"day": "DAY", "week": "WEEK", "month": "MONTH", "year": "YEAR"}  # no hours: the rollup is daily
+# NULLs are not rolled up: these columns cannot be grouped or COUNTed from the rollup
+_NULLABLE = {name for name, field in FraudTransactionModel.model_fields.items() if not field.is_required()}
+
+# Rollup columns standing in for COUNT(*), SUM(amt) and the fraud count, by is_fraud filter
+_MEASURES = {
+    None: ("txn_count", "amt_sum", "fraud_count"),
+    True: ("fraud_count", "fraud_amt_sum", "fraud_count"),
+    False: ("(txn_count - fraud_count)", "(amt_sum - fraud_amt_sum)", "0"),
+}
+
+
+class RollupRewriter:
+    """Answer fraud_summary_tool requests from the day x dimension rollup when it gives the same result.
+
+    A request is eligible when it groups by (or splits a time series by), filters on or lists
+    distinct values of at most one rollup dimension (state, category, gender, merchant; the
+    nullable gender only as a filter),
+    filters is_fraud only by equality, bounds trans_date_trans_time only with day-aligned
+    `gte` / `lt`, and aggregates only COUNT / SUM / AVG of amt and is_fraud (or COUNT of a
+    rolled-up column). `rewrite` returns None for anything else and the tool queries the base table.
+    """
+
+    def rewrite(
+        self,
+        columns: List[str],
+        metrics: Dict[str, str],
+        distinct: bool,
+        filters: Dict[str, Any],
+        limit: int,
+        order_by: List[Dict[str, str]],
+        time_series: Optional[Dict[str, Any]],
+        since: Optional[datetime] = None,
+    ) -> Optional[Rewrite]:
+        # Time series ignore `columns`: their own group_by and the filters pick the dimension
+        group_by = (time_series.get("group_by") or []) if time_series else columns
+        dimensions = {col for col in filters if col in ROLLUP_DIMENSIONS}
+        dimensions |= {col for col in group_by if col in ROLLUP_DIMENSIONS}
+        if len(dimensions) > 1:
+            return None
+        dimension = next(iter(dimensions), None)
+
+        where = self._where(dimension, filters)
+        if where is None:
+            return None
+        clauses, params, is_fraud = where
+        count, amt, fraud = _MEASURES[is_fraud]
+        if any(col not in ROLLUP_DIMENSIONS or col in _NULLABLE for col in group_by):
+            return None
+
+        # --- Time-series ---
+        if time_series:
+            trunc = _TRUNCS.get(time_series.get("granularity", "day"))
+            if time_series.get("date_column") != ROLLUP_DATE_COLUMN or trunc is None:
+                return None
+            if since is not None:
+                clauses.append("day >= %s")
+                params.append(since.date())  # a bucket start, so midnight
+            select_parts = [f"DATE_TRUNC('{trunc}', day::timestamp) AS period"]
+            select_parts += [f"value AS {col}" for col in group_by]
+            select_parts.append(f"SUM({count})::bigint AS fraud_count")
+            for col, agg in metrics.items():
+                expression = self._metric(col, agg.lower(), count, amt, fraud)
+                if expression is None:
+                    return None
+                select_parts.append(f"{expression} AS {col}_{agg}")
+            keys = ", ".join(["period", *group_by])
+            query = f"""
+                SELECT {', '.join(select_parts)}
+                FROM {ROLLUP_TABLE} WHERE {' AND '.join(clauses)}
+                GROUP BY period{", value" if group_by else ""}
+                HAVING SUM({count}) > 0
+                ORDER BY {keys};
+            """
+            return "time_series", columns, [(query, params)], {}
+
+        where_sql = f"FROM {ROLLUP_TABLE} WHERE {' AND '.join(clauses)}"
+        grouped = f"{where_sql} GROUP BY value HAVING SUM({count}) > 0"
+
+        # --- Distinct ---
+        if distinct:
+            if len(columns) != 1:
+                return None
+            query = f"SELECT value AS {columns[0]} {grouped} LIMIT 50;"
+            count_query = f"SELECT COUNT(*) AS total_count FROM (SELECT value {grouped}) AS sub;"
+            estimate_query = f"SELECT value {grouped}"
+            return "distinct", columns, [(query, params), (count_query, params)], {1: (estimate_query, params)}
+
+        # --- Grouped summary with metrics ---
+        select_parts = [f"value AS {col}" for col in columns]
+        aliases = set(columns)
+        for col, agg in metrics.items():
+            expression = self._metric(col, agg.lower(), count, amt, fraud)
+            if expression is None:
+                return None
+            alias = f"{col}_{agg}"
+            select_parts.append(f"{expression} AS {alias}")
+            aliases.add(alias)
+        query = f"SELECT {', '.join(select_parts)} {grouped}"
+        if order_by:
+            if any(o["column"] not in aliases or o.get("order", "asc").lower() not in ("asc", "desc") for o in order_by):
+                return None
+            query += " ORDER BY " + ", ".join(f"{o['column']} {o.get('order', 'asc').upper()}" for o in order_by)
+        query += " LIMIT %s;"
+        return "summary", columns, [(query, params + [limit])], {}
+
+    # -------------------------------------------
+    # Filters
+    # -------------------------------------------
+    def _where(
+        self, dimension: Optional[str], filters: Dict[str, Any]
+    ) -> Optional[Tuple[List[str], List[Any], Optional[bool]]]:
+        """Rollup WHERE clauses, params and the is_fraud filter; None when a filter cannot be rewritten."""
+        clauses: List[str] = ["dimension = %s"]
+        params: List[Any] = [dimension or TOTAL_DIMENSION]
+        is_fraud: Optional[bool] = None
+
+        for key, value in filters.items():
+            if key == "is_fraud":
+                if not isinstance(value, bool):
+                    return None
+                is_fraud = value
+            elif key == ROLLUP_DATE_COLUMN:
+                if not isinstance(value, dict) or not value or set(value) - {"gte", "lt"}:
+                    return None
+                for op, bound in value.items():
+                    day = _day_boundary(bound)
+                    if day is None:
+                        return None
+                    clauses.append(f"day {_COMPARISONS[op]} %s")
+                    params.append(day)
+            elif key == dimension:
+                # Same operators as the base table filter, applied to the rolled-up value
+                if isinstance(value, dict):
+                    if "not" in value:
+                        clauses.append("value != %s")
+                        params.append(value["not"])
+                    for op, sql_op in _COMPARISONS.items():
+                        if op in value:
+                            clauses.append(f"value {sql_op} %s")
+                            params.append(value[op])
+                elif isinstance(value, str):
+                    clause, param = text_match("value", value)
+                    clauses.append(clause)
+                    params.append(param)
+                else:
+                    clauses.append("value = %s")
+                    params.append(value)
+            else:
+                return None
+        return clauses, params, is_fraud
+
+    # -------------------------------------------
+    # Metrics
+    # -------------------------------------------
+    def _metric(self, col: str, agg: str, count: str, amt: str, fraud: str) -> Optional[str]:
+        if agg == "count" and col in (*ROLLUP_DIMENSIONS, ROLLUP_DATE_COLUMN, "amt", "is_fraud") and col not in _NULLABLE:
+            return f"SUM({count})::bigint"
+        if col == "amt" and agg == "sum":
+            return f"SUM({amt})::double precision"
+        if col == "amt" and agg == "avg":
+            return f"(SUM({amt}) / NULLIF(SUM({count}), 0))::double precision"
+        if col == "is_fraud" and agg == "sum":
+            return f"SUM({fraud})::bigint"
+        if col == "is_fraud" and agg in ("avg", "rate"):
+            return f"(SUM({fraud}) / NULLIF(SUM({count}), 0)::numeric)::double precision"
+        return None
+
+
+def _day_boundary(value: Any) -> Optional[date]:
+    """The date of a midnight timestamp bound (a date, or an ISO date / datetime string); None otherwise."""
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, date):
+        return value
+    else:
+        try:
+            moment = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if moment.tzinfo is not None or moment.time() != time.min:
+        return None
+    return moment.date()
@@ -0,0 +1,474 @@
+import math
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from business.usecase.fraud_transactions.snapshot import SnapshotData
+
+
+_COMPARISONS = {"gt": np.greater, "lt": np.less, "gte": np.greater_equal, "lte": np.less_equal}
+_TRUNCS = {"hour": "h", "day": "D", "week": "W", "month": "M", "year": "Y"}
+# NumPy weeks start on Thursday (the 1970-01-01 epoch): Monday + 3 days is the Thursday of its week
+_WEEK_SHIFT = np.timedelta64(3, "D")
+_TRUE_STRINGS = {"t", "true", "y", "yes", "on", "1"}
+_FALSE_STRINGS = {"f", "false", "n", "no", "off", "0"}
+
+
+class Unsupported(Exception):
+    """The request needs something the engine does not reproduce exactly; Postgres answers it."""
+
+
+class SnapshotEngine:
+    """Run fraud_summary_tool requests on a `SnapshotData` with vectorised NumPy group-bys.
+
+    Results have the same shape and values as the SQL the tool builds (filter grammar of
+    `build_filter_clause`, NULL groups, NULLS LAST / FIRST ordering, LIMIT). Anything the
+    engine cannot reproduce exactly, such as text ordering under a non-byte-order collation,
+    an aggregate the database would reject, or a value Postgres would cast differently,
+    makes `summarize` return None so the tool falls back to the database.
+    """
+
+    def summarize(
+        self,
+        data: SnapshotData,
+        columns: List[str],
+        metrics: Dict[str, str],
+        distinct: bool,
+        filters: Dict[str, Any],
+        limit: int,
+        order_by: List[Dict[str, str]],
+        time_series: Optional[Dict[str, str]],
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            mask = self._filter(data, filters)
+            if time_series:
+                return self._time_series(data, mask, time_series, metrics)
+            if distinct:
+                return self._distinct(data, mask, columns)
+            return self._summary(data, mask, columns, metrics, limit, order_by)
+        except Unsupported:
+            return None
+
+    # -------------------------------------------
+    # Filters (same grammar as business.usecase.fraud_transactions.filters)
+    # -------------------------------------------
+    def _filter(self, data: SnapshotData, filters: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(data.rows, dtype=bool)
+        for key, value in filters.items():
+            _require_column(data, key)
+            if isinstance(value, dict):
+                if "not" in value:
+                    mask &= self._compare(data, key, np.not_equal, value["not"])
+                for op, compare in _COMPARISONS.items():
+                    if op in value:
+                        mask &= self._compare(data, key, compare, value[op])
+            elif isinstance(value, str) and data.is_text(key):
+                mask &= self._text_match(data, key, value)
+            else:
+                mask &= self._compare(data, key, np.equal, value)
+        return mask
+
+    def _compare(self, data: SnapshotData, column: str, compare: Any, value: Any) -> np.ndarray:
+        """`column <op> value` for every row; NULL never matches (as in SQL)."""
+        if value is None:
+            return np.zeros(data.rows, dtype=bool)
+        if data.is_text(column):
+            if not isinstance(value, str):
+                raise Unsupported(column)  # text = integer is an error in Postgres
+            if compare is not np.not_equal and compare is not np.equal and not data.byte_order_text:
+                raise Unsupported(column)  # ordering depends on the database collation
+            matches = np.array([bool(compare(v, value)) for v in data.dictionaries[column]] + [False], dtype=bool)
+            return matches[data.arrays[column]]
+        scalar = _scalar(data.arrays[column], value)
+        return compare(data.arrays[column], scalar) & ~data.nulls(column)
+
+    def _text_match(self, data: SnapshotData, column: str, value: str) -> np.ndarray:
+        """`text_match`: ILIKE when the value has `%`, else lower(column) = lower(value), per distinct value."""
+        if "%" in value:
+            pattern = _like_regex(value)
+            matches = [pattern.fullmatch(v) is not None for v in data.dictionaries[column]]
+        else:
+            lowered = value.lower()
+            matches = [v.lower() == lowered for v in data.dictionaries[column]]
+        return np.array(matches + [False], dtype=bool)[data.arrays[column]]
+
+    # -------------------------------------------
+    # Group-by
+    # -------------------------------------------
+    def _group(
+        self,
+        data: SnapshotData,
+        columns: List[str],
+        mask: np.ndarray,
+        leading: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> Tuple[np.ndarray, int, Dict[str, np.ndarray]]:
+        """Group the rows in `mask` by `columns`: (group of each row, group count, key values per group).
+
+        `leading` is a key computed by the caller, (distinct values, code of each row), grouped
+        first under the name "period".
+        """
+        names: List[str] = []
+        codes, uniques = [], []
+        if leading is not None:
+            names.append("period")
+            uniques.append(leading[0])
+            codes.append(leading[1])
+        for col in columns:
+            _require_column(data, col)
+            unique, inverse = _factorize(data, col, data.arrays[col][mask])
+            names.append(col)
+            uniques.append(unique)
+            codes.append(inverse)
+        # One integer key per row (mixed radix over the per-column codes) while it fits in int64
+        sizes = [len(unique) for unique in uniques]
+        if math.prod(sizes) < 2 ** 62:
+            combined = np.zeros(int(mask.sum()), dtype=np.int64)
+            for code, size in zip(codes, sizes):
+                combined = combined * size + code
+            groups, inverse = _dense(combined, math.prod(sizes))
+            keys: Dict[str, np.ndarray] = {}
+            remainder = groups
+            for col, unique, size in reversed(list(zip(names, uniques, sizes))):
+                keys[col] = unique[remainder % size]
+                remainder = remainder // size
+            return inverse, len(groups), keys
+        groups, inverse = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+        keys = {col: uniques[i][groups[:, i]] for i, col in enumerate(names)}
+        return inverse.reshape(-1), len(groups), keys
+
+    def _aggregate(
+        self, data: SnapshotData, column: str, agg: str, mask: np.ndarray, inverse: np.ndarray, size: int
+    ) -> np.ndarray:
+        """One value per group (object array, None where SQL gives NULL)."""
+        _require_column(data, column)
+        values = data.arrays[column][mask]
+        valid = ~data.nulls(column)[mask]
+        counts = np.bincount(inverse[valid], minlength=size)
+        if agg == "count":
+            return counts.astype(object)
+
+        kind = values.dtype.kind
+        if agg == "rate":
+            if kind != "b":
+                raise Unsupported(f"{agg}({column})")
+            trues = np.bincount(inverse[valid], weights=values[valid].astype(np.float64), minlength=size)
+            return np.array([t / c if c else None for t, c in zip(trues, counts)], dtype=object)
+        # Postgres has no SUM / AVG / MIN / MAX of text or boolean, nor SUM / AVG of timestamps
+        if data.is_text(column) or kind not in "iufM" or (kind == "M" and agg in ("sum", "avg")):
+            raise Unsupported(f"{agg}({column})")
+
+        if agg in ("sum", "avg"):
+            if kind == "f" or np.abs(values[valid]).sum(dtype=np.float64) < 2 ** 53:
+                totals = np.bincount(inverse[valid], weights=values[valid], minlength=size)
+                if kind != "f":
+                    totals = totals.astype(np.int64)  # exact: every partial sum is below 2**53
+            else:
+                totals = np.zeros(size, dtype=object)
+                np.add.at(totals, inverse[valid], values[valid].astype(object))
+            if agg == "avg":
+                totals = np.array([float(t) / c if c else 0.0 for t, c in zip(totals, counts)], dtype=object)
+            result = totals.astype(object)
+        elif agg in ("min", "max"):
+            order = np.argsort(inverse[valid], kind="stable")
+            grouped, sorted_values = inverse[valid][order], values[valid][order]
+            result = np.full(size, None, dtype=object)
+            if len(grouped):
+                starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+                reduce = np.minimum if agg == "min" else np.maximum
+                result[grouped[starts]] = list(reduce.reduceat(sorted_values, starts))
+        else:
+            raise Unsupported(agg)
+        result[counts == 0] = None
+        return result
+
+    # -------------------------------------------
+    # Modes
+    # -------------------------------------------
+    def _summary(
+        self,
+        data: SnapshotData,
+        mask: np.ndarray,
+        columns: List[str],
+        metrics: Dict[str, str],
+        limit: int,
+        order_by: List[Dict[str, str]],
+    ) -> Dict[str, Any]:
+        if not columns:
+            raise Unsupported("ungrouped")
+        inverse, size, keys = self._group(data, columns, mask)
+        outputs: Dict[str, np.ndarray] = {col: keys[col] for col in columns}
+        for col, agg in metrics.items():
+            outputs[f"{col}_{agg}"] = self._aggregate(data, col, agg.lower(), mask, inverse, size)
+
+        order = np.arange(size)
+        if order_by:
+            order = self._order(data, outputs, columns, order_by)
+        order = order[:limit]
+
+        decoded = {name: _python_values(data, name, values[order]) for name, values in outputs.items()}
+        rows = [dict(zip(decoded, row)) for row in zip(*decoded.values())]
+        return {"summary": rows, "count": len(rows)}
+
+    def _order(
+        self, data: SnapshotData, outputs: Dict[str, np.ndarray], columns: List[str], order_by: List[Dict[str, str]]
+    ) -> np.ndarray:
+        """Group positions in ORDER BY order (ASC NULLS LAST / DESC NULLS FIRST, like Postgres)."""
+        sort_keys: List[np.ndarray] = []
+        for item in order_by:
+            name, direction = item["column"], item.get("order", "asc").lower()
+            if name not in outputs or direction not in ("asc", "desc"):
+                raise Unsupported(name)
+            values = outputs[name]
+            ranks = np.zeros(len(values), dtype=np.int64)
+            if name in columns and data.is_text(name):
+                if not data.byte_order_text:
+                    raise Unsupported(name)  # text order depends on the database collation
+                nulls = values < 0
+                dictionary_ranks = _ranks(data.dictionaries[name])
+                ranks[~nulls] = dictionary_ranks[values[~nulls]]
+            else:
+                nulls = np.array([_is_null(v) for v in values], dtype=bool)
+                ranks[~nulls] = _ranks(values[~nulls])
+            if direction == "desc":
+                ranks, nulls = -ranks, ~nulls
+            # np.lexsort sorts by the last key first: earlier ORDER BY items go last
+            sort_keys = [ranks, nulls.astype(np.int8)] + sort_keys
+        return np.lexsort(sort_keys)
+
+    def _distinct(self, data: SnapshotData, mask: np.ndarray, columns: List[str]) -> Dict[str, Any]:
+        if not columns:
+            raise Unsupported("distinct")
+        _, size, keys = self._group(data, columns, mask)
+        if len(columns) == 1:
+            # COUNT(DISTINCT col) leaves NULL out; SELECT DISTINCT keeps it
+            total = int(np.count_nonzero(~_null_values(data, columns[0], keys[columns[0]])))
+        else:
+            total = size
+        values = {col: _python_values(data, col, keys[col][:50]) for col in columns}
+        return {"distinct_values": values, "count": total}
+
+    def _time_series(
+        self, data: SnapshotData, mask: np.ndarray, time_series: Dict[str, Any], metrics: Dict[str, str]
+    ) -> Dict[str, Any]:
+        column = time_series.get("date_column", "")
+        unit = _TRUNCS.get(time_series.get("granularity", "day"))
+        group_by = time_series.get("group_by") or []
+        _require_column(data, column)
+        values = data.arrays[column]
+        if unit is None or values.dtype.kind != "M" or np.datetime_data(values.dtype)[0] == "D":
+            raise Unsupported(column)  # DATE_TRUNC of a date column returns timestamptz
+        if "period" in group_by:
+            raise Unsupported("period")
+
+        selected = values[mask]
+        if unit == "W":
+            periods = ((selected + _WEEK_SHIFT).astype("datetime64[W]") - _WEEK_SHIFT).astype(values.dtype)
+        else:
+            periods = selected.astype(f"datetime64[{unit}]").astype(values.dtype)
+        unique, inverse = np.unique(periods, return_inverse=True)  # NaT (NULL): one bucket
+        inverse, size, keys = self._group(data, group_by, mask, leading=(unique, inverse.reshape(-1)))
+
+        outputs: Dict[str, np.ndarray] = {"period": keys["period"]}
+        outputs.update({col: keys[col] for col in group_by})
+        outputs["fraud_count"] = np.bincount(inverse, minlength=size).astype(object)
+        for col, agg in metrics.items():
+            outputs[f"{col}_{agg}"] = self._aggregate(data, col, agg.lower(), mask, inverse, size)
+
+        # ORDER BY period, group_by...: text keys need the database's collation to be byte order
+        order = self._order(data, outputs, group_by, [{"column": name} for name in ["period", *group_by]])
+        decoded = {name: _python_values(data, name, values[order]) for name, values in outputs.items()}
+        rows = [dict(zip(decoded, row)) for row in zip(*decoded.values())]
+        return {"time_series": rows, "count": len(rows)}
+
+
+# -------------------------------------------
+# Value helpers
+# -------------------------------------------
+def _require_column(data: SnapshotData, column: str) -> None:
+    if column not in data.arrays:
+        raise Unsupported(column)
+
+
+def _dense(codes: np.ndarray, bound: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(distinct codes ascending, position of each row's code among them) for integer codes in [0, bound).
+
+    A counting pass when `bound` is small next to the row count, otherwise a sort.
+    """
+    if bound <= max(4 * len(codes), 1024):
+        present = np.bincount(codes, minlength=bound) > 0
+        return np.flatnonzero(present), (np.cumsum(present) - 1)[codes]
+    unique, inverse = np.unique(codes, return_inverse=True)
+    return unique, inverse.reshape(-1)
+
+
+def _factorize(data: SnapshotData, column: str, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(distinct values, code of each row) of one group-by column; NULL is one more value."""
+    if data.is_text(column):
+        # Dictionary codes are already small integers: no sort (NULL's -1 shifts to 0)
+        unique, inverse = _dense(values.astype(np.int64) + 1, len(data.dictionaries[column]) + 1)
+        return (unique - 1).astype(np.int32), inverse
+    if values.dtype == object:
+        raise Unsupported(column)
+    unique, inverse = np.unique(values, return_inverse=True)  # NaN / NaT: one group, sorted last
+    return unique, inverse.reshape(-1)
+
+
+def _scalar(values: np.ndarray, value: Any) -> Any:
+    """`value` as the column's type, the way Postgres casts a literal; Unsupported when it would not."""
+    kind = values.dtype.kind
+    try:
+        if kind == "M":
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+                if np.datetime_data(values.dtype)[0] == "D" and value.time() != datetime.min.time():
+                    raise Unsupported(value)  # a date column and a time of day
+            if not isinstance(value, (datetime, date)):
+                raise Unsupported(value)
+            if isinstance(value, datetime) and value.tzinfo is not None:
+                value = value.replace(tzinfo=None)  # a timestamp column ignores the offset
+            return np.datetime64(value).astype(values.dtype)
+        if kind == "b":
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and value.strip().lower() in _TRUE_STRINGS | _FALSE_STRINGS:
+                return value.strip().lower() in _TRUE_STRINGS
+            raise Unsupported(value)
+        if kind in "iuf":
+            if isinstance(value, bool):
+                raise Unsupported(value)
+            if isinstance(value, str):
+                return int(value) if kind != "f" else float(value)
+            if isinstance(value, (int, float)):
+                return value
+    except ValueError:
+        raise Unsupported(value)
+    raise Unsupported(value)
+
+
+def _like_regex(pattern: str) -> "re.Pattern[str]":
+    """ILIKE pattern to a regex: % any run, _ one character, backslash escapes the next one."""
+    parts: List[str] = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Dense integer ranks of comparable values (ties share a rank)."""
+    if not len(values):
+        return np.zeros(0, dtype=np.int64)
+    _, inverse = np.unique(values, return_inverse=True)
+    return inverse.reshape(-1).astype(np.int64)
+
+
+def _is_null(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return math.isnan(value)
+    if isinstance(value, np.datetime64):
+        return bool(np.isnat(value))
+    return False
+
+
+def _null_values(data: SnapshotData, column: str, values: np.ndarray) -> np.ndarray:
+    if data.is_text(column):
+        return values < 0
+    return np.array([_is_null(v) for v in values], dtype=bool)
+
+
+def _python_values(data: SnapshotData, column: str, values: np.ndarray) -> List[Any]:
+    """Group keys / aggregates as the Python values the database driver would return (NULL as None)."""
+    if data.is_text(column):
+        dictionary = data.dictionaries[column]
+        return [None if code < 0 else dictionary[code] for code in values]
+    out: List[Any] = []
+    for value in values:
+        if _is_null(value):
+            out.append(None)
+        elif isinstance(value, np.generic):
+            out.append(value.item())  # datetime64[us] -> datetime, [D] -> date, numbers -> int / float
+        else:
+            out.append(value)
+    return out
+
+
+# -------------------------------------------
+# Verification against the database
+# -------------------------------------------
+def _normalize(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _same(a: Any, b: Any) -> bool:
+    a, b = _normalize(a), _normalize(b)
+    if isinstance(a, float) or isinstance(b, float):
+        if a is None or b is None:
+            return a is b
+        return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def _same_rows(a: List[Dict[str, Any]], b: List[Dict[str, Any]]) -> bool:
+    def key(row: Dict[str, Any]) -> str:
+        return repr(sorted((k, _normalize(v) if not isinstance(v, float) else round(v, 6)) for k, v in row.items()))
+
+    if len(a) != len(b):
+        return False
+    return all(
+        x.keys() == y.keys() and all(_same(x[k], y[k]) for k in x)
+        for x, y in zip(sorted(a, key=key), sorted(b, key=key))
+    )
+
+
+def results_match(local: Dict[str, Any], remote: Dict[str, Any], limit: int, order_by: List[Dict[str, str]]) -> bool:
+    """Whether an engine result agrees with the database's, up to what SQL leaves unspecified.
+
+    Row order is only compared through the ORDER BY columns, and a result cut by LIMIT
+    without ORDER BY (any subset is correct) is compared by its size.
+    """
+    if "time_series" in remote:
+        return _same_rows(local.get("time_series", []), remote["time_series"]) and all(
+            _same(x["period"], y["period"]) for x, y in zip(local["time_series"], remote["time_series"])
+        )
+    if "distinct_values" in remote:
+        if not _same(local.get("count"), remote["count"]):
+            return False
+        if remote["count"] >= 50:
+            return True
+        return all(
+            sorted(map(repr, map(_normalize, local["distinct_values"].get(col, [])))) ==
+            sorted(map(repr, map(_normalize, values)))
+            for col, values in remote["distinct_values"].items()
+        )
+    if "summary" in remote:
+        rows, expected = local.get("summary", []), [dict(row) for row in remote["summary"]]
+        if len(rows) != len(expected):
+            return False
+        if len(expected) >= limit:
+            if not order_by:
+                return True
+            # Ties at the cut may pick different rows: compare the ordering keys only
+            return all(
+                _same(x.get(o["column"]), y.get(o["column"])) for x, y in zip(rows, expected) for o in order_by
+            )
+        return _same_rows(rows, expected)
+    return False
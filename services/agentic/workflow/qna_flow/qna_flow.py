@@ -8,6 +8,7 @@ from agentic.nodes.llm_nodes.nodes import LLMNode
 from agentic.nodes.answer_nodes.nodes import AnswerNode
 from config import get_settings
 from agentic.tools.current_time import CurrentTimeTool
+from agentic.tools.fraud_batch import FraudBatchTool
 from agentic.tools.fraud_query import FraudQueryTool, FraudSummaryTool
 from agentic.tools.fraud_rag import PDFRagTool
 import logging
@@ -97,14 +98,17 @@ class QnaWorkflow:
             chat_history=self.chat_history
         )
 
-        # ✅ Agentic LLM with streaming
+        # ✅ Agentic LLM with streaming (the batch tool reuses the query and summary tools)
+        fraud_query_tool = FraudQueryTool()
+        fraud_summary_tool = FraudSummaryTool()
         agentic_llm = LLMNode(
             model=self.default_model,
             system_prompt=self.agent_query,
             tools=[
                 CurrentTimeTool().to_haystack_tool(),
-                FraudQueryTool().to_haystack_tool(),
-                FraudSummaryTool().to_haystack_tool(),
+                fraud_query_tool.to_haystack_tool(),
+                fraud_summary_tool.to_haystack_tool(),
+                FraudBatchTool(fraud_query_tool, fraud_summary_tool).to_haystack_tool(),
                 PDFRagTool().to_haystack_tool(),
             ],
             streaming_callback=self.streaming_callback,
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from contextlib import contextmanager
-from typing import Any, Generator, Optional
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Generator, Optional
 
 
 class BaseDatabase(ABC):
@@ -12,18 +12,25 @@ class BaseDatabase(ABC):
         self.settings = settings_module.get_settings()
 
     @abstractmethod
-    def _get_connection(self) -> Any:
-        """Return a new database connection object."""
+    def _get_connection(self, readonly: bool = False) -> Any:
+        """Return a database connection object (a read replica may serve `readonly` work)."""
         raise NotImplementedError
 
+    def _release_connection(self, conn: Any) -> None:
+        """Hand a connection back once the cursor is done (pooled subclasses override this)."""
+        conn.close()
+
     @contextmanager
-    def get_cursor(self) -> Generator[Any, None, None]:
-        """Context manager for safely executing queries."""
+    def get_cursor(self, readonly: bool = False) -> Generator[Any, None, None]:
+        """Context manager for safely executing queries.
+
+        Set `readonly` for work that never writes, so it can be routed to a read replica.
+        """
         conn: Optional[Any] = None
         cursor: Optional[Any] = None
 
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=readonly)
             if conn is None:
                 raise ConnectionError("Database connection failed (None returned).")
 
@@ -40,4 +47,47 @@ class BaseDatabase(ABC):
             if cursor is not None:
                 cursor.close()
             if conn is not None:
-                conn.close()
+                self._release_connection(conn)
+
+
+class AsyncBaseDatabase(ABC):
+    """Abstract base class for asyncio database connections."""
+
+    def __init__(self, settings_module: Any):
+        # Expecting a module or object that provides get_settings()
+        self.settings = settings_module.get_settings()
+
+    @abstractmethod
+    async def _get_connection(self, readonly: bool = False) -> Any:
+        """Return an async database connection object (a read replica may serve `readonly` work)."""
+        raise NotImplementedError
+
+    async def _release_connection(self, conn: Any) -> None:
+        """Hand a connection back once the cursor is done (pooled subclasses override this)."""
+        await conn.close()
+
+    @asynccontextmanager
+    async def get_cursor(self, readonly: bool = False) -> AsyncGenerator[Any, None]:
+        """Async context manager for safely executing queries (see `BaseDatabase.get_cursor`)."""
+        conn: Optional[Any] = None
+        cursor: Optional[Any] = None
+
+        try:
+            conn = await self._get_connection(readonly=readonly)
+            if conn is None:
+                raise ConnectionError("Database connection failed (None returned).")
+
+            cursor = conn.cursor()
+            yield cursor
+            await conn.commit()
+
+        except Exception:
+            if conn is not None:
+                await conn.rollback()
+            raise
+
+        finally:
+            if cursor is not None:
+                await cursor.close()
+            if conn is not None:
+                await self._release_connection(conn)
@@ -1,30 +1,160 @@
 from __future__ import annotations
+import functools
+import inspect
+import logging
+import time
+import psycopg
 import psycopg2
+import psycopg2.errors
 from psycopg2 import Error as PsycopgError
-from psycopg2.extras import RealDictCursor
-from contextlib import contextmanager
-from typing import Any, Generator, Optional
-from ..abc import BaseDatabase
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from psycopg import sql as psycopg_sql
+from psycopg.rows import dict_row
+from psycopg2 import sql as psycopg2_sql
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Optional, Sequence, Tuple
+from ..abc import AsyncBaseDatabase, BaseDatabase
+from .pool import (
+    AsyncConnectionPool,
+    AsyncPooledConnection,
+    ConnectionPool,
+    PooledConnection,
+    get_async_pool,
+    get_pool,
+)
+from .instrumentation import (
+    AsyncInstrumentedCursor,
+    AsyncInstrumentedServerCursor,
+    InstrumentedCursor,
+    get_instrumentation,
+)
+from .prepared import get_statement_cache
+from .replicas import ReplicaRouter, get_replica_router, parse_replicas, split_replica
 from contracts.errors import AppError
 
 
+logger = logging.getLogger("services.db")
+
+# AppError code of read-only work whose replica dropped mid-query (see `primary_fallback`)
+REPLICA_FAILED = "db_replica_failed"
+# Set while `primary_fallback` repeats the work: read-only cursors skip the replicas
+_primary_only: ContextVar[bool] = ContextVar("primary_only", default=False)
+
+# (snapshot id, replica) exported by `shared_snapshot`; read-only cursors opened in that
+# context (tasks and `copy_context()` threads started from it included) import it
+_shared_snapshot: ContextVar[Optional[Tuple[str, Optional[str]]]] = ContextVar("shared_snapshot", default=None)
+_JOIN_ISOLATION = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"
+_EXPORT_QUERY = "SELECT pg_export_snapshot() AS snapshot"
+
+
+def in_shared_snapshot() -> bool:
+    """True inside `shared_snapshot`: reads there see the exported (possibly older) state, so
+    callers bypass caches and in-process copies that would mix in another one."""
+    return _shared_snapshot.get() is not None
+
+
+def primary_fallback(method: Callable) -> Callable:
+    """Repeat read-only work once on the primary when the replica it ran on dropped mid-query.
+
+    Only for work that can simply run again (reads, nothing handed out yet), so not for
+    generators. Inside `shared_snapshot` the snapshot pins the server: no retry there.
+    """
+    def should_retry(e: AppError) -> bool:
+        if e.code != REPLICA_FAILED or _primary_only.get() or in_shared_snapshot():
+            return False
+        logger.warning("%s: %s; retrying on the primary", method.__qualname__, e.message)
+        return True
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await method(*args, **kwargs)
+            except AppError as e:
+                if not should_retry(e):
+                    raise
+            token = _primary_only.set(True)
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                _primary_only.reset(token)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return method(*args, **kwargs)
+        except AppError as e:
+            if not should_retry(e):
+                raise
+        token = _primary_only.set(True)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _primary_only.reset(token)
+    return wrapper
+
+
+def _replica_lost(e: Exception) -> bool:
+    """A connection-level failure (not a statement timeout, which is also an OperationalError)."""
+    if isinstance(e, psycopg2.OperationalError):
+        return not isinstance(e, psycopg2.errors.QueryCanceled)
+    return isinstance(e, psycopg.OperationalError) and not isinstance(e, psycopg.errors.QueryCanceled)
+
+
 class SupabaseDB(BaseDatabase):
-    """Manages connection to the Supabase Postgres database with proper error wrapping."""
+    """Manages connection to the Supabase Postgres database with proper error wrapping.
+
+    Connections come from a process-wide `ConnectionPool` keyed by the DSN, so every
+    SupabaseDB instance (CRUD dependency, agent tools, ...) shares the same pool.
+    Read-only cursors are routed to the configured read replicas (each with its own
+    pool) and fall back to the primary when no replica is reachable; a replica lost
+    mid-query raises `REPLICA_FAILED`, which `primary_fallback` retries on the primary.
+    Every statement is reported to the process-wide `QueryInstrumentation`.
+    """
 
     def __init__(self, settings_module: Any):
         # Expecting a module that provides get_settings()
         self.settings = settings_module
+        self.pool = get_pool(self._pool_key(), self._create_pool)
+        self.statements = get_statement_cache(self._pool_key(), self.settings.db_prepared_statements_max)
+        self.replicas = _replica_router(self.settings, self._pool_key())
+        self.instrumentation = get_instrumentation(self.settings.db_slow_query_ms)
+
+    def _address(self, replica: Optional[str] = None) -> Tuple[str, str]:
+        if replica is None:
+            return self.settings.db_host, self.settings.db_port
+        return split_replica(replica, self.settings.db_port)
 
-    def _get_connection(self) -> psycopg2.extensions.connection:
-        """Create a new PostgreSQL database connection."""
+    def _pool_key(self, replica: Optional[str] = None) -> str:
+        host, port = self._address(replica)
+        return f"{self.settings.db_user}@{host}:{port}/{self.settings.db_name}"
+
+    def _create_pool(self, replica: Optional[str] = None) -> ConnectionPool:
+        return ConnectionPool(
+            connect=lambda: self._connect(replica),
+            min_size=self.settings.db_pool_min_size,
+            max_size=self.settings.db_pool_max_size,
+            max_idle=self.settings.db_pool_max_idle,
+            timeout=self.settings.db_pool_timeout,
+            name=self._pool_key(replica),
+        )
+
+    def _replica_pool(self, replica: str) -> ConnectionPool:
+        return get_pool(self._pool_key(replica), lambda: self._create_pool(replica))
+
+    def _connect(self, replica: Optional[str] = None) -> PooledConnection:
+        """Open a brand new PostgreSQL connection (used by the pools only)."""
+        host, port = self._address(replica)
         try:
-            return psycopg2.connect(
+            conn = psycopg2.connect(
                 dbname=self.settings.db_name,
                 user=self.settings.db_user,
                 password=self.settings.db_password,
-                host=self.settings.db_host,
-                port=self.settings.db_port,
-                cursor_factory=RealDictCursor,
+                host=host,
+                port=port,
+                cursor_factory=InstrumentedCursor,
+                connection_factory=PooledConnection,
             )
         except PsycopgError as e:
             raise AppError(
@@ -32,15 +162,97 @@ class SupabaseDB(BaseDatabase):
                 code="db_connection_failed",
                 message=f"Database connection failed: {e.pgerror or str(e)}",
             )
+        conn.replica = replica
+        return conn
+
+    def _get_connection(self, readonly: bool = False) -> PooledConnection:
+        """Check a connection out of the primary pool, or a replica pool for read-only work."""
+        shared = _shared_snapshot.get() if readonly else None
+        if shared is not None:  # a snapshot can only be imported on the server that exported it
+            return self.pool.getconn() if shared[1] is None else self._replica_pool(shared[1]).getconn()
+        replica = self.replicas.choose() if readonly and not _primary_only.get() else None
+        if replica is not None:
+            try:
+                return self._replica_pool(replica).getconn()
+            except AppError as e:
+                if e.code == "db_connection_failed":
+                    self.replicas.mark_down(replica)
+                # Fall back to the primary
+        return self.pool.getconn()
+
+    def _release_connection(self, conn: PooledConnection) -> None:
+        """Give the connection back to its pool (closed/broken ones are discarded)."""
+        pool = self.pool if conn.replica is None else self._replica_pool(conn.replica)
+        pool.putconn(conn)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """In-use/idle/waiter counts and checkout latency of the shared pool."""
+        return self.pool.stats()
+
+    def execute_prepared(self, cursor: psycopg2.extensions.cursor, sql: str, params: Sequence[Any] = ()) -> None:
+        """Execute a read-only statement as a per-connection server-side prepared statement."""
+        self.statements.execute(cursor, sql, params)
+
+    @staticmethod
+    def _join_snapshot(conn: PooledConnection) -> None:
+        """Start the transaction on the snapshot exported by the enclosing `shared_snapshot`, if any."""
+        shared = _shared_snapshot.get()
+        if shared is None:
+            return
+        with conn.cursor() as setup:
+            setup.execute(_JOIN_ISOLATION)
+            setup.execute(psycopg2_sql.SQL("SET TRANSACTION SNAPSHOT {}").format(psycopg2_sql.Literal(shared[0])))
+
+    @contextmanager
+    def shared_snapshot(self, caller: Optional[str] = None) -> Generator[str, None, None]:
+        """Make every read-only cursor opened inside the block see the same database state.
+
+        Exports the snapshot of a REPEATABLE READ transaction that stays open for the
+        block; read-only `get_cursor` calls (on any pool connection, in this thread or
+        in threads run with `contextvars.copy_context()`) import it before their first
+        statement. Nested blocks reuse the outer snapshot. Yields the snapshot id.
+        """
+        shared = _shared_snapshot.get()
+        if shared is not None:
+            yield shared[0]
+            return
+        with self.get_cursor(readonly=True, caller=caller) as cursor:
+            cursor.execute(_JOIN_ISOLATION)
+            cursor.execute(_EXPORT_QUERY)
+            snapshot = cursor.fetchone()["snapshot"]  # type: ignore
+            token = _shared_snapshot.set((snapshot, cursor.connection.replica))
+            try:
+                yield snapshot
+            finally:
+                _shared_snapshot.reset(token)
 
     @contextmanager
-    def get_cursor(self) -> Generator[psycopg2.extensions.cursor, None, None]:
-        """Context manager for safely executing DB queries with rollback and AppError wrapping."""
-        conn: Optional[psycopg2.extensions.connection] = None
+    def get_cursor(
+        self,
+        name: Optional[str] = None,
+        itersize: Optional[int] = None,
+        readonly: bool = False,
+        caller: Optional[str] = None,
+        autocommit: bool = False,
+    ) -> Generator[psycopg2.extensions.cursor, None, None]:
+        """Context manager for safely executing DB queries with rollback and AppError wrapping.
+
+        Pass `name` to get a server-side (named) cursor that fetches `itersize` rows per
+        round trip, so large results can be consumed in constant memory.
+        Set `readonly` for work that never writes so it can be served by a read replica.
+        `caller` (e.g. "FraudTransactionCRUD.read" or a tool name) labels the statements
+        in the query instrumentation, together with the time spent waiting for the pool.
+        Set `autocommit` for statements that cannot run inside a transaction block
+        (e.g. CREATE INDEX CONCURRENTLY); each statement then commits on its own.
+        Inside `shared_snapshot`, read-only cursors see the block's snapshot.
+        """
+        conn: Optional[PooledConnection] = None
         cursor: Optional[psycopg2.extensions.cursor] = None
+        started = time.monotonic()
 
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=readonly)
+            wait_ms = (time.monotonic() - started) * 1000
             if conn is None:
                 raise AppError(
                     status_code=500,
@@ -48,13 +260,37 @@ class SupabaseDB(BaseDatabase):
                     message="Failed to establish database connection (conn is None).",
                 )
 
-            cursor = conn.cursor()
+            if autocommit:
+                conn.autocommit = True
+            elif readonly:
+                self._join_snapshot(conn)
+            cursor = conn.cursor(name) if name else conn.cursor()
+            if name:
+                cursor.itersize = itersize or self.settings.db_stream_itersize
+            cursor.instrumentation = self.instrumentation
+            cursor.caller = caller or "unknown"
+            cursor.wait_ms = wait_ms
             yield cursor
+            cursor.close()  # before commit: a named cursor is gone once the transaction ends
             conn.commit()
 
+        except AppError:
+            if conn is not None and not conn.closed:
+                conn.rollback()
+            raise
+
         except PsycopgError as e:
-            if conn is not None:
+            lost = conn is not None and conn.replica is not None and _replica_lost(e)
+            if lost:
+                self.replicas.mark_down(conn.replica)  # type: ignore
+            if conn is not None and not conn.closed:
                 conn.rollback()
+            if lost:
+                raise AppError(
+                    status_code=503,
+                    code=REPLICA_FAILED,
+                    message=f"Read replica {conn.replica} failed: {e.pgerror or str(e)}",
+                )
             raise AppError(
                 status_code=500,
                 code="db_query_failed",
@@ -62,7 +298,7 @@ class SupabaseDB(BaseDatabase):
             )
 
         except Exception as e:
-            if conn is not None:
+            if conn is not None and not conn.closed:
                 conn.rollback()
             raise AppError(
                 status_code=500,
@@ -71,7 +307,212 @@ class SupabaseDB(BaseDatabase):
             )
 
         finally:
-            if cursor is not None:
+            if cursor is not None and not cursor.closed:
                 cursor.close()
             if conn is not None:
-                conn.close()
+                if autocommit and not conn.closed:
+                    conn.autocommit = False
+                if conn.replica is not None:
+                    self.replicas.observe(conn.replica, time.monotonic() - started)
+                self._release_connection(conn)
+
+
+class AsyncSupabaseDB(AsyncBaseDatabase):
+    """asyncio counterpart of `SupabaseDB` built on psycopg 3.
+
+    Uses process-wide `AsyncConnectionPool`s (primary and replicas) and returns rows as
+    dicts, so callers get the same row shape, routing and `AppError` codes as the sync path.
+    """
+
+    def __init__(self, settings_module: Any):
+        self.settings = settings_module
+        self.pool = get_async_pool(self._pool_key(), self._create_pool)
+        self.statements = get_statement_cache(f"async:{self._pool_key()}", self.settings.db_prepared_statements_max)
+        self.replicas = _replica_router(self.settings, self._pool_key())
+        self.instrumentation = get_instrumentation(self.settings.db_slow_query_ms)
+
+    def _address(self, replica: Optional[str] = None) -> Tuple[str, str]:
+        if replica is None:
+            return self.settings.db_host, self.settings.db_port
+        return split_replica(replica, self.settings.db_port)
+
+    def _pool_key(self, replica: Optional[str] = None) -> str:
+        host, port = self._address(replica)
+        return f"{self.settings.db_user}@{host}:{port}/{self.settings.db_name}"
+
+    def _create_pool(self, replica: Optional[str] = None) -> AsyncConnectionPool:
+        return AsyncConnectionPool(
+            connect=lambda: self._connect(replica),
+            min_size=self.settings.db_pool_min_size,
+            max_size=self.settings.db_pool_max_size,
+            max_idle=self.settings.db_pool_max_idle,
+            timeout=self.settings.db_pool_timeout,
+            name=f"async:{self._pool_key(replica)}",
+        )
+
+    def _replica_pool(self, replica: str) -> AsyncConnectionPool:
+        return get_async_pool(self._pool_key(replica), lambda: self._create_pool(replica))
+
+    async def _connect(self, replica: Optional[str] = None) -> AsyncPooledConnection:
+        """Open a brand new async PostgreSQL connection (used by the pools only)."""
+        host, port = self._address(replica)
+        try:
+            conn = await AsyncPooledConnection.connect(
+                dbname=self.settings.db_name,
+                user=self.settings.db_user,
+                password=self.settings.db_password,
+                host=host,
+                port=port,
+                row_factory=dict_row,
+                cursor_factory=AsyncInstrumentedCursor,
+            )
+            conn.server_cursor_factory = AsyncInstrumentedServerCursor
+        except psycopg.Error as e:
+            raise AppError(
+                status_code=500,
+                code="db_connection_failed",
+                message=f"Database connection failed: {str(e)}",
+            )
+        conn.replica = replica
+        return conn
+
+    async def _get_connection(self, readonly: bool = False) -> AsyncPooledConnection:
+        """Check a connection out of the primary pool, or a replica pool for read-only work."""
+        shared = _shared_snapshot.get() if readonly else None
+        if shared is not None:
+            return await (self.pool if shared[1] is None else self._replica_pool(shared[1])).getconn()
+        replica = self.replicas.choose() if readonly and not _primary_only.get() else None
+        if replica is not None:
+            try:
+                return await self._replica_pool(replica).getconn()
+            except AppError as e:
+                if e.code == "db_connection_failed":
+                    self.replicas.mark_down(replica)
+        return await self.pool.getconn()
+
+    async def _release_connection(self, conn: AsyncPooledConnection) -> None:
+        """Give the connection back to its pool (closed/broken ones are discarded)."""
+        pool = self.pool if conn.replica is None else self._replica_pool(conn.replica)
+        await pool.putconn(conn)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """In-use/idle/waiter counts and checkout latency of the shared async pool."""
+        return self.pool.stats()
+
+    async def execute_prepared(self, cursor: psycopg.AsyncCursor, sql: str, params: Sequence[Any] = ()) -> None:
+        """Execute a read-only statement as a per-connection server-side prepared statement."""
+        await self.statements.aexecute(cursor, sql, params)
+
+    @staticmethod
+    async def _join_snapshot(conn: AsyncPooledConnection) -> None:
+        shared = _shared_snapshot.get()
+        if shared is None:
+            return
+        async with conn.cursor() as setup:
+            await setup.execute(_JOIN_ISOLATION)
+            await setup.execute(psycopg_sql.SQL("SET TRANSACTION SNAPSHOT {}").format(psycopg_sql.Literal(shared[0])))
+
+    @asynccontextmanager
+    async def shared_snapshot(self, caller: Optional[str] = None) -> AsyncGenerator[str, None]:
+        """Async version of `SupabaseDB.shared_snapshot` (tasks created inside the block inherit it)."""
+        shared = _shared_snapshot.get()
+        if shared is not None:
+            yield shared[0]
+            return
+        async with self.get_cursor(readonly=True, caller=caller) as cursor:
+            await cursor.execute(_JOIN_ISOLATION)
+            await cursor.execute(_EXPORT_QUERY)
+            snapshot = (await cursor.fetchone())["snapshot"]  # type: ignore
+            token = _shared_snapshot.set((snapshot, cursor.connection.replica))  # type: ignore
+            try:
+                yield snapshot
+            finally:
+                _shared_snapshot.reset(token)
+
+    @asynccontextmanager
+    async def get_cursor(
+        self,
+        name: Optional[str] = None,
+        itersize: Optional[int] = None,
+        readonly: bool = False,
+        caller: Optional[str] = None,
+    ) -> AsyncGenerator[psycopg.AsyncCursor, None]:
+        """Async context manager for DB queries with rollback and AppError wrapping.
+
+        `name`, `readonly` and `caller` behave as in `SupabaseDB.get_cursor`.
+        """
+        conn: Optional[AsyncPooledConnection] = None
+        cursor: Optional[psycopg.AsyncCursor] = None
+        started = time.monotonic()
+
+        try:
+            conn = await self._get_connection(readonly=readonly)
+            wait_ms = (time.monotonic() - started) * 1000
+            if conn is None:
+                raise AppError(
+                    status_code=500,
+                    code="db_connection_failed",
+                    message="Failed to establish database connection (conn is None).",
+                )
+
+            if readonly:
+                await self._join_snapshot(conn)
+            cursor = conn.cursor(name=name) if name else conn.cursor()
+            if name:
+                cursor.itersize = itersize or self.settings.db_stream_itersize
+            cursor.instrumentation = self.instrumentation
+            cursor.caller = caller or "unknown"
+            cursor.wait_ms = wait_ms
+            yield cursor
+            await cursor.close()  # before commit: a server-side cursor is gone once the transaction ends
+            await conn.commit()
+
+        except AppError:
+            if conn is not None and not conn.closed:
+                await conn.rollback()
+            raise
+
+        except psycopg.Error as e:
+            lost = conn is not None and conn.replica is not None and _replica_lost(e)
+            if lost:
+                self.replicas.mark_down(conn.replica)  # type: ignore
+            if conn is not None and not conn.closed:
+                await conn.rollback()
+            if lost:
+                raise AppError(
+                    status_code=503,
+                    code=REPLICA_FAILED,
+                    message=f"Read replica {conn.replica} failed: {e.diag.message_primary or str(e)}",
+                )
+            raise AppError(
+                status_code=500,
+                code="db_query_failed",
+                message=f"Database query failed: {e.diag.message_primary or str(e)}",
+            )
+
+        except Exception as e:
+            if conn is not None and not conn.closed:
+                await conn.rollback()
+            raise AppError(
+                status_code=500,
+                code="unexpected_db_error",
+                message=f"Unexpected database error: {str(e)}",
+            )
+
+        finally:
+            if cursor is not None and not cursor.closed:
+                await cursor.close()
+            if conn is not None:
+                if conn.replica is not None:
+                    self.replicas.observe(conn.replica, time.monotonic() - started)
+                await self._release_connection(conn)
+
+
+def _replica_router(settings: Any, primary_key: str) -> ReplicaRouter:
+    """Replica router shared by the sync and async databases of the same primary."""
+    return get_replica_router(
+        primary_key,
+        parse_replicas(settings.db_read_replicas),
+        strategy=settings.db_replica_strategy,
+        retry_after=settings.db_replica_retry_after,
+    )
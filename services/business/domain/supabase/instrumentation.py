@@ -0,0 +1,380 @@
+from __future__ import annotations
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence
+import psycopg
+from psycopg2.extras import RealDictCursor
+
+
+logger = logging.getLogger("services.db.queries")
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open ended
+LATENCY_BUCKETS_MS: Sequence[float] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![$\w])-?\d+(?:\.\d+)?\b")
+# Boolean / NULL values (but not `IS [NOT] NULL` tests), and casts of literals (`'...'::timestamp`)
+_KEYWORD_LITERAL = re.compile(r"(?<!\bIS )(?<!\bNOT )\b(?:TRUE|FALSE|NULL)\b", re.IGNORECASE)
+_LITERAL_CAST = re.compile(r"\?::\w+(?:\s*\[\])?")
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%s|\$\d+)(?:\s*,\s*(?:\?|%s|\$\d+))*\s*\)")
+_ROW_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: Any) -> str:
+    """Reduce SQL to its shape: literals (strings, numbers, booleans, NULL, with their casts)
+    become `?` and value lists collapse to `(...)`, so every `execute_values` batch of an
+    INSERT has the same shape whatever its rows."""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", errors="replace")
+    shape = _STRING.sub("?", str(query))
+    shape = _NUMBER.sub("?", shape)
+    shape = _KEYWORD_LITERAL.sub("?", shape)
+    shape = _LITERAL_CAST.sub("?", shape)
+    shape = _PARAM_LIST.sub("(...)", shape)
+    shape = _ROW_LIST.sub("(...)", shape)
+    return _SPACE.sub(" ", shape).strip().rstrip(";")
+
+
+@dataclass
+class QueryEvent:
+    """One executed statement, as seen by instrumentation hooks."""
+
+    shape: str
+    caller: str
+    duration_ms: float
+    rows: int
+    wait_ms: float
+    error: Optional[str] = None
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (percentiles are bucket upper bounds, capped at the max)."""
+
+    def __init__(self, bounds_ms: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self.bounds_ms = list(bounds_ms)
+        self.buckets = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float, error: bool = False) -> None:
+        self.buckets[bisect_left(self.bounds_ms, duration_ms)] += 1
+        self.count += 1
+        self.errors += int(error)
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(self.bounds_ms[index], self.max_ms) if index < len(self.bounds_ms) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}" for bound in self.bounds_ms] + ["inf"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class QueryInstrumentation:
+    """Collects a `QueryEvent` for every statement run through an instrumented cursor.
+
+    - Keeps latency histograms per caller and per query shape (at most `max_shapes`,
+      least recently seen shapes are dropped first).
+    - Statements slower than `slow_query_ms` are logged and kept in a short ring buffer.
+    - Extra hooks (`add_hook`) receive every event; a failing hook never breaks a query.
+    """
+
+    def __init__(self, slow_query_ms: float = 500.0, max_shapes: int = 256, max_slow: int = 100) -> None:
+        self.slow_query_ms = slow_query_ms
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._hooks: List[Callable[[QueryEvent], None]] = []
+        self._by_caller: Dict[str, LatencyHistogram] = {}
+        self._by_shape: "OrderedDict[str, LatencyHistogram]" = OrderedDict()
+        self._slow: Deque[QueryEvent] = deque(maxlen=max_slow)
+
+    def add_hook(self, hook: Callable[[QueryEvent], None]) -> None:
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[QueryEvent], None]) -> None:
+        with self._lock:
+            if hook in self._hooks:
+                self._hooks.remove(hook)
+
+    def record(self, event: QueryEvent) -> None:
+        failed = event.error is not None
+        slow = event.duration_ms >= self.slow_query_ms
+
+        with self._lock:
+            self._by_caller.setdefault(event.caller, LatencyHistogram()).observe(event.duration_ms, failed)
+
+            histogram = self._by_shape.pop(event.shape, None) or LatencyHistogram()
+            histogram.observe(event.duration_ms, failed)
+            self._by_shape[event.shape] = histogram
+            while len(self._by_shape) > self.max_shapes:
+                self._by_shape.popitem(last=False)
+
+            if slow:
+                self._slow.append(event)
+            hooks = list(self._hooks)
+
+        if slow:
+            logger.warning(
+                "slow query %.1f ms (wait %.1f ms, rows %d, caller %s): %s",
+                event.duration_ms, event.wait_ms, event.rows, event.caller, event.shape,
+            )
+
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception("query instrumentation hook %r failed", hook)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latency histograms and recent slow queries, for health endpoints and tests."""
+        with self._lock:
+            return {
+                "slow_query_ms": self.slow_query_ms,
+                "by_caller": {caller: h.snapshot() for caller, h in self._by_caller.items()},
+                "by_shape": {shape: h.snapshot() for shape, h in self._by_shape.items()},
+                "slow_queries": [asdict(event) for event in self._slow],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_caller.clear()
+            self._by_shape.clear()
+            self._slow.clear()
+
+
+# -------------------------------------------
+# Instrumented cursors
+# -------------------------------------------
+class _CursorInstrumentation:
+    """Timing shared by the sync and async cursors.
+
+    `get_cursor` sets `instrumentation`, `caller` and `wait_ms`; cursors opened any
+    other way (pool pings, ...) stay silent. `query_shape` overrides the shape of the
+    next statement (the prepared-statement cache reports the SQL behind an EXECUTE).
+    Server-side cursors report once, on close, with the rows fetched in between.
+    """
+
+    server_side = False
+
+    def _init_instrumentation(self) -> None:
+        self.instrumentation: Optional[QueryInstrumentation] = None
+        self.caller = "unknown"
+        self.wait_ms = 0.0
+        self.query_shape: Optional[str] = None
+        self._pending: Optional[List[Any]] = None  # [shape, started, rows] of a server-side cursor
+
+    def _begin(self, query: Any) -> Optional[str]:
+        if self.instrumentation is None:
+            return None
+        shape, self.query_shape = self.query_shape or query, None
+        return normalize_query(shape)
+
+    def _finish(self, shape: Optional[str], started: float, rows: int, error: Optional[BaseException] = None) -> None:
+        if shape is None:
+            return
+        if self.server_side and error is None:
+            self._pending = [shape, started, 0]
+            return
+        self._emit(shape, started, rows, error)
+
+    def _fetched(self, rows: Any) -> None:
+        if self._pending is not None:
+            self._pending[2] += len(rows) if isinstance(rows, list) else int(rows is not None)
+
+    def _flush(self) -> None:
+        if self._pending is not None:
+            shape, started, rows = self._pending
+            self._pending = None
+            self._emit(shape, started, rows)
+
+    def _emit(self, shape: str, started: float, rows: int, error: Optional[BaseException] = None) -> None:
+        assert self.instrumentation is not None
+        self.instrumentation.record(QueryEvent(
+            shape=shape,
+            caller=self.caller,
+            duration_ms=(time.perf_counter() - started) * 1000,
+            rows=max(rows, 0),
+            wait_ms=self.wait_ms,
+            error=type(error).__name__ if error is not None else None,
+        ))
+        self.wait_ms = 0.0  # the wait is charged to the first statement only
+
+
+class InstrumentedCursor(_CursorInstrumentation, RealDictCursor):
+    """psycopg2 dict cursor that reports every statement to `QueryInstrumentation`."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._init_instrumentation()
+        self.server_side = self.name is not None
+
+    def execute(self, query: Any, vars: Any = None) -> Any:
+        shape = self._begin(query)
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception as e:
+            self._finish(shape, started, 0, e)
+            raise
+        self._finish(shape, started, self.rowcount)
+        return result
+
+    def executemany(self, query: Any, vars_list: Any) -> Any:
+        shape = self._begin(query)
+        started = time.perf_counter()
+        try:
+            result = super().executemany(query, vars_list)
+        except Exception as e:
+            self._finish(shape, started, 0, e)
+            raise
+        self._finish(shape, started, self.rowcount)
+        return result
+
+    def copy_expert(self, sql: Any, file: Any, size: int = 8192) -> Any:
+        shape = self._begin(sql)
+        started = time.perf_counter()
+        try:
+            result = super().copy_expert(sql, file, size)
+        except Exception as e:
+            self._finish(shape, started, 0, e)
+            raise
+        self._finish(shape, started, self.rowcount)
+        return result
+
+    def fetchone(self) -> Any:
+        row = super().fetchone()
+        self._fetched(row)
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> Any:
+        rows = super().fetchmany(size) if size is not None else super().fetchmany()
+        self._fetched(rows)
+        return rows
+
+    def fetchall(self) -> Any:
+        rows = super().fetchall()
+        self._fetched(rows)
+        return rows
+
+    def close(self) -> None:
+        self._flush()
+        super().close()
+
+
+class _AsyncCursorInstrumentation(_CursorInstrumentation):
+    """`execute`/`fetch*`/`close` overrides shared by the psycopg 3 cursors."""
+
+    async def execute(self, query: Any, params: Any = None, **kwargs: Any) -> Any:
+        shape = self._begin(query if not isinstance(query, psycopg.sql.Composable) else query.as_string(self))
+        started = time.perf_counter()
+        try:
+            result = await super().execute(query, params, **kwargs)  # type: ignore[misc]
+        except Exception as e:
+            self._finish(shape, started, 0, e)
+            raise
+        self._finish(shape, started, self.rowcount)  # type: ignore[attr-defined]
+        return result
+
+    async def fetchone(self) -> Any:
+        row = await super().fetchone()  # type: ignore[misc]
+        self._fetched(row)
+        return row
+
+    async def fetchmany(self, size: int = 0) -> Any:
+        rows = await super().fetchmany(size)  # type: ignore[misc]
+        self._fetched(rows)
+        return rows
+
+    async def fetchall(self) -> Any:
+        rows = await super().fetchall()  # type: ignore[misc]
+        self._fetched(rows)
+        return rows
+
+    async def close(self) -> None:
+        self._flush()
+        await super().close()  # type: ignore[misc]
+
+
+class AsyncInstrumentedCursor(_AsyncCursorInstrumentation, psycopg.AsyncCursor):
+    """psycopg 3 client-side cursor that reports every statement."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._init_instrumentation()
+
+    async def executemany(self, query: Any, params_seq: Any, **kwargs: Any) -> None:
+        shape = self._begin(query)
+        started = time.perf_counter()
+        try:
+            await super().executemany(query, params_seq, **kwargs)
+        except Exception as e:
+            self._finish(shape, started, 0, e)
+            raise
+        self._finish(shape, started, self.rowcount)
+
+    @asynccontextmanager
+    async def copy(self, statement: Any, params: Any = None, **kwargs: Any) -> AsyncIterator[Any]:
+        shape = self._begin(statement)
+        started = time.perf_counter()
+        try:
+            async with super().copy(statement, params, **kwargs) as copy:
+                yield copy
+        except Exception as e:
+            self._finish(shape, started, 0, e)
+            raise
+        self._finish(shape, started, self.rowcount)
+
+
+class AsyncInstrumentedServerCursor(_AsyncCursorInstrumentation, psycopg.AsyncServerCursor):
+    """psycopg 3 server-side (named) cursor that reports once it is closed."""
+
+    server_side = True
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._init_instrumentation()
+
+
+# -------------------------------------------
+# Process-wide instance
+# -------------------------------------------
+_instrumentation: Optional[QueryInstrumentation] = None
+_instrumentation_lock = threading.Lock()
+
+
+def get_instrumentation(slow_query_ms: float = 500.0) -> QueryInstrumentation:
+    """Return the process-wide `QueryInstrumentation`, creating it on first use."""
+    global _instrumentation
+    with _instrumentation_lock:
+        if _instrumentation is None:
+            _instrumentation = QueryInstrumentation(slow_query_ms=slow_query_ms)
+        return _instrumentation
@@ -0,0 +1,525 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import psycopg
+import psycopg2
+import psycopg2.extensions
+from contracts.errors import AppError
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that carries the bookkeeping the pool needs."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.prepared_statements: "OrderedDict[Any, Any]" = OrderedDict()
+        self.replica: Optional[str] = None  # replica key, None for the primary
+
+
+class AsyncPooledConnection(psycopg.AsyncConnection):
+    """psycopg 3 async connection that carries the bookkeeping the pool needs."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.prepared_statements: "OrderedDict[Any, Any]" = OrderedDict()
+        self.replica: Optional[str] = None  # replica key, None for the primary
+
+
+class ConnectionPool:
+    """Thread-safe, bounded pool of psycopg2 connections.
+
+    - Keeps at least `min_size` connections open and never more than `max_size`.
+    - Connections idle for longer than `max_idle` seconds are closed (down to `min_size`).
+    - Connections idle for longer than `ping_interval` seconds are checked with
+      `SELECT 1` before being handed out; dead ones are replaced transparently.
+    - When every connection is in use, callers wait up to `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], PooledConnection],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_idle: float = 300.0,
+        timeout: float = 30.0,
+        ping_interval: float = 30.0,
+        name: str = "default",
+    ) -> None:
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+
+        self.name = name
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: Deque[PooledConnection] = deque()
+        self._size = 0          # open connections (idle + in use)
+        self._waiters = 0
+        self._closed = False
+
+        # Counters
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        for _ in range(min_size):
+            self._size += 1
+            try:
+                self._idle.append(self._open())
+            except Exception:
+                self._size -= 1
+                break
+
+    # -------------------------------------------
+    # Checkout / check-in
+    # -------------------------------------------
+    def getconn(self) -> PooledConnection:
+        """Check a live connection out of the pool, waiting up to `timeout` seconds."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        # Recycle on checkout too: a pool nobody returns connections to would otherwise never shrink
+        with self._cond:
+            expired = self._prune_idle()
+        for stale in expired:
+            self._safe_close(stale)
+
+        while True:
+            conn: Optional[PooledConnection] = None
+            must_open = False
+
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise AppError(status_code=500, code="db_pool_closed", message=f"Connection pool '{self.name}' is closed.")
+                    if self._idle:
+                        conn = self._idle.pop()  # LIFO keeps the hot connections hot
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        must_open = True
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise AppError(
+                            status_code=503,
+                            code="db_pool_timeout",
+                            message=f"No database connection available after {self.timeout:.1f}s (pool '{self.name}', max_size={self.max_size}).",
+                        )
+                    self._waiters += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiters -= 1
+
+            if must_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    self._release_slot()
+                    raise
+            elif conn is not None and not self._is_usable(conn):
+                self._discard(conn)
+                continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            return conn  # type: ignore[return-value]
+
+    def putconn(self, conn: PooledConnection, discard: bool = False) -> None:
+        """Return a connection to the pool; broken or discarded ones are closed."""
+        if discard or self._closed or conn.closed:
+            self._discard(conn)
+            return
+
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            self._discard(conn)
+            return
+
+        conn.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(conn)
+            expired = self._prune_idle()
+            self._cond.notify()
+        for stale in expired:
+            self._safe_close(stale)
+
+    def close(self) -> None:
+        """Close every idle connection and refuse new checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._safe_close(conn)
+
+    # -------------------------------------------
+    # Stats
+    # -------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage, useful to size `min_size`/`max_size` under load."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "name": self.name,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._size - idle,
+                "idle": idle,
+                "waiters": self._waiters,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "avg_checkout_ms": round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "max_checkout_ms": round(self._wait_max * 1000, 3),
+            }
+
+    # -------------------------------------------
+    # Internals
+    # -------------------------------------------
+    def _open(self) -> PooledConnection:
+        conn = self._connect()
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _is_usable(self, conn: PooledConnection) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - conn.last_used < self.ping_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _prune_idle(self) -> List[PooledConnection]:
+        """Detach connections idle for longer than `max_idle` (caller holds the lock and closes them)."""
+        now = time.monotonic()
+        expired: List[PooledConnection] = []
+        # Oldest idle connections sit at the left of the deque
+        while self._idle and self._size > self.min_size and now - self._idle[0].last_used > self.max_idle:
+            expired.append(self._idle.popleft())
+            self._size -= 1
+            self._discarded += 1
+        return expired
+
+    def _discard(self, conn: PooledConnection) -> None:
+        self._safe_close(conn)
+        with self._cond:
+            self._discarded += 1
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _safe_close(conn: PooledConnection) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+
+class AsyncConnectionPool:
+    """asyncio counterpart of `ConnectionPool` for psycopg 3 async connections.
+
+    Same bounds, idle recycling, liveness checks and stats; waiting for a free
+    connection suspends the coroutine instead of blocking the event loop.
+    Opening connections needs the event loop, so the pool fills up to `min_size`
+    on the first checkout rather than in the constructor.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[AsyncPooledConnection]],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_idle: float = 300.0,
+        timeout: float = 30.0,
+        ping_interval: float = 30.0,
+        name: str = "default",
+    ) -> None:
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+
+        self.name = name
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._cond = asyncio.Condition()
+        self._idle: Deque[AsyncPooledConnection] = deque()
+        self._size = 0
+        self._waiters = 0
+        self._closed = False
+        self._filled = min_size == 0
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def getconn(self) -> AsyncPooledConnection:
+        """Check a live connection out of the pool, waiting up to `timeout` seconds."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        if not self._filled:
+            await self._fill()
+
+        async with self._cond:
+            expired = self._prune_idle()
+        for stale in expired:
+            await self._safe_close(stale)
+
+        while True:
+            conn: Optional[AsyncPooledConnection] = None
+            must_open = False
+
+            async with self._cond:
+                while True:
+                    if self._closed:
+                        raise AppError(status_code=500, code="db_pool_closed", message=f"Connection pool '{self.name}' is closed.")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        must_open = True
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise AppError(
+                            status_code=503,
+                            code="db_pool_timeout",
+                            message=f"No database connection available after {self.timeout:.1f}s (pool '{self.name}', max_size={self.max_size}).",
+                        )
+                    self._waiters += 1
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    finally:
+                        self._waiters -= 1
+
+            if must_open:
+                try:
+                    conn = await self._connect()
+                except BaseException:
+                    await self._release_slot()
+                    raise
+                self._created += 1
+            elif conn is not None and not await self._is_usable(conn):
+                await self._discard(conn)
+                continue
+
+            waited = time.monotonic() - start
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            return conn  # type: ignore[return-value]
+
+    async def putconn(self, conn: AsyncPooledConnection, discard: bool = False) -> None:
+        """Return a connection to the pool; broken or discarded ones are closed."""
+        if discard or self._closed or conn.closed or conn.broken:
+            await self._discard(conn)
+            return
+
+        try:
+            if conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE:
+                await conn.rollback()
+        except psycopg.Error:
+            await self._discard(conn)
+            return
+
+        conn.last_used = time.monotonic()
+        async with self._cond:
+            self._idle.append(conn)
+            expired = self._prune_idle()
+            self._cond.notify()
+        for stale in expired:
+            await self._safe_close(stale)
+
+    async def close(self) -> None:
+        """Close every idle connection and refuse new checkouts."""
+        async with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            await self._safe_close(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage (same shape as `ConnectionPool.stats`)."""
+        idle = len(self._idle)
+        return {
+            "name": self.name,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "size": self._size,
+            "in_use": self._size - idle,
+            "idle": idle,
+            "waiters": self._waiters,
+            "checkouts": self._checkouts,
+            "timeouts": self._timeouts,
+            "connections_created": self._created,
+            "connections_discarded": self._discarded,
+            "avg_checkout_ms": round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+            "max_checkout_ms": round(self._wait_max * 1000, 3),
+        }
+
+    async def _fill(self) -> None:
+        """Open connections up to `min_size`, as `ConnectionPool` does when it is created."""
+        self._filled = True  # set first: coroutines arriving meanwhile must not fill again
+        async with self._cond:
+            missing = max(0, self.min_size - self._size)
+            self._size += missing
+        opened = 0
+        try:
+            while opened < missing:
+                conn = await self._connect()
+                self._created += 1
+                opened += 1
+                async with self._cond:
+                    self._idle.append(conn)
+                    self._cond.notify()
+        except Exception:
+            pass  # getconn opens on demand and reports the error
+        finally:
+            if opened < missing:
+                async with self._cond:
+                    self._size -= missing - opened
+                    self._cond.notify_all()
+
+    async def _is_usable(self, conn: AsyncPooledConnection) -> bool:
+        if conn.closed or conn.broken:
+            return False
+        if time.monotonic() - conn.last_used < self.ping_interval:
+            return True
+        try:
+            await conn.execute("SELECT 1")
+            await conn.rollback()
+            return True
+        except psycopg.Error:
+            return False
+
+    def _prune_idle(self) -> List[AsyncPooledConnection]:
+        now = time.monotonic()
+        expired: List[AsyncPooledConnection] = []
+        while self._idle and self._size > self.min_size and now - self._idle[0].last_used > self.max_idle:
+            expired.append(self._idle.popleft())
+            self._size -= 1
+            self._discarded += 1
+        return expired
+
+    async def _discard(self, conn: AsyncPooledConnection) -> None:
+        await self._safe_close(conn)
+        self._discarded += 1
+        await self._release_slot()
+
+    async def _release_slot(self) -> None:
+        async with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    async def _safe_close(conn: AsyncPooledConnection) -> None:
+        try:
+            await conn.close()
+        except psycopg.Error:
+            pass
+
+
+# -------------------------------------------
+# Process-wide registry
+# -------------------------------------------
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_async_pools: Dict[str, AsyncConnectionPool] = {}
+
+
+def get_pool(key: str, factory: Callable[[], ConnectionPool]) -> ConnectionPool:
+    """Return the pool registered under `key`, creating it once per process."""
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = factory()
+            _pools[key] = pool
+        return pool
+
+
+def get_async_pool(key: str, factory: Callable[[], AsyncConnectionPool]) -> AsyncConnectionPool:
+    """Return the async pool registered under `key`, creating it once per process.
+
+    Creating the pool opens no connection, so no lock is needed inside the event loop.
+    """
+    pool = _async_pools.get(key)
+    if pool is None:
+        pool = _async_pools[key] = factory()
+    return pool
+
+
+def all_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every pool (sync and async) opened by this process."""
+    stats = {key: pool.stats() for key, pool in list(_pools.items())}
+    stats.update({f"async:{key}": pool.stats() for key, pool in list(_async_pools.items())})
+    return stats
+
+
+def close_all_pools() -> None:
+    """Close every registered pool (used on application shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+async def aclose_all_pools() -> None:
+    """Close every registered async pool (used on application shutdown)."""
+    pools = list(_async_pools.values())
+    _async_pools.clear()
+    for pool in pools:
+        await pool.close()
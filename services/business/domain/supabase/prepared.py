@@ -0,0 +1,194 @@
+from __future__ import annotations
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Sequence
+import psycopg
+import psycopg2
+import psycopg2.extensions
+
+
+# SQLSTATEs meaning the server-side statement is stale or gone:
+# 0A000 "cached plan must not change result type" (table altered under a SELECT *),
+# 26000 "prepared statement does not exist" (DEALLOCATE/DISCARD ALL by someone else).
+_INVALIDATION_CODES = {"0A000", "26000"}
+_PLACEHOLDER = re.compile(r"%%|%s")
+# Taken before executing a statement that is already prepared, so an invalidation only
+# undoes that statement, not the transaction's settings (statement_timeout, snapshot, ...)
+_SAVEPOINT = "fq_prepared"
+
+
+def _to_positional(sql: str) -> str:
+    """Turn psycopg `%s` placeholders into PostgreSQL `$n` parameters."""
+    counter = iter(range(1, 10_000))
+    return _PLACEHOLDER.sub(lambda m: "%" if m.group() == "%%" else f"${next(counter)}", sql)
+
+
+def _statement_name(sql: str) -> str:
+    return "fq_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:20]
+
+
+class PreparedStatementCache:
+    """Shape-keyed cache of server-side prepared statements.
+
+    The SQL text (with `%s` placeholders, values passed separately) is the shape key.
+    Each pooled connection keeps its own LRU of at most `max_size` prepared statements,
+    evicting with DEALLOCATE; counters are shared so the hit rate covers the whole pool.
+
+    Only use it for read-only statements: recovering from an invalidated plan rolls
+    back to a savepoint taken just before the EXECUTE, then re-prepares.
+    """
+
+    def __init__(self, max_size: int = 64) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    # -------------------------------------------
+    # psycopg2 (sync)
+    # -------------------------------------------
+    def execute(self, cursor: psycopg2.extensions.cursor, sql: str, params: Sequence[Any] = ()) -> None:
+        """PREPARE `sql` once per connection, then EXECUTE it with `params`."""
+        try:
+            self._execute(cursor, sql, params)
+        except psycopg2.Error as e:
+            if e.pgcode not in _INVALIDATION_CODES:
+                raise
+            # Only the EXECUTE failed: undo it and start over with a fresh statement
+            self._count("_invalidations")
+            self._undo(cursor)
+            self._forget(cursor, sql)
+            self._execute(cursor, sql, params)
+
+    def _execute(self, cursor: psycopg2.extensions.cursor, sql: str, params: Sequence[Any]) -> None:
+        statements = self._statements(cursor.connection)
+        name = statements.get(sql)
+        savepoint = ""
+
+        if name is not None:
+            statements.move_to_end(sql)
+            self._count("_hits")
+            if not cursor.connection.autocommit:
+                savepoint = f"SAVEPOINT {_SAVEPOINT}; "  # same round trip as the EXECUTE
+        else:
+            self._count("_misses")
+            name = _statement_name(sql)
+            cursor.execute(f"PREPARE {name} AS {_to_positional(sql).rstrip().rstrip(';')}")
+            statements[sql] = name
+            while len(statements) > self.max_size:
+                _, evicted = statements.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {evicted}")
+                self._count("_evictions")
+
+        if hasattr(cursor, "query_shape"):
+            cursor.query_shape = sql  # instrumentation reports the statement, not "EXECUTE fq_..."
+        if params:
+            cursor.execute(f"{savepoint}EXECUTE {name} ({', '.join(['%s'] * len(params))})", list(params))
+        else:
+            cursor.execute(f"{savepoint}EXECUTE {name}")
+
+    @staticmethod
+    def _undo(cursor: psycopg2.extensions.cursor) -> None:
+        """Back to the savepoint before the failed statement (autocommit has no transaction to keep)."""
+        if not cursor.connection.autocommit:
+            with cursor.connection.cursor() as undo:
+                undo.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}")
+
+    def _forget(self, cursor: psycopg2.extensions.cursor, sql: str) -> None:
+        name = self._statements(cursor.connection).pop(sql, None)
+        if name is not None:
+            try:
+                cursor.execute(f"DEALLOCATE {name}")
+            except psycopg2.Error:
+                # Already gone on the server (26000): nothing to deallocate
+                self._undo(cursor)
+
+    # -------------------------------------------
+    # psycopg 3 (async)
+    # -------------------------------------------
+    async def aexecute(self, cursor: psycopg.AsyncCursor, sql: str, params: Sequence[Any] = ()) -> None:
+        """Execute through psycopg 3's own prepared-statement support, tracking hits."""
+        conn = cursor.connection
+        conn.prepared_max = self.max_size
+        key = (sql, tuple(type(p) for p in params))  # psycopg 3 prepares per (query, types)
+        savepoint = key in self._statements(conn) and not conn.autocommit
+        try:
+            self._track(conn, key)
+            if savepoint:
+                await conn.execute(f"SAVEPOINT {_SAVEPOINT}", prepare=False)
+            await cursor.execute(sql, params, prepare=True)
+        except psycopg.Error as e:
+            # Without a savepoint, recovering would roll back the whole transaction: let the caller retry
+            if e.sqlstate not in _INVALIDATION_CODES or not savepoint:
+                raise
+            self._count("_invalidations")
+            await conn.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}", prepare=False)
+            # DEALLOCATE ALL also resets psycopg's client-side cache
+            await conn.execute("DEALLOCATE ALL")
+            self._statements(conn).clear()
+            self._track(conn, key)
+            await cursor.execute(sql, params, prepare=True)
+
+    def _track(self, conn: Any, key: Hashable) -> None:
+        statements = self._statements(conn)
+        if key in statements:
+            statements.move_to_end(key)
+            self._count("_hits")
+            return
+        self._count("_misses")
+        statements[key] = True
+        while len(statements) > self.max_size:
+            statements.popitem(last=False)
+            self._count("_evictions")
+
+    # -------------------------------------------
+    # Stats
+    # -------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            }
+
+    # -------------------------------------------
+    # Internals
+    # -------------------------------------------
+    @staticmethod
+    def _statements(conn: Any) -> "OrderedDict[Any, Any]":
+        # Lives on the pooled connection, so it dies with it
+        return conn.prepared_statements
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+# -------------------------------------------
+# Process-wide registry
+# -------------------------------------------
+_caches: Dict[str, PreparedStatementCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_statement_cache(key: str, max_size: int) -> PreparedStatementCache:
+    """Return the statement cache registered under `key`, creating it once per process."""
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = PreparedStatementCache(max_size=max_size)
+        return cache
+
+
+def all_statement_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit-rate counters for every statement cache used by this process."""
+    return {key: cache.stats() for key, cache in list(_caches.items())}
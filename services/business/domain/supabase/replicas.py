@@ -0,0 +1,78 @@
+from __future__ import annotations
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_replicas(value: str) -> List[str]:
+    """Split the `DB_READ_REPLICAS` setting ("host1:5432,host2") into replica keys."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def split_replica(replica: str, default_port: str) -> Tuple[str, str]:
+    """Return (host, port) for a replica key, falling back to the primary's port."""
+    host, _, port = replica.partition(":")
+    return host, port or default_port
+
+
+class ReplicaRouter:
+    """Pick a read replica for read-only work.
+
+    - `round_robin` cycles over healthy replicas.
+    - `least_latency` picks the replica with the lowest moving average of cursor time
+      (replicas not measured yet are tried first).
+
+    A replica that fails to connect is skipped for `retry_after` seconds, then tried
+    again. `choose()` returns None when no replica is usable, meaning "use the primary".
+    """
+
+    def __init__(self, replicas: List[str], strategy: str = "round_robin", retry_after: float = 30.0) -> None:
+        if strategy not in ("round_robin", "least_latency"):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.replicas = replicas
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._cycle = itertools.count()
+        self._down_until: Dict[str, float] = {}
+        self._latency: Dict[str, float] = {}
+
+    def choose(self) -> Optional[str]:
+        if not self.replicas:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            healthy = [r for r in self.replicas if self._down_until.get(r, 0.0) <= now]
+            if not healthy:
+                return None
+            if self.strategy == "least_latency":
+                return min(healthy, key=lambda r: self._latency.get(r, 0.0))
+            return healthy[next(self._cycle) % len(healthy)]
+
+    def mark_down(self, replica: str) -> None:
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + self.retry_after
+            self._latency.pop(replica, None)
+
+    def observe(self, replica: str, seconds: float, alpha: float = 0.2) -> None:
+        """Fold one cursor duration into the replica's exponential moving average."""
+        with self._lock:
+            previous = self._latency.get(replica)
+            self._latency[replica] = seconds if previous is None else (1 - alpha) * previous + alpha * seconds
+
+
+# -------------------------------------------
+# Process-wide registry (shared by the sync and async databases)
+# -------------------------------------------
+_routers: Dict[str, ReplicaRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_replica_router(key: str, replicas: List[str], strategy: str, retry_after: float) -> ReplicaRouter:
+    """Return the router registered for the primary `key`, creating it once per process."""
+    with _routers_lock:
+        router = _routers.get(key)
+        if router is None:
+            router = _routers[key] = ReplicaRouter(replicas, strategy=strategy, retry_after=retry_after)
+        return router
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+_MISSING = object()
+
+CacheKey = Tuple[str, str, str]  # (table, namespace e.g. the tool name, normalised arguments)
+
+
+class ResultCache:
+    """Size-bounded LRU of query results with a TTL, invalidated per table on writes.
+
+    Writers call `invalidate(table)` after they commit. Readers take `generation(table)`
+    before querying and pass it to `put`, so a result computed while a write was
+    committing is dropped instead of cached.
+
+    The cache is per process: with several workers, another worker's write is only
+    seen once the TTL expires. Cached values are shared between callers: do not mutate them.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, key: CacheKey) -> Any:
+        """Cached value, or `None` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return None
+            expires_at, value = entry  # type: ignore
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def generation(self, table: str) -> int:
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def put(self, key: CacheKey, value: Any, generation: int, ttl: Optional[float] = None) -> None:
+        """Store `value` unless `key`'s table was written since `generation` was read.
+
+        `ttl` overrides the cache's own for this entry (e.g. results that only late writes can change).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, table: str) -> None:
+        """Drop every result read from `table` (call after a committed write)."""
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key in self._entries if key[0] == table]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # -------------------------------------------
+    # Stats
+    # -------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            }
+
+
+# -------------------------------------------
+# Process-wide instance
+# -------------------------------------------
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache(max_entries: int = 256, ttl: float = 60.0) -> ResultCache:
+    """Return the process-wide result cache, creating it on first use with these limits."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(max_entries=max_entries, ttl=ttl)
+        return _cache
+
+
+def invalidate_results(table: str) -> None:
+    """Called by writers after commit; a no-op until something has used the cache."""
+    if _cache is not None:
+        _cache.invalidate(table)
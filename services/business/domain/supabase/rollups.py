@@ -0,0 +1,204 @@
+from __future__ import annotations
+import logging
+import threading
+from typing import Optional, Tuple
+from .connection import AsyncSupabaseDB, SupabaseDB
+from .result_cache import invalidate_results
+
+
+logger = logging.getLogger("services.db.rollups")
+
+# Day x dimension aggregates of fraud_transactions, kept current by statement-level triggers.
+# `dimension` is one of ROLLUP_DIMENSIONS (its column value in `value`) or TOTAL_DIMENSION
+# (value ''), so every row of the base table is counted once per dimension.
+ROLLUP_TABLE = "fraud_rollup_daily"
+ROLLUP_DIMENSIONS = ("state", "category", "gender", "merchant")
+TOTAL_DIMENSION = "all"
+ROLLUP_DATE_COLUMN = "trans_date_trans_time"
+
+_FUNCTION = "fraud_rollup_daily_apply"
+_TRIGGERS = {
+    "INSERT": ("fraud_rollup_daily_insert", "NEW TABLE AS new_rows"),
+    "UPDATE": ("fraud_rollup_daily_update", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    "DELETE": ("fraud_rollup_daily_delete", "OLD TABLE AS old_rows"),
+}
+_TRIGGER_NAMES = [name for name, _ in _TRIGGERS.values()]
+
+_CREATE_TABLE_QUERY = f"""
+    CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+        dimension text NOT NULL,
+        value text NOT NULL,
+        day date NOT NULL,
+        txn_count bigint NOT NULL,
+        amt_sum numeric NOT NULL,
+        fraud_count bigint NOT NULL,
+        fraud_amt_sum numeric NOT NULL,
+        PRIMARY KEY (dimension, value, day)
+    )
+"""
+_DAY_INDEX_QUERY = f"CREATE INDEX IF NOT EXISTS {ROLLUP_TABLE}_day_idx ON {ROLLUP_TABLE} (dimension, day)"
+_TRIGGERS_EXIST_QUERY = "SELECT COUNT(*) AS triggers FROM pg_trigger WHERE tgname = ANY(%s) AND NOT tgisinternal"
+
+
+def _dimension_values(source: str) -> str:
+    """One (dimension, value) row per rollup dimension of each `source` row (NULL values are not rolled up)."""
+    pairs = [f"('{TOTAL_DIMENSION}', '')"] + [f"('{dim}', {source}.{dim})" for dim in ROLLUP_DIMENSIONS]
+    return f"CROSS JOIN LATERAL (VALUES {', '.join(pairs)}) AS d(dimension, value)"
+
+
+def _delta_query(sources: Tuple[Tuple[str, int], ...]) -> str:
+    """Add (+1) or subtract (-1) each transition table's rows into the rollup.
+
+    Keys are upserted in order so concurrent writers lock rollup rows in the same order.
+    """
+    rows = " UNION ALL ".join(
+        f"SELECT {sign} AS sign, {ROLLUP_DATE_COLUMN}::date AS day, amt::numeric AS amt, is_fraud, "
+        f"{', '.join(ROLLUP_DIMENSIONS)} FROM {table}"
+        for table, sign in sources
+    )
+    return f"""
+        INSERT INTO {ROLLUP_TABLE} AS r (dimension, value, day, txn_count, amt_sum, fraud_count, fraud_amt_sum)
+        SELECT d.dimension, d.value, s.day,
+               SUM(s.sign), SUM(s.sign * s.amt),
+               COALESCE(SUM(s.sign) FILTER (WHERE s.is_fraud), 0),
+               COALESCE(SUM(s.sign * s.amt) FILTER (WHERE s.is_fraud), 0)
+        FROM ({rows}) AS s {_dimension_values("s")}
+        WHERE d.value IS NOT NULL
+        GROUP BY d.dimension, d.value, s.day
+        ORDER BY d.dimension, d.value, s.day
+        ON CONFLICT (dimension, value, day) DO UPDATE SET
+            txn_count = r.txn_count + EXCLUDED.txn_count,
+            amt_sum = r.amt_sum + EXCLUDED.amt_sum,
+            fraud_count = r.fraud_count + EXCLUDED.fraud_count,
+            fraud_amt_sum = r.fraud_amt_sum + EXCLUDED.fraud_amt_sum
+    """
+
+
+# Keys whose rows were all removed: drop them so they do not show up as empty groups
+_PRUNE_QUERY = f"""
+    DELETE FROM {ROLLUP_TABLE} AS r
+    USING (
+        SELECT DISTINCT d.dimension, d.value, o.{ROLLUP_DATE_COLUMN}::date AS day
+        FROM old_rows AS o {_dimension_values("o")}
+    ) AS k
+    WHERE r.dimension = k.dimension AND r.value = k.value AND r.day = k.day AND r.txn_count = 0
+"""
+
+_CREATE_FUNCTION_QUERY = f"""
+    CREATE OR REPLACE FUNCTION {_FUNCTION}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {_delta_query((("new_rows", 1),))};
+        ELSIF TG_OP = 'UPDATE' THEN
+            {_delta_query((("new_rows", 1), ("old_rows", -1)))};
+            {_PRUNE_QUERY};
+        ELSE
+            {_delta_query((("old_rows", -1),))};
+            {_PRUNE_QUERY};
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+
+_BACKFILL_QUERY = f"""
+    INSERT INTO {ROLLUP_TABLE} (dimension, value, day, txn_count, amt_sum, fraud_count, fraud_amt_sum)
+    SELECT d.dimension, d.value, t.{ROLLUP_DATE_COLUMN}::date,
+           COUNT(*), SUM(t.amt::numeric),
+           COUNT(*) FILTER (WHERE t.is_fraud), COALESCE(SUM(t.amt::numeric) FILTER (WHERE t.is_fraud), 0)
+    FROM fraud_transactions AS t {_dimension_values("t")}
+    WHERE d.value IS NOT NULL
+    GROUP BY 1, 2, 3
+"""
+
+
+def _create_trigger_query(event: str) -> str:
+    name, referencing = _TRIGGERS[event]
+    return (
+        f"CREATE TRIGGER {name} AFTER {event} ON fraud_transactions "
+        f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {_FUNCTION}()"
+    )
+
+
+def _rebuild(cursor) -> None:
+    """Recreate the rollup from the base table; the caller holds a lock that blocks writes."""
+    cursor.execute(_CREATE_TABLE_QUERY)
+    cursor.execute(_DAY_INDEX_QUERY)
+    cursor.execute(f"TRUNCATE {ROLLUP_TABLE}")
+    cursor.execute(_BACKFILL_QUERY)
+
+
+# -------------------------------------------
+# Setup / repair
+# -------------------------------------------
+def ensure_rollups(db: SupabaseDB) -> bool:
+    """Create, backfill and start maintaining the rollup table if its triggers are missing.
+
+    The backfill is one full GROUP BY of fraud_transactions, run under a SHARE lock
+    so no write slips in between the backfill and the triggers.
+    """
+    with db.get_cursor(caller="rollups.ensure_rollups") as cursor:
+        cursor.execute(_CREATE_FUNCTION_QUERY)
+        cursor.execute(_TRIGGERS_EXIST_QUERY, (_TRIGGER_NAMES,))
+        if cursor.fetchone()["triggers"] == len(_TRIGGERS):  # type: ignore
+            _set_ready(True)
+            return True
+
+        cursor.execute("LOCK TABLE fraud_transactions IN SHARE MODE")
+        _rebuild(cursor)
+        for event, (name, _) in _TRIGGERS.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON fraud_transactions")
+            cursor.execute(_create_trigger_query(event))
+    logger.info("Built rollup table %s and its maintenance triggers", ROLLUP_TABLE)
+    _set_ready(True)
+    return True
+
+
+def rebuild_rollups(db: SupabaseDB) -> None:
+    """Recompute the whole rollup (e.g. after the triggers were disabled for a bulk load)."""
+    with db.get_cursor(caller="rollups.rebuild_rollups") as cursor:
+        cursor.execute("LOCK TABLE fraud_transactions IN SHARE MODE")
+        _rebuild(cursor)
+    invalidate_results("fraud_transactions")
+
+
+# -------------------------------------------
+# Readiness (checked once per process)
+# -------------------------------------------
+_ready: Optional[bool] = None
+_ready_lock = threading.Lock()
+
+
+def _set_ready(ready: bool) -> bool:
+    global _ready
+    with _ready_lock:
+        _ready = ready
+    return ready
+
+
+def _check_failed(e: Exception) -> bool:
+    logger.warning("Rollup check failed, summaries use the base table: %s", e)
+    return _set_ready(False)
+
+
+def rollups_ready(db: SupabaseDB) -> bool:
+    """True when the rollup's triggers exist, so reading it matches the base table."""
+    if _ready is not None:
+        return _ready
+    try:
+        with db.get_cursor(readonly=True, caller="rollups.rollups_ready") as cursor:
+            cursor.execute(_TRIGGERS_EXIST_QUERY, (_TRIGGER_NAMES,))
+            return _set_ready(cursor.fetchone()["triggers"] == len(_TRIGGERS))  # type: ignore
+    except Exception as e:
+        return _check_failed(e)
+
+
+async def arollups_ready(db: AsyncSupabaseDB) -> bool:
+    if _ready is not None:
+        return _ready
+    try:
+        async with db.get_cursor(readonly=True, caller="rollups.rollups_ready") as cursor:
+            await cursor.execute(_TRIGGERS_EXIST_QUERY, (_TRIGGER_NAMES,))
+            return _set_ready((await cursor.fetchone())["triggers"] == len(_TRIGGERS))  # type: ignore
+    except Exception as e:
+        return _check_failed(e)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from .connection import SupabaseDB
+from .result_cache import invalidate_results
+from .rollups import ensure_rollups
+from contracts.errors import AppError
+
+
+logger = logging.getLogger("services.db.schema")
+
+# Backs `ON CONFLICT (trans_num)` upserts (idempotent, retry-safe ingest)
+TRANS_NUM_UNIQUE_INDEX = "fraud_transactions_trans_num_key"
+
+# Only a valid index counts: a failed CONCURRENTLY build leaves an invalid one behind
+_INDEX_EXISTS_QUERY = """
+    SELECT 1
+    FROM pg_index AS i JOIN pg_class AS c ON c.oid = i.indexrelid
+    WHERE i.indisvalid AND c.relname = %s
+"""
+_DUPLICATES_QUERY = """
+    SELECT COUNT(*) AS duplicates
+    FROM (SELECT trans_num FROM fraud_transactions GROUP BY trans_num HAVING COUNT(*) > 1) AS d
+"""
+_CREATE_INDEX_QUERY = "CREATE UNIQUE INDEX {concurrently}" + TRANS_NUM_UNIQUE_INDEX + " ON fraud_transactions (trans_num)"
+_DEDUPE_QUERY = """
+    DELETE FROM fraud_transactions AS t
+    USING fraud_transactions AS keep
+    WHERE t.trans_num = keep.trans_num AND t.id > keep.id
+"""
+
+
+def trans_num_unique_exists(db: SupabaseDB) -> bool:
+    """Whether the (valid) unique index on trans_num exists; a catalog lookup only."""
+    with db.get_cursor(readonly=True, caller="schema.trans_num_unique_exists") as cursor:
+        cursor.execute(_INDEX_EXISTS_QUERY, (TRANS_NUM_UNIQUE_INDEX,))
+        return cursor.fetchone() is not None
+
+
+def ensure_trans_num_unique(db: SupabaseDB, concurrently: bool = True) -> bool:
+    """Create the unique index on trans_num if it is missing.
+
+    CONCURRENTLY keeps the table writable during the build. The duplicate check before it
+    scans the whole table; returns False (and logs) when duplicates prevent the index, run
+    `remove_duplicate_trans_nums` first in that case.
+    """
+    if trans_num_unique_exists(db):
+        return True
+
+    with db.get_cursor(readonly=True, caller="schema.ensure_trans_num_unique") as cursor:
+        cursor.execute(_DUPLICATES_QUERY)
+        duplicates = cursor.fetchone()["duplicates"]  # type: ignore
+    if duplicates:
+        logger.warning(
+            "%d trans_num values are duplicated; unique index %s not created, upserts are unavailable",
+            duplicates, TRANS_NUM_UNIQUE_INDEX,
+        )
+        return False
+
+    with db.get_cursor(autocommit=True, caller="schema.ensure_trans_num_unique") as cursor:
+        # An invalid leftover of a failed concurrent build has the same name
+        cursor.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {TRANS_NUM_UNIQUE_INDEX}")
+        cursor.execute(_CREATE_INDEX_QUERY.format(concurrently="CONCURRENTLY " if concurrently else ""))
+    logger.info("Created unique index %s", TRANS_NUM_UNIQUE_INDEX)
+    return True
+
+
+def remove_duplicate_trans_nums(db: SupabaseDB) -> int:
+    """Delete duplicate rows, keeping the first inserted (lowest id) per trans_num."""
+    with db.get_cursor(caller="schema.remove_duplicate_trans_nums") as cursor:
+        cursor.execute(_DEDUPE_QUERY)
+        removed = cursor.rowcount
+    if removed:
+        invalidate_results("fraud_transactions")
+    return removed
+
+
+# -------------------------------------------
+# Indexes for the API's and agent tools' access patterns
+# -------------------------------------------
+# name -> (definition, required extension). Text filters compare `lower(column)` (see
+# business.usecase.fraud_transactions.filters.text_match); `%` patterns use the trigram index.
+INDEXES: Dict[str, Tuple[str, Optional[str]]] = {
+    # Date ranges and newest-first keyset pages
+    "fraud_transactions_time_idx": ("(trans_date_trans_time DESC, id DESC)", None),
+    # is_fraud filters, alone or with a date range / keyset page
+    "fraud_transactions_fraud_time_idx": ("(is_fraud, trans_date_trans_time DESC, id DESC)", None),
+    "fraud_transactions_state_lower_idx": ("(lower(state))", None),
+    "fraud_transactions_category_lower_idx": ("(lower(category))", None),
+    "fraud_transactions_merchant_lower_idx": ("(lower(merchant))", None),
+    "fraud_transactions_merchant_trgm_idx": ("USING gin (merchant gin_trgm_ops)", "pg_trgm"),
+}
+
+_INDEXES_QUERY = "SELECT indexname FROM pg_indexes WHERE tablename = 'fraud_transactions' AND indexname = ANY(%s)"
+_INVALID_INDEXES_QUERY = """
+    SELECT c.relname AS indexname
+    FROM pg_index AS i JOIN pg_class AS c ON c.oid = i.indexrelid
+    WHERE NOT i.indisvalid AND c.relname = ANY(%s)
+"""
+_EXTENSION_AVAILABLE_QUERY = "SELECT 1 FROM pg_available_extensions WHERE name = %s"
+
+
+def missing_indexes(db: SupabaseDB) -> List[str]:
+    """Names from `INDEXES` that do not exist, or are invalid (an interrupted CONCURRENTLY build)."""
+    names = list(INDEXES)
+    with db.get_cursor(readonly=True, caller="schema.missing_indexes") as cursor:
+        cursor.execute(_INDEXES_QUERY, (names,))
+        present = {row["indexname"] for row in cursor.fetchall()}  # type: ignore
+        cursor.execute(_INVALID_INDEXES_QUERY, (names,))
+        invalid = {row["indexname"] for row in cursor.fetchall()}  # type: ignore
+    return [name for name in names if name not in present or name in invalid]
+
+
+def create_indexes(db: SupabaseDB, concurrently: bool = True) -> List[str]:
+    """Create the missing `INDEXES`; returns the names created.
+
+    CONCURRENTLY keeps the table writable during the build (one index at a time, each in
+    its own transaction). Indexes whose extension is not available are skipped with a warning.
+    """
+    created: List[str] = []
+    missing = missing_indexes(db)
+    with db.get_cursor(autocommit=True, caller="schema.create_indexes") as cursor:
+        for name in missing:
+            definition, extension = INDEXES[name]
+            if extension:
+                cursor.execute(_EXTENSION_AVAILABLE_QUERY, (extension,))
+                if cursor.fetchone() is None:
+                    logger.warning("Index %s skipped: extension %s is not available", name, extension)
+                    continue
+                cursor.execute(f"CREATE EXTENSION IF NOT EXISTS {extension}")
+            # An invalid leftover of a failed concurrent build blocks IF NOT EXISTS
+            cursor.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {name}")
+            cursor.execute(
+                f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{name} ON fraud_transactions {definition}"
+            )
+            logger.info("Created index %s", name)
+            created.append(name)
+    return created
+
+
+def check_indexes(db: SupabaseDB) -> List[str]:
+    """Startup report: log the indexes the filters expect but the database lacks."""
+    missing = missing_indexes(db)
+    if missing:
+        logger.warning(
+            "Missing indexes on fraud_transactions: %s. Filters on these columns scan the table; "
+            "create them with `python extra/create_indexes.py` or DB_CREATE_INDEXES=true.",
+            ", ".join(missing),
+        )
+    return missing
+
+
+def ensure_schema(settings_module: Any) -> None:
+    """Startup check: indexes and rollups the service relies on. Never prevents the app from starting.
+
+    Missing indexes (the trans_num unique index and `INDEXES`) are only reported unless
+    `db_create_indexes` is set: a concurrent build on a large table can take minutes, and
+    startup waits for it. `python extra/create_indexes.py` builds them without a restart.
+    """
+    db = SupabaseDB(settings_module)
+    try:
+        if settings_module.db_create_indexes:
+            ensure_trans_num_unique(db)
+            create_indexes(db)
+        elif not trans_num_unique_exists(db):
+            logger.warning(
+                "Unique index %s is missing, upserts are unavailable; create it with `python extra/create_indexes.py`",
+                TRANS_NUM_UNIQUE_INDEX,
+            )
+        check_indexes(db)
+    except AppError as e:
+        logger.warning("Schema check skipped: %s", e.message)
+
+    # Building the rollups locks writes for a full GROUP BY and adds triggers to every write:
+    # opt-in, ideally done ahead of time with `python extra/create_rollups.py`
+    if settings_module.db_rollups:
+        try:
+            ensure_rollups(db)
+        except AppError as e:
+            logger.warning("Rollup setup skipped, summaries use the base table: %s", e.message)
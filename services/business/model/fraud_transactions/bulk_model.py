@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Optional
+
+
+class BulkUpdateRequest(BaseModel):
+    """Either `values` for every selected row (by `trans_nums` or `filters`), or per-row `rows`."""
+
+    values: Optional[Dict[str, Any]] = Field(None, description="Columns to set, e.g. {'is_fraud': true}")
+    trans_nums: Optional[List[str]] = Field(None, description="Transactions to update")
+    filters: Optional[Dict[str, Any]] = Field(
+        None, description="Filter expression in the fraud_query_tool grammar (including 'or_filters')"
+    )
+    rows: Optional[List[Dict[str, Any]]] = Field(
+        None, description="Per-row updates, each with 'trans_num' and the same columns"
+    )
+
+    @model_validator(mode="after")
+    def check_shape(self) -> "BulkUpdateRequest":
+        if self.rows is not None:
+            if self.values is not None or self.trans_nums is not None or self.filters is not None:
+                raise ValueError("'rows' cannot be combined with values, trans_nums or filters")
+        elif self.values is None or (self.trans_nums is None) == (self.filters is None):
+            raise ValueError("Provide 'values' with exactly one of 'trans_nums' or 'filters', or 'rows'")
+        return self
+
+
+class BulkDeleteRequest(BaseModel):
+    trans_nums: Optional[List[str]] = Field(None, description="Transactions to delete")
+    filters: Optional[Dict[str, Any]] = Field(
+        None, description="Filter expression in the fraud_query_tool grammar (including 'or_filters')"
+    )
+
+    @model_validator(mode="after")
+    def check_shape(self) -> "BulkDeleteRequest":
+        if (self.trans_nums is None) == (self.filters is None):
+            raise ValueError("Provide exactly one of 'trans_nums' or 'filters'")
+        return self
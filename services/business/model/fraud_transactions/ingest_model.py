@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class RejectedRowModel(BaseModel):
+    row: int = Field(..., description="1-based data row in the uploaded file")
+    error: str = Field(..., description="Why the row was rejected")
+
+
+class IngestBatchModel(BaseModel):
+    batch: int = Field(..., description="1-based batch number")
+    rows: int = Field(..., description="Rows read for this batch")
+    inserted: int = Field(0, description="Rows written to the database")
+    skipped: int = Field(0, description="Rows not written because their trans_num already exists (on_conflict)")
+    rejected: int = Field(0, description="Rows that failed parsing, validation or the insert")
+    error: Optional[str] = Field(None, description="Database error when the whole batch failed")
+
+
+class IngestResultModel(BaseModel):
+    format: str
+    rows: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    batches: List[IngestBatchModel] = Field(default_factory=list)
+    rejected_rows: List[RejectedRowModel] = Field(
+        default_factory=list, description="First rejected rows with their errors (capped)"
+    )
@@ -1,7 +1,104 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class HealthModel(BaseModel):
     status: str
     uptime_seconds: Optional[float] = None
+
+
+class DatabasePoolModel(BaseModel):
+    name: str
+    min_size: int
+    max_size: int
+    size: int
+    in_use: int
+    idle: int
+    waiters: int
+    checkouts: int
+    timeouts: int
+    connections_created: int
+    connections_discarded: int
+    avg_checkout_ms: float
+    max_checkout_ms: float
+
+
+class PreparedStatementStatsModel(BaseModel):
+    name: str
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    hit_rate: float
+
+
+class QueryLatencyModel(BaseModel):
+    name: str
+    count: int
+    errors: int
+    total_ms: float
+    avg_ms: float
+    max_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    buckets: Dict[str, int]
+
+
+class SlowQueryModel(BaseModel):
+    shape: str
+    caller: str
+    duration_ms: float
+    rows: int
+    wait_ms: float
+    error: Optional[str] = None
+
+
+class QueryStatsModel(BaseModel):
+    slow_query_ms: float
+    by_caller: List[QueryLatencyModel]
+    by_shape: List[QueryLatencyModel]
+    slow_queries: List[SlowQueryModel]
+
+
+class ResultCacheStatsModel(BaseModel):
+    max_entries: int
+    ttl_seconds: float
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    hit_rate: float
+
+
+class SnapshotStatsModel(BaseModel):
+    mode: str
+    loaded: bool
+    rows: int
+    max_id: int
+    age_seconds: float
+    stale: bool
+    full_loads: int
+    appends: int
+    rows_appended: int
+    last_refresh_ms: float
+    served: int
+    unsupported: int
+    verified: int
+    mismatches: int
+
+
+class SketchStatsModel(BaseModel):
+    enabled: bool
+    built: bool
+    columns: List[str]
+    rows: int
+    max_id: int
+    age_seconds: float
+    behind: bool
+    builds: int
+    appends: int
+    last_refresh_ms: float
@@ -28,3 +28,27 @@ class DatabaseCRUD(ABC):
     def delete(self, identifier: Any) -> Any:
         """Delete a record from the database."""
         raise NotImplementedError
+
+
+class AsyncDatabaseCRUD(ABC):
+    """Abstract async CRUD interface for database operations."""
+
+    @abstractmethod
+    async def create(self, data: Any) -> Any:
+        """Insert a new record into the database."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def read(self, *args, **kwargs) -> List[Any]:
+        """Read records from the database."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update(self, identifier: Any, data: Any) -> Any:
+        """Update a record in the database."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, identifier: Any) -> Any:
+        """Delete a record from the database."""
+        raise NotImplementedError
@@ -0,0 +1,150 @@
+import io
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple, get_args
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from ...model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
+from ...model.fraud_transactions.ingest_model import RejectedRowModel
+from .crud import EXPORT_COLUMNS, INSERT_COLUMNS
+from contracts.errors import AppError
+
+
+_ARROW_TYPES = {
+    datetime: pa.timestamp("us"), date: pa.date32(), bool: pa.bool_(),
+    int: pa.int64(), float: pa.float64(), str: pa.string(),
+}
+_FIELDS = {field.alias or name: field for name, field in FraudTransactionModel.model_fields.items()}
+
+
+def _arrow_type(column: str) -> pa.DataType:
+    annotation = _FIELDS[column].annotation
+    base = next((arg for arg in get_args(annotation) if arg is not type(None)), annotation)  # unwrap Optional
+    return _ARROW_TYPES[base]
+
+
+# Column types of the fraud_transactions rows (reads, exports and Arrow uploads)
+ARROW_SCHEMA = pa.schema([
+    pa.field(col, _arrow_type(col), nullable=not _FIELDS[col].is_required()) for col in EXPORT_COLUMNS
+])
+REQUIRED_COLUMNS = [col for col in INSERT_COLUMNS if _FIELDS[col].is_required()]
+
+_TRUE_VALUES = pa.array(["1", "true", "t", "yes", "y"])
+_FALSE_VALUES = pa.array(["0", "false", "f", "no", "n"])
+
+
+# -------------------------------------------
+# Vectorised validation: one compute kernel per column instead of one model per row
+# -------------------------------------------
+def _mask(array: Any) -> np.ndarray:
+    return np.asarray(array.to_numpy(zero_copy_only=False), dtype=bool)
+
+
+def _cast_values(array: pa.ChunkedArray, target: pa.DataType) -> Tuple[pa.ChunkedArray, np.ndarray]:
+    """Cast a whole column; only when that fails, retry value by value to find the bad rows."""
+    try:
+        return pc.cast(array, target), np.zeros(len(array), dtype=bool)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        pass
+
+    values: List[Any] = []
+    bad = np.zeros(len(array), dtype=bool)
+    for i, value in enumerate(array.to_pylist()):
+        try:
+            values.append(pc.cast(pa.array([value], type=array.type), target)[0].as_py())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            values.append(None)
+            bad[i] = True
+    return pa.chunked_array([pa.array(values, type=target)]), bad
+
+
+def _coerce_bool(array: pa.ChunkedArray) -> Tuple[pa.ChunkedArray, np.ndarray]:
+    """`is_fraud` as sent by CSV-derived producers: 0/1, "true"/"false", "t"/"f", ... ."""
+    if pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+        invalid = pc.invert(pc.is_in(array, value_set=pa.array([0, 1], type=array.type)))
+        return pc.not_equal(array, 0), _mask(pc.and_(pc.is_valid(array), invalid))
+    if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        normalized = pc.utf8_lower(pc.utf8_trim_whitespace(array))
+        is_true = pc.is_in(normalized, value_set=_TRUE_VALUES)
+        known = pc.or_(is_true, pc.is_in(normalized, value_set=_FALSE_VALUES))
+        values = pc.if_else(pc.is_null(array), pa.scalar(None, pa.bool_()), is_true)
+        return values, _mask(pc.and_(pc.is_valid(array), pc.invert(known)))
+    return _cast_values(array, pa.bool_())
+
+
+def _coerce_column(array: pa.ChunkedArray, target: pa.DataType) -> Tuple[pa.ChunkedArray, np.ndarray]:
+    if array.type == target:
+        return array, np.zeros(len(array), dtype=bool)
+    if pa.types.is_boolean(target):
+        return _coerce_bool(array)
+    if pa.types.is_date(target) and pa.types.is_timestamp(array.type):
+        return pc.cast(array, target, safe=False), np.zeros(len(array), dtype=bool)  # drop the time of day
+    # Strings are parsed here (ISO 8601 timestamps and dates, numbers)
+    return _cast_values(array, target)
+
+
+def validate_table(table: pa.Table, first_row: int = 1) -> Tuple[pa.Table, List[RejectedRowModel]]:
+    """Coerce an uploaded table to the insert columns and split off invalid rows.
+
+    Column for column: cast to the model's type, coerce `is_fraud`, parse
+    `trans_date_trans_time` / `dob`, then check required columns are non-null.
+    Returns the valid rows (`INSERT_COLUMNS`, in order) and the rejected ones,
+    numbered from `first_row`. Unknown columns are ignored.
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in table.column_names]
+    if missing:
+        raise AppError(status_code=400, code="missing_columns", message=f"Missing required column(s): {', '.join(missing)}")
+
+    num_rows = table.num_rows
+    columns: Dict[str, pa.ChunkedArray] = {}
+    errors: Dict[int, List[str]] = {}
+
+    for col in INSERT_COLUMNS:
+        target = _arrow_type(col)
+        if col not in table.column_names:
+            columns[col] = pa.chunked_array([pa.nulls(num_rows, type=target)])
+            continue
+
+        values, bad = _coerce_column(table.column(col), target)
+        for i in np.flatnonzero(bad):
+            errors.setdefault(int(i), []).append(f"{col}: invalid {target} value")
+        if col in REQUIRED_COLUMNS:
+            for i in np.flatnonzero(_mask(pc.is_null(values)) & ~bad):
+                errors.setdefault(int(i), []).append(f"{col}: Field required")
+        columns[col] = values
+
+    valid = pa.table(columns)
+    if errors:
+        keep = np.ones(num_rows, dtype=bool)
+        keep[list(errors)] = False
+        valid = valid.filter(pa.array(keep))
+
+    rejected = [RejectedRowModel(row=first_row + i, error="; ".join(errors[i])) for i in sorted(errors)]
+    return valid, rejected
+
+
+def to_copy_csv(table: pa.Table) -> bytes:
+    """Headerless CSV for `COPY ... WITH (FORMAT csv)`: strings are quoted, NULL is an unquoted empty field."""
+    buffer = io.BytesIO()
+    pa_csv.write_csv(table, buffer, pa_csv.WriteOptions(include_header=False))
+    return buffer.getvalue()
+
+
+# -------------------------------------------
+# Arrow responses
+# -------------------------------------------
+async def encode_arrow(batches: AsyncIterator[List[Dict[str, Any]]], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Arrow IPC stream: the schema message, then one record batch per fetched batch."""
+    schema = pa.schema([ARROW_SCHEMA.field(col) for col in columns])
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.getvalue()
+        async for rows in batches:
+            sink.seek(0)
+            sink.truncate()
+            writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+            yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    yield sink.getvalue()  # end-of-stream marker
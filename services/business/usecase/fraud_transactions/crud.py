@@ -1,12 +1,321 @@
-from typing import List, Union
+import io
+import uuid
+from datetime import date, datetime
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple, Union, get_args
 from psycopg2.extras import execute_values
 from pydantic import TypeAdapter
 from ...model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
-from ..abc import DatabaseCRUD
+from ..abc import AsyncDatabaseCRUD, DatabaseCRUD
+from .filters import FILTER_COLUMNS, build_where
+from .pagination import KEYSET_ORDER, keyset_clause, split_page
+from business.domain.supabase.connection import AsyncSupabaseDB as AsyncDatabaseConnection
 from business.domain.supabase.connection import SupabaseDB as DatabaseConnection
+from business.domain.supabase.connection import primary_fallback
+from business.domain.supabase.result_cache import invalidate_results
 from contracts.errors import AppError
 
 
+INSERT_COLUMNS = [
+    "trans_date_trans_time", "cc_num", "merchant", "category", "amt",
+    "first_name", "last_name", "gender", "street", "city", "state", "zip",
+    "lat", "long", "city_pop", "job", "dob", "trans_num", "unix_time",
+    "merch_lat", "merch_long", "is_fraud"
+]
+
+# Model attribute behind each column (`long` is stored on `long_`)
+_INSERT_ATTRS = [
+    next(name for name, field in FraudTransactionModel.model_fields.items() if (field.alias or name) == col)
+    for col in INSERT_COLUMNS
+]
+
+
+def _copy_query(table: str, fmt: str = "text") -> str:
+    options = " WITH (FORMAT csv)" if fmt == "csv" else ""
+    return f"COPY {table} ({', '.join(INSERT_COLUMNS)}) FROM STDIN{options}"
+
+
+COPY_QUERY = _copy_query("fraud_transactions")
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_COPY_CHUNK_SIZE = 1 << 20  # characters (or bytes) handed to the async COPY per write
+
+_rows_adapter = TypeAdapter(List[FraudTransactionModel])
+
+
+# -------------------------------------------
+# Query builders (shared by the sync and async CRUD)
+# -------------------------------------------
+def _normalize_payload(data: Union[FraudTransactionModel, List[FraudTransactionModel]]) -> List[FraudTransactionModel]:
+    if isinstance(data, FraudTransactionModel):
+        data = [data]
+
+    if not data:
+        raise AppError(status_code=400, code="empty_payload", message="No transaction data provided.")
+    return data
+
+
+def _insert_values(data: List[FraudTransactionModel]) -> List[Tuple[Any, ...]]:
+    return [tuple(getattr(item, attr) for attr in _INSERT_ATTRS) for item in data]
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _copy_buffer(data: List[FraudTransactionModel]) -> io.StringIO:
+    """Encode rows in COPY text format (tab separated, `\\N` for NULL) into an in-memory buffer."""
+    buffer = io.StringIO()
+    for item in data:
+        buffer.write("\t".join(_copy_value(getattr(item, attr)) for attr in _INSERT_ATTRS))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _build_read_query(limit: Optional[int], filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    query = "SELECT * FROM fraud_transactions"
+    params: List[Any] = []
+
+    if filters:
+        conditions = [f"{key} = %s" for key in filters.keys()]
+        query += " WHERE " + " AND ".join(conditions)
+        params.extend(filters.values())
+
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
+
+
+def _build_page_query(limit: int, cursor: Optional[str], filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Keyset page: `limit + 1` rows after `cursor`, so the caller knows whether a next page exists."""
+    where_clause = "WHERE " + " AND ".join(f"{key} = %s" for key in filters) if filters else ""
+    where_clause, cursor_params = keyset_clause(where_clause, cursor)
+    query = f"SELECT * FROM fraud_transactions {where_clause} {KEYSET_ORDER} LIMIT %s"
+    return query, list(filters.values()) + cursor_params + [limit + 1]
+
+
+EXPORT_COLUMNS = ["id"] + INSERT_COLUMNS
+
+
+def _build_export_query(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    # No ORDER BY: rows leave in scan order, so the first ones are sent before the scan ends
+    where_clause, params = _bulk_where(filters, required=False)
+    return f"SELECT {', '.join(EXPORT_COLUMNS)} FROM fraud_transactions {where_clause}", params
+
+
+def _stream_cursor_name() -> str:
+    """Unique name for a server-side cursor (names are per connection, but pooled connections are reused)."""
+    return f"fraud_stream_{uuid.uuid4().hex}"
+
+
+def _build_update_query(identifier: str, data: dict) -> Tuple[str, List[Any]]:
+    if not data:
+        raise AppError(status_code=400, code="empty_update", message="No data provided for update.")
+
+    set_clause = ', '.join([f"{key} = %s" for key in data.keys()])
+    query = f"UPDATE fraud_transactions SET {set_clause} WHERE trans_num = %s;"
+    return query, list(data.values()) + [identifier]
+
+
+DELETE_QUERY = "DELETE FROM fraud_transactions WHERE trans_num = %s;"
+
+
+def _changed(rows: int, ingest: bool = False, append_only: bool = False) -> int:
+    """Drop cached tool results once a committed write changed rows; returns `rows`.
+
+    Inserts (`ingest`) are added to the column sketches by their next read. Writes that may
+    have changed existing rows also mark the columnar snapshot for a full reload (plain
+    inserts are picked up by its incremental refresh).
+    """
+    if rows:
+        invalidate_results("fraud_transactions")
+        # snapshot / sketches -> columnar -> crud: imported on use
+        if ingest:
+            from .sketches import note_ingest
+            note_ingest()
+        if not append_only:
+            from .snapshot import invalidate_snapshot
+            invalidate_snapshot()
+    return rows
+
+
+# -------------------------------------------
+# Upserts keyed on trans_num (backed by the unique index in business.domain.supabase.schema)
+# -------------------------------------------
+CONFLICT_MODES = ("nothing", "update")
+_STAGE_TABLE = "fraud_transactions_stage"
+# Rows are staged in a temp table (dropped at commit) because COPY itself has no ON CONFLICT
+STAGE_TABLE_QUERY = (
+    f"CREATE TEMP TABLE {_STAGE_TABLE} ON COMMIT DROP AS "
+    f"SELECT {', '.join(INSERT_COLUMNS)} FROM fraud_transactions WITH NO DATA"
+)
+
+
+def _conflict_clause(on_conflict: Optional[str]) -> str:
+    if on_conflict is None:
+        return ""
+    if on_conflict == "nothing":
+        return " ON CONFLICT (trans_num) DO NOTHING"
+    if on_conflict == "update":
+        set_clause = ", ".join(f"{col} = EXCLUDED.{col}" for col in BULK_UPDATE_COLUMNS)
+        return f" ON CONFLICT (trans_num) DO UPDATE SET {set_clause}"
+    raise AppError(
+        status_code=400,
+        code="invalid_conflict_mode",
+        message=f"on_conflict must be one of: {', '.join(CONFLICT_MODES)}",
+    )
+
+
+def _prepare_upsert(data: List[FraudTransactionModel], on_conflict: Optional[str]) -> List[FraudTransactionModel]:
+    """DO UPDATE cannot touch the same row twice in one statement: keep the last row per trans_num."""
+    if on_conflict != "update":
+        return data
+    return list({item.trans_num: item for item in data}.values())
+
+
+def _staged_insert_query(on_conflict: Optional[str]) -> str:
+    columns = ", ".join(INSERT_COLUMNS)
+    select = f"SELECT {columns} FROM {_STAGE_TABLE}"
+    if on_conflict == "update":
+        # Last staged row wins when a trans_num repeats
+        select = f"SELECT DISTINCT ON (trans_num) {columns} FROM {_STAGE_TABLE} ORDER BY trans_num, ctid DESC"
+    return f"INSERT INTO fraud_transactions ({columns}) {select}{_conflict_clause(on_conflict)}"
+
+
+# -------------------------------------------
+# Set-based bulk update / delete
+# -------------------------------------------
+BULK_UPDATE_COLUMNS = [col for col in INSERT_COLUMNS if col != "trans_num"]
+_MAX_BIND_PARAMS = 65535  # PostgreSQL protocol limit per statement
+_SQL_TYPES = {datetime: "timestamp", date: "date", bool: "boolean", int: "bigint", float: "double precision", str: "text"}
+_column_adapters = {
+    col: TypeAdapter(FraudTransactionModel.model_fields[attr].annotation)
+    for col, attr in zip(INSERT_COLUMNS, _INSERT_ATTRS)
+}
+
+
+def _sql_type(column: str) -> str:
+    annotation = FraudTransactionModel.model_fields[_INSERT_ATTRS[INSERT_COLUMNS.index(column)]].annotation
+    base = next((arg for arg in get_args(annotation) if arg is not type(None)), annotation)  # unwrap Optional
+    return _SQL_TYPES[base]
+
+
+def _coerce_updates(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Check update columns and convert values to the model's types (e.g. "2020-01-01" to a datetime)."""
+    if not data:
+        raise AppError(status_code=400, code="empty_update", message="No data provided for update.")
+    invalid = [key for key in data if key not in BULK_UPDATE_COLUMNS]
+    if invalid:
+        raise AppError(status_code=400, code="invalid_column", message=f"Cannot update column(s): {', '.join(invalid)}")
+    try:
+        return {key: _column_adapters[key].validate_python(value) for key, value in data.items()}
+    except ValueError as e:
+        raise AppError(status_code=400, code="invalid_value", message=str(e))
+
+
+def _bulk_where(filters: Dict[str, Any], required: bool = True) -> Tuple[str, List[Any]]:
+    """WHERE clause for a filter expression (FraudQueryTool grammar); refuses unknown (and, if `required`, empty) filters."""
+    filters = dict(filters)
+    or_filters = filters.pop("or_filters", {}) or {}
+    unknown = [key for key in list(filters) + list(or_filters) if key not in FILTER_COLUMNS]
+    if unknown:
+        raise AppError(status_code=400, code="invalid_filter", message=f"Unknown filter column(s): {', '.join(unknown)}")
+
+    where_clause, params = build_where(filters, or_filters)
+    if required and not where_clause:
+        raise AppError(status_code=400, code="empty_filter", message="A filter expression is required for bulk operations.")
+    return where_clause, params
+
+
+def _batches(items: List[Any], size: int) -> Generator[List[Any], None, None]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _build_bulk_update(
+    batch_size: int,
+    values: Optional[Dict[str, Any]] = None,
+    trans_nums: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    rows: Optional[List[Dict[str, Any]]] = None,
+) -> List[Tuple[str, List[Any]]]:
+    """One statement per batch for the three bulk update shapes.
+
+    - `values` + `trans_nums`: UPDATE ... SET ... WHERE trans_num = ANY(%s)
+    - `values` + `filters`: UPDATE ... SET ... WHERE <filters> (a single statement)
+    - `rows` (each with its own trans_num and values): UPDATE ... FROM (VALUES ...)
+    """
+    if rows is not None:
+        return _build_rows_update(batch_size, rows)
+
+    values = _coerce_updates(values or {})
+    set_clause = ", ".join(f"{key} = %s" for key in values)
+    set_params = list(values.values())
+
+    if trans_nums is not None:
+        query = f"UPDATE fraud_transactions SET {set_clause} WHERE trans_num = ANY(%s)"
+        return [(query, set_params + [batch]) for batch in _batches(trans_nums, batch_size)]
+    if filters is not None:
+        where_clause, params = _bulk_where(filters)
+        return [(f"UPDATE fraud_transactions SET {set_clause} {where_clause}", set_params + params)]
+    raise AppError(status_code=400, code="missing_selector", message="Provide trans_nums or filters.")
+
+
+def _build_rows_update(batch_size: int, rows: List[Dict[str, Any]]) -> List[Tuple[str, List[Any]]]:
+    if not rows:
+        return []
+    columns = [key for key in rows[0] if key != "trans_num"]
+    coerced: List[Dict[str, Any]] = []
+    for row in rows:
+        if "trans_num" not in row or set(row) != set(rows[0]):
+            raise AppError(
+                status_code=400,
+                code="inconsistent_rows",
+                message="Every row needs trans_num and the same set of columns.",
+            )
+        coerced.append(_coerce_updates({key: row[key] for key in columns}))
+
+    # Explicit casts: VALUES has no target column to infer parameter types from
+    placeholder = "(%s, " + ", ".join(f"CAST(%s AS {_sql_type(col)})" for col in columns) + ")"
+    set_clause = ", ".join(f"{col} = v.{col}" for col in columns)
+    per_statement = max(1, min(batch_size, _MAX_BIND_PARAMS // (len(columns) + 1)))
+
+    statements: List[Tuple[str, List[Any]]] = []
+    for batch_start in range(0, len(rows), per_statement):
+        batch = range(batch_start, min(batch_start + per_statement, len(rows)))
+        query = (
+            f"UPDATE fraud_transactions AS t SET {set_clause} "
+            f"FROM (VALUES {', '.join([placeholder] * len(batch))}) AS v(trans_num, {', '.join(columns)}) "
+            "WHERE t.trans_num = v.trans_num"
+        )
+        params: List[Any] = []
+        for i in batch:
+            params.append(rows[i]["trans_num"])
+            params.extend(coerced[i][col] for col in columns)
+        statements.append((query, params))
+    return statements
+
+
+def _build_bulk_delete(
+    batch_size: int,
+    trans_nums: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[str, List[Any]]]:
+    if trans_nums is not None:
+        query = "DELETE FROM fraud_transactions WHERE trans_num = ANY(%s)"
+        return [(query, [batch]) for batch in _batches(trans_nums, batch_size)]
+    if filters is not None:
+        where_clause, params = _bulk_where(filters)
+        return [(f"DELETE FROM fraud_transactions {where_clause}", params)]
+    raise AppError(status_code=400, code="missing_selector", message="Provide trans_nums or filters.")
+
+
 class FraudTransactionCRUD(DatabaseCRUD):
     """CRUD operations for the fraud_transactions table."""
 
@@ -16,77 +325,358 @@ class FraudTransactionCRUD(DatabaseCRUD):
         self.db = db
 
     # -------------------------------------------
-    # Create (supports single or bulk)
+    # Create (supports single or bulk; COPY above `db_copy_threshold` rows)
     # -------------------------------------------
-    def create(self, data: Union[FraudTransactionModel, List[FraudTransactionModel]]) -> int:
-        if isinstance(data, FraudTransactionModel):
-            data = [data]
-
-        if not data:
-            raise AppError(status_code=400, code="empty_payload", message="No transaction data provided.")
+    def create(
+        self,
+        data: Union[FraudTransactionModel, List[FraudTransactionModel]],
+        on_conflict: Optional[str] = None,
+    ) -> int:
+        """Insert rows; with `on_conflict` ("nothing" or "update") an existing trans_num is skipped
+        or overwritten, so retried batches never duplicate rows. Returns rows inserted or updated."""
+        data = _prepare_upsert(_normalize_payload(data), on_conflict)
 
-        columns = [
-            "trans_date_trans_time", "cc_num", "merchant", "category", "amt",
-            "first_name", "last_name", "gender", "street", "city", "state", "zip",
-            "lat", "long", "city_pop", "job", "dob", "trans_num", "unix_time",
-            "merch_lat", "merch_long", "is_fraud"
-        ]
+        query = f"INSERT INTO fraud_transactions ({', '.join(INSERT_COLUMNS)}) VALUES %s{_conflict_clause(on_conflict)}"
 
-        values = [tuple(item.model_dump(by_alias=True).get(col) for col in columns) for item in data]
+        try:
+            with self.db.get_cursor(caller="FraudTransactionCRUD.create") as cursor:
+                if len(data) >= self.db.settings.db_copy_threshold:
+                    self._copy(cursor, _copy_buffer(data), "text", on_conflict)
+                else:
+                    values = _insert_values(data)
+                    # One page, so rowcount covers every row
+                    execute_values(cursor, query, values, page_size=len(values))
+                inserted = cursor.rowcount  # Number of rows inserted (or updated)
+        except Exception as e:
+            raise AppError(
+                status_code=500,
+                code="db_insert_failed",
+                message=f"Failed to insert transactions: {str(e)}"
+            )
+        return _changed(inserted, ingest=True, append_only=on_conflict != "update")
 
-        query = f"INSERT INTO fraud_transactions ({', '.join(columns)}) VALUES %s"
+    def copy_csv(self, data: bytes, on_conflict: Optional[str] = None) -> int:
+        """Insert rows already encoded as headerless CSV in `INSERT_COLUMNS` order (e.g. a validated Arrow table)."""
+        _conflict_clause(on_conflict)
 
         try:
-            with self.db.get_cursor() as cursor:
-                execute_values(cursor, query, values)
-                return cursor.rowcount  # Number of rows inserted
+            with self.db.get_cursor(caller="FraudTransactionCRUD.copy_csv") as cursor:
+                self._copy(cursor, io.BytesIO(data), "csv", on_conflict)
+                inserted = cursor.rowcount
         except Exception as e:
             raise AppError(
                 status_code=500,
                 code="db_insert_failed",
                 message=f"Failed to insert transactions: {str(e)}"
             )
+        return _changed(inserted, ingest=True, append_only=on_conflict != "update")
+
+    def _copy(self, cursor: Any, buffer: Union[io.StringIO, io.BytesIO], fmt: str, on_conflict: Optional[str]) -> None:
+        """COPY `buffer` into the table, through the staging table when upserting."""
+        if on_conflict:
+            cursor.execute(STAGE_TABLE_QUERY)
+        cursor.copy_expert(_copy_query(_STAGE_TABLE if on_conflict else "fraud_transactions", fmt), buffer)
+        if on_conflict:
+            cursor.execute(_staged_insert_query(on_conflict))
 
     # -------------------------------------------
     #  Read
     # -------------------------------------------
-    def read(self, limit: int = 100, **filters) -> List[FraudTransactionModel]:
-        query = "SELECT * FROM fraud_transactions"
-        params = []
+    @primary_fallback
+    def read(self, limit: int = 100, validate: bool = True, **filters) -> List[Any]:
+        """Rows as models, or as the cursor's dicts with `validate=False` (trusted rows, fast serialization path)."""
+        query, params = _build_read_query(limit, filters)
 
-        if filters:
-            conditions = [f"{key} = %s" for key in filters.keys()]
-            query += " WHERE " + " AND ".join(conditions)
-            params.extend(filters.values())
+        with self.db.get_cursor(readonly=True, caller="FraudTransactionCRUD.read") as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
-        query += " LIMIT %s"
-        params.append(limit)
+        return _rows_adapter.validate_python(rows) if validate else rows
+
+    @primary_fallback
+    def page(
+        self, limit: int = 100, cursor: Optional[str] = None, validate: bool = True, **filters
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Newest-first page after `cursor`; returns the rows and the next page's cursor (None at the end)."""
+        query, params = _build_page_query(limit, cursor, filters)
+
+        with self.db.get_cursor(readonly=True, caller="FraudTransactionCRUD.page") as db_cursor:
+            db_cursor.execute(query, params)
+            rows = db_cursor.fetchall()
+
+        return split_page(_rows_adapter.validate_python(rows) if validate else rows, limit)
+
+    def stream(
+        self,
+        batch_size: Optional[int] = None,
+        limit: Optional[int] = None,
+        **filters,
+    ) -> Generator[List[FraudTransactionModel], None, None]:
+        """Yield validated batches from a server-side cursor (constant memory for large scans).
 
-        with self.db.get_cursor() as cursor:
+        The pooled connection stays checked out until the generator is exhausted or closed.
+        """
+        query, params = _build_read_query(limit, filters)
+
+        with self.db.get_cursor(
+            name=_stream_cursor_name(), itersize=batch_size, readonly=True, caller="FraudTransactionCRUD.stream"
+        ) as cursor:
             cursor.execute(query, params)
-            rows = cursor.fetchall()
+            while True:
+                rows = cursor.fetchmany(cursor.itersize)
+                if not rows:
+                    break
+                yield _rows_adapter.validate_python(rows)
+
+    def export(
+        self, filters: Optional[Dict[str, Any]] = None, batch_size: Optional[int] = None
+    ) -> Generator[List[Dict[str, Any]], None, None]:
+        """Yield raw row dicts (`EXPORT_COLUMNS`) matching a filter expression, from a server-side cursor.
 
-        return TypeAdapter(List[FraudTransactionModel]).validate_python(rows)
+        Unlike `stream`, rows are not validated into models: they go straight to an encoder.
+        """
+        query, params = _build_export_query(filters or {})
+
+        with self.db.get_cursor(
+            name=_stream_cursor_name(), itersize=batch_size, readonly=True, caller="FraudTransactionCRUD.export"
+        ) as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(cursor.itersize)
+                if not rows:
+                    break
+                yield rows
 
     # -------------------------------------------
     # Update
     # -------------------------------------------
     def update(self, identifier: str, data: dict) -> int:
-        if not data:
-            raise AppError(status_code=400, code="empty_update", message="No data provided for update.")
+        query, params = _build_update_query(identifier, data)
 
-        set_clause = ', '.join([f"{key} = %s" for key in data.keys()])
-        query = f"UPDATE fraud_transactions SET {set_clause} WHERE trans_num = %s;"
-
-        with self.db.get_cursor() as cursor:
-            cursor.execute(query, list(data.values()) + [identifier])
-            return cursor.rowcount  # Rows updated
+        with self.db.get_cursor(caller="FraudTransactionCRUD.update") as cursor:
+            cursor.execute(query, params)
+            updated = cursor.rowcount  # Rows updated
+        return _changed(updated)
 
     # -------------------------------------------
     # Delete
     # -------------------------------------------
     def delete(self, identifier: str) -> int:
-        query = "DELETE FROM fraud_transactions WHERE trans_num = %s;"
-        with self.db.get_cursor() as cursor:
-            cursor.execute(query, (identifier,),)
-            return cursor.rowcount 
+        with self.db.get_cursor(caller="FraudTransactionCRUD.delete") as cursor:
+            cursor.execute(DELETE_QUERY, (identifier,),)
+            deleted = cursor.rowcount
+        return _changed(deleted)
+
+    # -------------------------------------------
+    # Bulk update / delete (all batches in one transaction)
+    # -------------------------------------------
+    def bulk_update(
+        self,
+        values: Optional[Dict[str, Any]] = None,
+        trans_nums: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        rows: Optional[List[Dict[str, Any]]] = None,
+    ) -> Tuple[int, int]:
+        """Set-based update; returns (rows affected, statements run). See `_build_bulk_update`."""
+        statements = _build_bulk_update(self.db.settings.db_bulk_batch_size, values, trans_nums, filters, rows)
+        return self._run_bulk(statements, caller="FraudTransactionCRUD.bulk_update")
+
+    def bulk_delete(
+        self,
+        trans_nums: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[int, int]:
+        """Set-based delete by trans_num list or filter expression; returns (rows affected, statements run)."""
+        statements = _build_bulk_delete(self.db.settings.db_bulk_batch_size, trans_nums, filters)
+        return self._run_bulk(statements, caller="FraudTransactionCRUD.bulk_delete")
+
+    def _run_bulk(self, statements: List[Tuple[str, List[Any]]], caller: str) -> Tuple[int, int]:
+        affected = 0
+        with self.db.get_cursor(caller=caller) as cursor:
+            for query, params in statements:
+                cursor.execute(query, params)
+                affected += cursor.rowcount
+        return _changed(affected), len(statements)
+
+
+class AsyncFraudTransactionCRUD(AsyncDatabaseCRUD):
+    """Async CRUD operations for the fraud_transactions table (non-blocking for FastAPI handlers)."""
+
+    def __init__(self, db: AsyncDatabaseConnection):
+        if not db:
+            raise AppError(status_code=500, code="db_not_initialized", message="Database connection not provided.")
+        self.db = db
+
+    # -------------------------------------------
+    # Create (supports single or bulk; COPY above `db_copy_threshold` rows)
+    # -------------------------------------------
+    async def create(
+        self,
+        data: Union[FraudTransactionModel, List[FraudTransactionModel]],
+        on_conflict: Optional[str] = None,
+    ) -> int:
+        """Async version of `FraudTransactionCRUD.create`."""
+        data = _prepare_upsert(_normalize_payload(data), on_conflict)
+
+        placeholders = ", ".join(["%s"] * len(INSERT_COLUMNS))
+        query = (
+            f"INSERT INTO fraud_transactions ({', '.join(INSERT_COLUMNS)}) VALUES ({placeholders})"
+            f"{_conflict_clause(on_conflict)}"
+        )
+
+        try:
+            async with self.db.get_cursor(caller="AsyncFraudTransactionCRUD.create") as cursor:
+                if len(data) >= self.db.settings.db_copy_threshold:
+                    await self._copy(cursor, _copy_buffer(data), "text", on_conflict)
+                else:
+                    # psycopg 3 pipelines executemany, so this is one round trip per batch
+                    await cursor.executemany(query, _insert_values(data))
+                inserted = cursor.rowcount  # Number of rows inserted (or updated)
+        except Exception as e:
+            raise AppError(
+                status_code=500,
+                code="db_insert_failed",
+                message=f"Failed to insert transactions: {str(e)}"
+            )
+        return _changed(inserted, ingest=True, append_only=on_conflict != "update")
+
+    async def copy_csv(self, data: bytes, on_conflict: Optional[str] = None) -> int:
+        """Async version of `FraudTransactionCRUD.copy_csv`."""
+        _conflict_clause(on_conflict)
+
+        try:
+            async with self.db.get_cursor(caller="AsyncFraudTransactionCRUD.copy_csv") as cursor:
+                await self._copy(cursor, io.BytesIO(data), "csv", on_conflict)
+                inserted = cursor.rowcount
+        except Exception as e:
+            raise AppError(
+                status_code=500,
+                code="db_insert_failed",
+                message=f"Failed to insert transactions: {str(e)}"
+            )
+        return _changed(inserted, ingest=True, append_only=on_conflict != "update")
+
+    async def _copy(
+        self, cursor: Any, buffer: Union[io.StringIO, io.BytesIO], fmt: str, on_conflict: Optional[str]
+    ) -> None:
+        """Async version of `FraudTransactionCRUD._copy` (written in `_COPY_CHUNK_SIZE` pieces)."""
+        if on_conflict:
+            await cursor.execute(STAGE_TABLE_QUERY)
+        async with cursor.copy(_copy_query(_STAGE_TABLE if on_conflict else "fraud_transactions", fmt)) as copy:
+            while chunk := buffer.read(_COPY_CHUNK_SIZE):
+                await copy.write(chunk)
+        if on_conflict:
+            await cursor.execute(_staged_insert_query(on_conflict))
+
+    # -------------------------------------------
+    #  Read
+    # -------------------------------------------
+    @primary_fallback
+    async def read(self, limit: int = 100, validate: bool = True, **filters) -> List[Any]:
+        """Async version of `FraudTransactionCRUD.read`."""
+        query, params = _build_read_query(limit, filters)
+
+        async with self.db.get_cursor(readonly=True, caller="AsyncFraudTransactionCRUD.read") as cursor:
+            await cursor.execute(query, params)
+            rows = await cursor.fetchall()
+
+        return _rows_adapter.validate_python(rows) if validate else rows
+
+    @primary_fallback
+    async def page(
+        self, limit: int = 100, cursor: Optional[str] = None, validate: bool = True, **filters
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Async version of `FraudTransactionCRUD.page`."""
+        query, params = _build_page_query(limit, cursor, filters)
+
+        async with self.db.get_cursor(readonly=True, caller="AsyncFraudTransactionCRUD.page") as db_cursor:
+            await db_cursor.execute(query, params)
+            rows = await db_cursor.fetchall()
+
+        return split_page(_rows_adapter.validate_python(rows) if validate else rows, limit)
+
+    async def stream(
+        self,
+        batch_size: Optional[int] = None,
+        limit: Optional[int] = None,
+        **filters,
+    ) -> AsyncGenerator[List[FraudTransactionModel], None]:
+        """Async version of `FraudTransactionCRUD.stream`."""
+        query, params = _build_read_query(limit, filters)
+
+        async with self.db.get_cursor(
+            name=_stream_cursor_name(), itersize=batch_size, readonly=True, caller="AsyncFraudTransactionCRUD.stream"
+        ) as cursor:
+            await cursor.execute(query, params)
+            while True:
+                rows = await cursor.fetchmany(cursor.itersize)
+                if not rows:
+                    break
+                yield _rows_adapter.validate_python(rows)
+
+    async def export(
+        self, filters: Optional[Dict[str, Any]] = None, batch_size: Optional[int] = None
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """Async version of `FraudTransactionCRUD.export`."""
+        query, params = _build_export_query(filters or {})
+
+        async with self.db.get_cursor(
+            name=_stream_cursor_name(), itersize=batch_size, readonly=True, caller="AsyncFraudTransactionCRUD.export"
+        ) as cursor:
+            await cursor.execute(query, params)
+            while True:
+                rows = await cursor.fetchmany(cursor.itersize)
+                if not rows:
+                    break
+                yield rows
+
+    # -------------------------------------------
+    # Update
+    # -------------------------------------------
+    async def update(self, identifier: str, data: dict) -> int:
+        query, params = _build_update_query(identifier, data)
+
+        async with self.db.get_cursor(caller="AsyncFraudTransactionCRUD.update") as cursor:
+            await cursor.execute(query, params)
+            updated = cursor.rowcount  # Rows updated
+        return _changed(updated)
+
+    # -------------------------------------------
+    # Delete
+    # -------------------------------------------
+    async def delete(self, identifier: str) -> int:
+        async with self.db.get_cursor(caller="AsyncFraudTransactionCRUD.delete") as cursor:
+            await cursor.execute(DELETE_QUERY, (identifier,),)
+            deleted = cursor.rowcount
+        return _changed(deleted)
+
+    # -------------------------------------------
+    # Bulk update / delete (all batches in one transaction)
+    # -------------------------------------------
+    async def bulk_update(
+        self,
+        values: Optional[Dict[str, Any]] = None,
+        trans_nums: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        rows: Optional[List[Dict[str, Any]]] = None,
+    ) -> Tuple[int, int]:
+        """Async version of `FraudTransactionCRUD.bulk_update`."""
+        statements = _build_bulk_update(self.db.settings.db_bulk_batch_size, values, trans_nums, filters, rows)
+        return await self._run_bulk(statements, caller="AsyncFraudTransactionCRUD.bulk_update")
+
+    async def bulk_delete(
+        self,
+        trans_nums: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[int, int]:
+        """Async version of `FraudTransactionCRUD.bulk_delete`."""
+        statements = _build_bulk_delete(self.db.settings.db_bulk_batch_size, trans_nums, filters)
+        return await self._run_bulk(statements, caller="AsyncFraudTransactionCRUD.bulk_delete")
+
+    async def _run_bulk(self, statements: List[Tuple[str, List[Any]]], caller: str) -> Tuple[int, int]:
+        affected = 0
+        async with self.db.get_cursor(caller=caller) as cursor:
+            for query, params in statements:
+                await cursor.execute(query, params)
+                affected += cursor.rowcount
+        return _changed(affected), len(statements)
@@ -0,0 +1,60 @@
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from .columnar import encode_arrow
+from contracts.arrow_ipc import ARROW_MEDIA_TYPE
+from contracts.serialization import dumps
+
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", "arrow": ARROW_MEDIA_TYPE}
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return int(value)  # 0/1, as in fraudTest.csv
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def encode_csv(batches: AsyncIterator[List[Dict[str, Any]]], columns: Sequence[str]) -> AsyncIterator[str]:
+    """Header line, then one CSV chunk per batch (NULL is an empty cell)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(row[col]) for col in columns] for row in rows)
+        yield buffer.getvalue()
+
+
+async def encode_ndjson(batches: AsyncIterator[List[Dict[str, Any]]], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """One JSON object per line, one chunk per batch (orjson, like the JSON listing)."""
+    async for rows in batches:
+        yield b"".join(dumps({col: row[col] for col in columns}) + b"\n" for row in rows)
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson, "arrow": encode_arrow}
+
+
+async def prefetch(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Run the query up to its first batch now, so bad filters or DB errors become a normal
+    error response instead of a stream broken after the headers were sent."""
+    first: Optional[List[Dict[str, Any]]] = None
+    try:
+        first = await batches.__anext__()
+    except StopAsyncIteration:
+        pass
+
+    async def chained() -> AsyncIterator[List[Dict[str, Any]]]:
+        if first is None:
+            return
+        yield first
+        async for rows in batches:
+            yield rows
+
+    return chained()
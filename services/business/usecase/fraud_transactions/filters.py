@@ -0,0 +1,87 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from ...model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
+
+
+# Database column names (`long` rather than the model's `long_`)
+FILTER_COLUMNS = [field.alias or name for name, field in FraudTransactionModel.model_fields.items()]
+_COMPARISONS = {"gt": ">", "lt": "<", "gte": ">=", "lte": "<="}
+# Text columns (model and database names): string values match them case-insensitively.
+# trans_num is an identifier and keeps exact equality, so its unique index serves lookups.
+TEXT_COLUMNS = {
+    key
+    for name, field in FraudTransactionModel.model_fields.items()
+    if field.annotation in (str, Optional[str]) and name != "trans_num"
+    for key in (name, field.alias or name)
+}
+
+
+def text_match(column: str, value: str) -> Tuple[str, Any]:
+    """Case-insensitive match of a text column that indexes can serve.
+
+    A value containing `%` is an ILIKE pattern (a pg_trgm index can serve it); anything else is
+    equality on `lower(column)`, which the functional indexes in business.domain.supabase.schema
+    cover (`_` is literal here, so 'gas_transport' matches only itself).
+    """
+    if "%" in value:
+        return f"{column} ILIKE %s", value
+    return f"lower({column}) = lower(%s)", value
+
+
+def build_filter_clause(filters: Dict[str, Any], valid_columns: Sequence[str] = FILTER_COLUMNS) -> Tuple[List[str], List[Any]]:
+    """Translate the filter grammar shared by FraudQueryTool and the bulk endpoints into SQL conditions.
+
+    - column=value: `=` (strings match text columns case-insensitively, `%` as a wildcard; see `text_match`)
+    - column={'not': value}: `!=`
+    - column={'gt'|'lt'|'gte'|'lte': value}: comparisons
+    Unknown columns are skipped.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+
+    for key, value in filters.items():
+        if key not in valid_columns:
+            continue
+        if isinstance(value, dict):
+            # NOT
+            if "not" in value:
+                clauses.append(f"{key} != %s")
+                params.append(value["not"])
+            # Comparisons
+            for op, sql_op in _COMPARISONS.items():
+                if op in value:
+                    clauses.append(f"{key} {sql_op} %s")
+                    params.append(value[op])
+        elif isinstance(value, str) and key in TEXT_COLUMNS:
+            clause, param = text_match(key, value)
+            clauses.append(clause)
+            params.append(param)
+        else:
+            clauses.append(f"{key} = %s")
+            params.append(value)
+
+    return clauses, params
+
+
+def build_where(
+    filters: Dict[str, Any],
+    or_filters: Dict[str, Any],
+    valid_columns: Sequence[str] = FILTER_COLUMNS,
+) -> Tuple[str, List[Any]]:
+    """Combine AND filters and OR filters into a single WHERE clause ("" when there is none)."""
+    and_clauses, and_params = build_filter_clause(filters, valid_columns)
+    or_clauses, or_params = build_filter_clause(or_filters, valid_columns)
+
+    where_clause = ""
+    params: List[Any] = []
+
+    if and_clauses and or_clauses:
+        where_clause = f"WHERE {' AND '.join(and_clauses)} AND ({' OR '.join(or_clauses)})"
+        params.extend(and_params + or_params)
+    elif and_clauses:
+        where_clause = f"WHERE {' AND '.join(and_clauses)}"
+        params.extend(and_params)
+    elif or_clauses:
+        where_clause = f"WHERE {' OR '.join(or_clauses)}"
+        params.extend(or_params)
+
+    return where_clause, params
@@ -0,0 +1,196 @@
+import asyncio
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Awaitable, List, Optional, Tuple
+import pyarrow as pa
+from pydantic import TypeAdapter, ValidationError
+from ...model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
+from ...model.fraud_transactions.ingest_model import IngestBatchModel, IngestResultModel, RejectedRowModel
+from .columnar import to_copy_csv, validate_table
+from .crud import AsyncFraudTransactionCRUD
+from contracts.arrow_ipc import read_ipc
+from contracts.errors import AppError
+
+
+# `fraudTest.csv` header names that differ from the model (same renames as extra/put_table_to_supabase.py)
+CSV_COLUMN_RENAMES = {"first": "first_name", "last": "last_name"}
+MAX_REJECTED_DETAILS = 50
+
+_MODEL_KEYS = {field.alias or name for name, field in FraudTransactionModel.model_fields.items()}
+_row_adapter = TypeAdapter(FraudTransactionModel)
+
+Record = Tuple[int, Any]  # (1-based row number in the file, parsed row or parse error)
+
+
+# -------------------------------------------
+# Incremental parsers: bytes chunks in, one record at a time out
+# -------------------------------------------
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines (newline kept) without holding more than one line."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        # The last piece may be an incomplete line: keep it for the next chunk
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Yield (row_number, dict) per CSV row, with a header row naming the columns.
+
+    Quoted fields may span lines: lines are joined until their quotes balance.
+    """
+    header: Optional[List[str]] = None
+    record = ""
+    row_number = 0
+
+    async for line in _iter_lines(chunks):
+        record += line
+        if record.count('"') % 2:
+            continue  # inside a quoted field
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [CSV_COLUMN_RENAMES.get(name.strip(), name.strip()) for name in values]
+            continue
+
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, ValueError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        yield row_number, {
+            key: (value if value != "" else None)
+            for key, value in zip(header, values)
+            if key in _MODEL_KEYS
+        }
+
+    if record.strip():
+        yield row_number + 1, ValueError("unterminated quoted field at end of file")
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Yield (row_number, dict) per non-empty NDJSON line."""
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"invalid JSON: {e.msg}")
+
+
+PARSERS = {"csv": iter_csv_records, "ndjson": iter_ndjson_records}
+
+
+def _validate(records: List[Record]) -> Tuple[List[FraudTransactionModel], List[RejectedRowModel]]:
+    valid: List[FraudTransactionModel] = []
+    rejected: List[RejectedRowModel] = []
+    for row_number, record in records:
+        if isinstance(record, Exception):
+            rejected.append(RejectedRowModel(row=row_number, error=str(record)))
+            continue
+        try:
+            valid.append(_row_adapter.validate_python(record))
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            rejected.append(RejectedRowModel(row=row_number, error=errors))
+    return valid, rejected
+
+
+def _validate_arrow(table: pa.Table, first_row: int) -> Tuple[int, bytes, List[RejectedRowModel]]:
+    table = table.rename_columns([CSV_COLUMN_RENAMES.get(name, name) for name in table.column_names])
+    valid, rejected = validate_table(table, first_row)
+    return valid.num_rows, to_copy_csv(valid), rejected
+
+
+class FraudTransactionIngest:
+    """Load a CSV / NDJSON upload in bounded batches.
+
+    Rows are parsed as the body arrives, validated `batch_size` at a time (off the event
+    loop) and each batch is inserted before the next one is read, so memory stays
+    constant regardless of the file size. Invalid rows are counted and skipped; a
+    batch the database refuses is reported as failed and the upload continues.
+
+    With `on_conflict` ("nothing" or "update") the upload is idempotent: re-sending a
+    file, or a batch after a failure, does not duplicate rows already loaded.
+
+    Arrow IPC bodies are read whole (they are compact and columnar), validated one
+    column at a time instead of one model per row, and written with COPY.
+    """
+
+    def __init__(
+        self, crud: AsyncFraudTransactionCRUD, batch_size: int = 5000, on_conflict: Optional[str] = None
+    ) -> None:
+        self.crud = crud
+        self.batch_size = batch_size
+        self.on_conflict = on_conflict
+
+    async def ingest(self, chunks: AsyncIterator[bytes], fmt: str) -> IngestResultModel:
+        if fmt == "arrow":
+            return await self._ingest_arrow(chunks)
+        parser = PARSERS.get(fmt)
+        if parser is None:
+            raise AppError(status_code=415, code="unsupported_format", message=f"Unsupported upload format: {fmt}")
+
+        result = IngestResultModel(format=fmt)
+        records: List[Record] = []
+
+        async for record in parser(chunks):
+            records.append(record)
+            if len(records) >= self.batch_size:
+                await self._write_batch(records, result)
+                records = []
+        if records:
+            await self._write_batch(records, result)
+
+        return result
+
+    async def _ingest_arrow(self, chunks: AsyncIterator[bytes]) -> IngestResultModel:
+        body = b"".join([chunk async for chunk in chunks])
+        table = await asyncio.to_thread(read_ipc, body)
+
+        result = IngestResultModel(format="arrow")
+        for offset in range(0, table.num_rows, self.batch_size):
+            rows = table.slice(offset, self.batch_size)
+            valid, data, rejected = await asyncio.to_thread(_validate_arrow, rows, offset + 1)
+            batch = IngestBatchModel(batch=len(result.batches) + 1, rows=rows.num_rows, rejected=len(rejected))
+            if valid:
+                await self._insert(batch, valid, self.crud.copy_csv(data, on_conflict=self.on_conflict))
+            self._record(batch, rejected, result)
+        return result
+
+    async def _write_batch(self, records: List[Record], result: IngestResultModel) -> None:
+        valid, rejected = await asyncio.to_thread(_validate, records)
+        batch = IngestBatchModel(batch=len(result.batches) + 1, rows=len(records), rejected=len(rejected))
+
+        if valid:
+            await self._insert(batch, len(valid), self.crud.create(valid, on_conflict=self.on_conflict))
+        self._record(batch, rejected, result)
+
+    async def _insert(self, batch: IngestBatchModel, valid: int, insert: Awaitable[int]) -> None:
+        try:
+            batch.inserted = await insert
+            batch.skipped = max(valid - batch.inserted, 0)
+        except AppError as e:
+            batch.rejected += valid
+            batch.error = e.message
+
+    def _record(self, batch: IngestBatchModel, rejected: List[RejectedRowModel], result: IngestResultModel) -> None:
+        result.batches.append(batch)
+        result.rows += batch.rows
+        result.inserted += batch.inserted
+        result.skipped += batch.skipped
+        result.rejected += batch.rejected
+        room = MAX_REJECTED_DETAILS - len(result.rejected_rows)
+        if room > 0:
+            result.rejected_rows.extend(rejected[:room])
@@ -0,0 +1,52 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from contracts.errors import AppError
+
+
+# Keyset pagination over (trans_date_trans_time, id), newest first. The id breaks ties
+# between transactions with the same timestamp, so every row is seen exactly once.
+# Each page is a range scan starting after the last row of the previous one, so page N
+# costs the same as page 1 (an index on (trans_date_trans_time DESC, id DESC) turns it
+# into an index range scan instead of a top-N sort).
+KEYSET_ORDER = "ORDER BY trans_date_trans_time DESC, id DESC"
+KEYSET_CONDITION = "(trans_date_trans_time, id) < (%s, %s)"
+
+
+def encode_cursor(trans_date_trans_time: datetime, id: int) -> str:
+    """Opaque continuation token for the row a page ended on."""
+    payload = json.dumps([trans_date_trans_time.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(timestamp), int(id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise AppError(status_code=400, code="invalid_cursor", message="Invalid or corrupted pagination cursor.")
+
+
+def keyset_clause(where_clause: str, cursor: Optional[str]) -> Tuple[str, List[Any]]:
+    """Extend an optional `WHERE ...` clause with the keyset condition of `cursor`."""
+    if cursor is None:
+        return where_clause, []
+    condition = f"{where_clause} AND {KEYSET_CONDITION}" if where_clause else f"WHERE {KEYSET_CONDITION}"
+    return condition, list(decode_cursor(cursor))
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim a `limit + 1` fetch to `limit` rows and build the token for the next page.
+
+    Rows can be dicts or models; the token is None on the last page.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    if isinstance(last, dict):
+        return page, encode_cursor(last["trans_date_trans_time"], last["id"])
+    return page, encode_cursor(last.trans_date_trans_time, last.id)
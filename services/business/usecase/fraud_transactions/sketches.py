@@ -0,0 +1,267 @@
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from .columnar import ARROW_SCHEMA
+from .snapshot import copy_rows
+from business.domain.supabase.connection import SupabaseDB, primary_fallback
+
+
+logger = logging.getLogger("services.sketches")
+
+# Columns with a distinct-count and frequent-values sketch (the high-cardinality ones the
+# agent asks `distinct` about, plus a few low-cardinality ones that come for free)
+SKETCH_COLUMNS = ("merchant", "category", "cc_num", "trans_num", "job", "city", "state", "zip")
+SKETCH_SCHEMA = pa.schema([ARROW_SCHEMA.field("id")] + [ARROW_SCHEMA.field(col) for col in SKETCH_COLUMNS])
+
+_U64 = np.uint64
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser: every input bit affects every output bit."""
+    x = x.astype(_U64)
+    x ^= x >> _U64(30)
+    x *= _U64(0xBF58476D1CE4E5B9)
+    x ^= x >> _U64(27)
+    x *= _U64(0x94D049BB133111EB)
+    x ^= x >> _U64(31)
+    return x
+
+
+def hash_values(values: np.ndarray) -> np.ndarray:
+    """Stable 64-bit hashes of integers or strings, vectorised (strings as 8-byte words of UTF-32).
+
+    A string's hash depends on its own characters only, not on the longest string of the
+    batch: each one is mixed word by word up to its own length, then with that length.
+    """
+    if values.dtype.kind in "iu":
+        return _mix(values.astype(np.int64).view(_U64))
+    text = values.astype(str)
+    width = max(text.dtype.itemsize, 8)
+    padded = np.zeros(len(text), dtype=f"U{-(-width // 8) * 2}")  # a whole number of 8-byte words
+    padded[:] = text
+    words = padded.view(_U64).reshape(len(text), -1)
+    lengths = np.char.str_len(text).astype(_U64)
+    word_counts = (lengths + _U64(1)) // _U64(2)  # two UTF-32 characters per word
+    hashes = np.full(len(text), 0x9E3779B97F4A7C15, dtype=_U64)
+    for index, column in enumerate(words.T):
+        hashes = np.where(word_counts > index, _mix(hashes ^ column), hashes)
+    return _mix(hashes ^ lengths)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    length = np.zeros(len(x), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= (_U64(1) << _U64(shift))
+        length += high.astype(np.uint8) * shift
+        x = np.where(high, x >> _U64(shift), x)
+    return length + (x > 0)
+
+
+class HyperLogLog:
+    """Distinct-count sketch: 2**precision one-byte registers, ~1.04 / sqrt(2**precision) relative error."""
+
+    def __init__(self, precision: int = 14, registers: Optional[np.ndarray] = None) -> None:
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> "HyperLogLog":
+        """A new sketch that has also seen `hashes` (this one is left untouched for current readers)."""
+        p = _U64(self.precision)
+        index = (hashes >> (_U64(64) - p)).astype(np.intp)
+        rest = hashes & ((_U64(1) << (_U64(64) - p)) - _U64(1))
+        rank = (64 - self.precision) - _bit_length(rest) + 1  # leading zeros of the remaining bits, plus one
+        registers = self.registers.copy()
+        np.maximum.at(registers, index, rank.astype(np.uint8))
+        return HyperLogLog(self.precision, registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))  # linear counting for small cardinalities
+        return int(round(raw))
+
+
+class FrequentItems:
+    """Misra-Gries summary: at most `capacity` counters; each count is at most `error` below the true one.
+
+    Batches are summarised with their exact value counts, then merged by adding the counters
+    and subtracting the (capacity + 1)-th largest (mergeable summaries keep the same bound).
+    """
+
+    def __init__(self, capacity: int = 1024, counts: Optional[Dict[Any, int]] = None, error: int = 0) -> None:
+        self.capacity = capacity
+        self.counts = counts if counts is not None else {}
+        self.error = error
+
+    def add(self, values: List[Any], counts: np.ndarray) -> "FrequentItems":
+        """A new summary that has also seen `values` `counts` times each."""
+        error = self.error
+        if len(counts) > self.capacity:
+            # Reduce the batch first, vectorised, so only `capacity` values reach the dict merge
+            threshold = int(-np.partition(-counts, self.capacity)[self.capacity])
+            keep = np.flatnonzero(counts > threshold)
+            values, counts = [values[i] for i in keep], counts[keep] - threshold
+            error += threshold
+        merged = dict(self.counts)
+        for value, count in zip(values, counts.tolist()):
+            merged[value] = merged.get(value, 0) + count
+        if len(merged) > self.capacity:
+            threshold = sorted(merged.values(), reverse=True)[self.capacity]
+            merged = {value: count - threshold for value, count in merged.items() if count > threshold}
+            error += threshold
+        return FrequentItems(self.capacity, merged, error)
+
+    def top(self, k: int) -> List[Tuple[Any, int]]:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class ColumnSketch:
+    """Sketches of one column's non-NULL values."""
+
+    def __init__(self, hll: HyperLogLog, items: FrequentItems, rows: int = 0) -> None:
+        self.hll = hll
+        self.items = items
+        self.rows = rows
+
+    @classmethod
+    def empty(cls, precision: int, capacity: int) -> "ColumnSketch":
+        return cls(HyperLogLog(precision), FrequentItems(capacity))
+
+    def add(self, column: pa.ChunkedArray) -> "ColumnSketch":
+        counts = pc.value_counts(column.drop_null()).flatten()  # one (value, count) per distinct value
+        if not len(counts[0]):
+            return self
+        values, frequencies = counts[0], counts[1].to_numpy()
+        return ColumnSketch(
+            self.hll.add(hash_values(values.to_numpy(zero_copy_only=False))),
+            self.items.add(values.to_pylist(), frequencies),
+            self.rows + int(frequencies.sum()),
+        )
+
+
+class ColumnSketches:
+    """Per-column sketches of fraud_transactions for approximate `distinct` answers.
+
+    - Built on first use from one COPY of the sketched columns.
+    - Kept current from the id tail: rows with an id above the last one seen are added,
+      right away after this process ingested rows (`note_ingest`), otherwise at most every
+      `refresh_interval` seconds.
+    - Sketches cannot forget: updated or deleted rows (and ids that committed out of
+      order) are only reflected by the full rebuild every `max_age` seconds.
+    """
+
+    def __init__(
+        self, refresh_interval: float = 30.0, max_age: float = 3600.0, precision: int = 14, capacity: int = 1024
+    ) -> None:
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.precision = precision
+        self.capacity = capacity
+        self._sketches: Optional[Dict[str, ColumnSketch]] = None
+        self._max_id = 0
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._behind = False
+        self._built_at = 0.0
+        self._refreshed_at = 0.0
+        self._builds = 0
+        self._appends = 0
+        self._last_refresh_ms = 0.0
+
+    def note_ingest(self) -> None:
+        """Rows were inserted: the next read adds them first."""
+        self._behind = True
+
+    def _due(self, now: float) -> bool:
+        return self._behind or now - self._refreshed_at >= self.refresh_interval
+
+    def sketches(self, db: SupabaseDB) -> Tuple[Dict[str, ColumnSketch], int]:
+        """(sketch per column, rows seen), brought up to date first when due.
+
+        The first build and catching up after an ingest block every caller; a periodic
+        refresh runs in one caller while the others read the previous version.
+        """
+        current = self._sketches
+        if current is not None and not self._due(time.monotonic()):
+            return current, self._rows
+        if not self._lock.acquire(blocking=current is None or self._behind):
+            return current, self._rows  # type: ignore
+        try:
+            now = time.monotonic()
+            if self._sketches is None or self._due(now):
+                self._refresh(db, full=self._sketches is None or now - self._built_at >= self.max_age)
+        finally:
+            self._lock.release()
+        return self._sketches, self._rows  # type: ignore
+
+    @primary_fallback
+    def _refresh(self, db: SupabaseDB, full: bool) -> None:
+        started = time.monotonic()
+        self._behind = False  # an ingest from here on is picked up by the next read
+        if full or self._sketches is None:
+            sketches = {col: ColumnSketch.empty(self.precision, self.capacity) for col in SKETCH_COLUMNS}
+            rows, max_id = 0, 0
+        else:
+            sketches, rows, max_id = dict(self._sketches), self._rows, self._max_id
+
+        with db.get_cursor(readonly=True, caller="ColumnSketches.refresh") as cursor:
+            table = copy_rows(cursor, max_id, SKETCH_SCHEMA)
+        if table.num_rows:
+            sketches = {col: sketch.add(table.column(col)) for col, sketch in sketches.items()}
+            max_id = max(max_id, int(pc.max(table.column("id")).as_py()))
+
+        self._sketches, self._rows, self._max_id = sketches, rows + table.num_rows, max_id
+        now = time.monotonic()
+        self._refreshed_at = now
+        self._last_refresh_ms = (now - started) * 1000
+        if full:
+            self._built_at = now
+            self._builds += 1
+            logger.info("Built column sketches over %d rows in %.0f ms", table.num_rows, self._last_refresh_ms)
+        elif table.num_rows:
+            self._appends += 1
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        built = self._sketches is not None
+        return {
+            "built": built,
+            "columns": list(SKETCH_COLUMNS),
+            "rows": self._rows,
+            "max_id": self._max_id,
+            "age_seconds": round(now - self._built_at, 2) if built else 0.0,
+            "behind": self._behind,
+            "builds": self._builds,
+            "appends": self._appends,
+            "last_refresh_ms": round(self._last_refresh_ms, 2),
+        }
+
+
+# -------------------------------------------
+# Process-wide instance
+# -------------------------------------------
+_sketches: Optional[ColumnSketches] = None
+_sketches_lock = threading.Lock()
+
+
+def get_sketches(refresh_interval: float = 30.0, max_age: float = 3600.0) -> ColumnSketches:
+    """Return the process-wide sketches, creating them (built on first use) with these limits."""
+    global _sketches
+    with _sketches_lock:
+        if _sketches is None:
+            _sketches = ColumnSketches(refresh_interval=refresh_interval, max_age=max_age)
+        return _sketches
+
+
+def note_ingest() -> None:
+    """Called by writers that inserted rows; a no-op until something has used the sketches."""
+    if _sketches is not None:
+        _sketches.note_ingest()
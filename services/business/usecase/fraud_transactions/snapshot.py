@@ -0,0 +1,267 @@
+import io
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from .columnar import ARROW_SCHEMA
+from business.domain.supabase.connection import SupabaseDB, primary_fallback
+
+
+logger = logging.getLogger("services.snapshot")
+
+SNAPSHOT_MODES = ("on", "verify")
+# Every column but trans_num: unique per row, so it would only cost memory (nothing aggregates it)
+SNAPSHOT_SCHEMA = pa.schema([field for field in ARROW_SCHEMA if field.name != "trans_num"])
+
+_STATS_QUERY = "SELECT COUNT(*) AS rows, COALESCE(MAX(id), 0) AS max_id FROM fraud_transactions"
+# Text ordering in Python (code points) only matches the database under a byte-order collation
+_COLLATION_QUERY = "SELECT datcollate FROM pg_database WHERE datname = current_database()"
+_BYTE_ORDER_COLLATIONS = ("C", "POSIX", "C.UTF-8", "C.utf8")
+
+
+def copy_rows(cursor: Any, after_id: int, schema: pa.Schema = SNAPSHOT_SCHEMA) -> pa.Table:
+    """`schema`'s columns of the rows with id > `after_id`, COPYed as CSV and parsed by Arrow
+    (no per-row Python objects)."""
+    query = (
+        f"COPY (SELECT {', '.join(schema.names)} FROM fraud_transactions WHERE id > {int(after_id)}) "
+        "TO STDOUT WITH (FORMAT csv, HEADER true)"
+    )
+    convert = pa_csv.ConvertOptions(
+        column_types=schema,
+        true_values=["t"],
+        false_values=["f"],
+        null_values=[""],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,  # COPY quotes empty strings, NULL is unquoted
+    )
+    buffer = io.BytesIO()
+    cursor.copy_expert(query, buffer)
+    buffer.seek(0)
+    return pa_csv.read_csv(buffer, convert_options=convert)
+
+
+class SnapshotData:
+    """One immutable version of the snapshot: a NumPy array per column.
+
+    Text columns are dictionary-encoded: `arrays[col]` holds int32 codes into
+    `dictionaries[col]` (-1 for NULL), so filters and group-bys work on integers and
+    string predicates are evaluated once per distinct value. NULL elsewhere is NaN
+    (numbers) or NaT (timestamps / dates).
+    """
+
+    def __init__(
+        self,
+        arrays: Dict[str, np.ndarray],
+        dictionaries: Dict[str, np.ndarray],
+        lookups: Dict[str, Dict[str, int]],
+        byte_order_text: bool,
+    ) -> None:
+        self.arrays = arrays
+        self.dictionaries = dictionaries
+        self.lookups = lookups  # text column -> {value: code}
+        self.byte_order_text = byte_order_text
+        self.rows = len(arrays["id"])
+        self.max_id = int(arrays["id"].max()) if self.rows else 0
+
+    @classmethod
+    def from_table(cls, table: pa.Table, byte_order_text: bool) -> "SnapshotData":
+        return cls._decode(table, {}, {}, byte_order_text)
+
+    def append(self, table: pa.Table) -> "SnapshotData":
+        """A new version with `table`'s rows added (this one is left untouched for current readers)."""
+        if not table.num_rows:
+            return self
+        tail = self._decode(
+            table,
+            dict(self.dictionaries),
+            {col: dict(lookup) for col, lookup in self.lookups.items()},
+            self.byte_order_text,
+        )
+        arrays = {col: np.concatenate([self.arrays[col], tail.arrays[col]]) for col in self.arrays}
+        return SnapshotData(arrays, tail.dictionaries, tail.lookups, self.byte_order_text)
+
+    @staticmethod
+    def _decode(
+        table: pa.Table,
+        dictionaries: Dict[str, np.ndarray],
+        lookups: Dict[str, Dict[str, int]],
+        byte_order_text: bool,
+    ) -> "SnapshotData":
+        """Arrow columns to NumPy; new text values extend the (copied) dictionaries of the previous version."""
+        arrays: Dict[str, np.ndarray] = {}
+        for field in SNAPSHOT_SCHEMA:
+            column = table.column(field.name)
+            if field.type != pa.string():
+                arrays[field.name] = column.to_numpy()
+                continue
+
+            encoded = column.combine_chunks().dictionary_encode()
+            lookup = lookups.setdefault(field.name, {})
+            known = len(lookup)
+            values = encoded.dictionary.to_pylist()
+            remap = np.array([lookup.setdefault(value, len(lookup)) for value in values] + [-1], dtype=np.int32)
+            indices = pc.fill_null(encoded.indices, -1).to_numpy()
+            arrays[field.name] = remap[indices]  # -1 (NULL) picks the trailing -1
+            new_values = np.array(list(lookup)[known:], dtype=object)
+            previous = dictionaries.get(field.name, np.array([], dtype=object))
+            dictionaries[field.name] = np.concatenate([previous, new_values]) if len(new_values) else previous
+        return SnapshotData(arrays, dictionaries, lookups, byte_order_text)
+
+    def is_text(self, column: str) -> bool:
+        return column in self.dictionaries
+
+    def nulls(self, column: str) -> np.ndarray:
+        values = self.arrays[column]
+        if self.is_text(column):
+            return values < 0
+        if values.dtype.kind == "f":
+            return np.isnan(values)
+        if values.dtype.kind == "M":
+            return np.isnat(values)
+        if values.dtype == object:
+            return np.array([value is None for value in values], dtype=bool)
+        return np.zeros(len(values), dtype=bool)
+
+
+class ColumnarSnapshot:
+    """In-process columnar copy of fraud_transactions for fraud_summary_tool's aggregations.
+
+    - The first `data()` call loads the table with one COPY.
+    - Afterwards, at most every `refresh_interval` seconds, rows with an id above the
+      snapshot's are appended. A row count that then disagrees with the database
+      (deleted rows, or ids that committed out of order) forces a full reload.
+    - Updates cannot be seen that way: this process's CRUD writes that change existing
+      rows call `invalidate()`, and a full reload every `max_age` seconds picks up the
+      ones made elsewhere.
+    Readers keep the `SnapshotData` they got; a refresh swaps in a new version.
+    """
+
+    def __init__(self, refresh_interval: float = 30.0, max_age: float = 900.0) -> None:
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self._data: Optional[SnapshotData] = None
+        self._lock = threading.Lock()  # one refresh at a time
+        self._stats_lock = threading.Lock()
+        self._stale = False
+        self._loaded_at = 0.0
+        self._refreshed_at = 0.0
+        self._full_loads = 0
+        self._appends = 0
+        self._rows_appended = 0
+        self._last_refresh_ms = 0.0
+        self._outcomes = {"served": 0, "unsupported": 0, "verified": 0, "mismatches": 0}
+
+    def invalidate(self) -> None:
+        """Existing rows changed: the next refresh reloads everything."""
+        self._stale = True
+
+    def _due(self, now: float) -> bool:
+        return self._stale or now - self._refreshed_at >= self.refresh_interval
+
+    def data(self, db: SupabaseDB) -> SnapshotData:
+        """The current snapshot, refreshed first when due.
+
+        The first load and reloads after `invalidate()` block every caller; a periodic
+        refresh runs in one caller while the others keep reading the previous version.
+        """
+        data = self._data
+        if data is not None and not self._due(time.monotonic()):
+            return data
+        if not self._lock.acquire(blocking=data is None or self._stale):
+            return data  # type: ignore
+        try:
+            if self._data is None or self._due(time.monotonic()):
+                self._refresh(db)
+        finally:
+            self._lock.release()
+        return self._data  # type: ignore
+
+    @primary_fallback
+    def _refresh(self, db: SupabaseDB) -> None:
+        started = time.monotonic()
+        current = self._data
+        full = current is None or self._stale or started - self._loaded_at >= self.max_age
+        if full:
+            self._stale = False  # an invalidation from here on triggers another reload
+
+        with db.get_cursor(readonly=True, caller="ColumnarSnapshot.refresh") as cursor:
+            # Count, tail and (if needed) the full reload all see the same database state
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            updated: Optional[SnapshotData] = None
+            if not full and current is not None:
+                cursor.execute(_STATS_QUERY)
+                stats = cursor.fetchone()
+                tail = copy_rows(cursor, current.max_id) if stats["max_id"] > current.max_id else None  # type: ignore
+                updated = current.append(tail) if tail is not None else current
+                if updated.rows != stats["rows"]:  # type: ignore
+                    logger.info("Snapshot row count drifted (%d vs %d), reloading", updated.rows, stats["rows"])  # type: ignore
+                    updated, full = None, True
+                elif tail is not None and tail.num_rows:
+                    self._appends += 1
+                    self._rows_appended += tail.num_rows
+
+            if updated is None:
+                cursor.execute(_COLLATION_QUERY)
+                byte_order_text = cursor.fetchone()["datcollate"] in _BYTE_ORDER_COLLATIONS  # type: ignore
+                updated = SnapshotData.from_table(copy_rows(cursor, 0), byte_order_text)
+
+        self._data = updated
+        now = time.monotonic()
+        self._refreshed_at = now
+        if full:
+            self._loaded_at = now
+            self._full_loads += 1
+            logger.info("Loaded snapshot of %d rows in %.0f ms", updated.rows, (now - started) * 1000)
+        self._last_refresh_ms = (now - started) * 1000
+
+    # -------------------------------------------
+    # Stats
+    # -------------------------------------------
+    def record(self, outcome: str) -> None:
+        """Count a tool request: served / unsupported (went to Postgres) / verified / mismatches."""
+        with self._stats_lock:
+            self._outcomes[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        data = self._data
+        now = time.monotonic()
+        with self._stats_lock:
+            outcomes = dict(self._outcomes)
+        return {
+            "loaded": data is not None,
+            "rows": data.rows if data is not None else 0,
+            "max_id": data.max_id if data is not None else 0,
+            "age_seconds": round(now - self._loaded_at, 2) if data is not None else 0.0,
+            "stale": self._stale,
+            "full_loads": self._full_loads,
+            "appends": self._appends,
+            "rows_appended": self._rows_appended,
+            "last_refresh_ms": round(self._last_refresh_ms, 2),
+            **outcomes,
+        }
+
+
+# -------------------------------------------
+# Process-wide instance
+# -------------------------------------------
+_snapshot: Optional[ColumnarSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(refresh_interval: float = 30.0, max_age: float = 900.0) -> ColumnarSnapshot:
+    """Return the process-wide snapshot, creating it (empty, loaded on first use) with these limits."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = ColumnarSnapshot(refresh_interval=refresh_interval, max_age=max_age)
+        return _snapshot
+
+
+def invalidate_snapshot() -> None:
+    """Called by writers that changed existing rows; a no-op until something has used the snapshot."""
+    if _snapshot is not None:
+        _snapshot.invalidate()
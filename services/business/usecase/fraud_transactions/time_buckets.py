@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Time-series granularities and the DATE_TRUNC field of each (weeks start on Monday)
+GRANULARITIES = {"hour": "HOUR", "day": "DAY", "week": "WEEK", "month": "MONTH", "year": "YEAR"}
+# Gap filling stops (and leaves the series sparse) above this many buckets x groups
+MAX_FILLED_POINTS = 5000
+
+_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Python's DATE_TRUNC: the start of the bucket `moment` falls in."""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def next_bucket(period: datetime, granularity: str) -> datetime:
+    if granularity in _STEPS:
+        return period + _STEPS[granularity]
+    if granularity == "month":
+        return period.replace(year=period.year + period.month // 12, month=period.month % 12 + 1)
+    return period.replace(year=period.year + 1)
+
+
+def open_bucket(granularity: str) -> datetime:
+    """Start of the current bucket (timestamps are naive UTC): rows before it can only change by late writes."""
+    return bucket_start(datetime.now(timezone.utc).replace(tzinfo=None), granularity)
+
+
+def _group_order(group: Tuple[Any, ...]) -> Tuple[Tuple[bool, Any], ...]:
+    return tuple((value is None, value) for value in group)  # NULLS LAST
+
+
+def fill_gaps(
+    rows: Sequence[Dict[str, Any]], granularity: str, group_by: List[str], max_points: int = MAX_FILLED_POINTS
+) -> Optional[List[Dict[str, Any]]]:
+    """Every bucket between the first and last period, for every group seen; None above `max_points`.
+
+    `rows` are ordered by period. Missing buckets get 0 for the counts (`fraud_count`,
+    `*_count`) and None for the other metrics, like an aggregate over no rows. The result is
+    ordered by period, then group values (NULL last, text in code-point order).
+    """
+    dated = [row for row in rows if row["period"] is not None]
+    undated = [dict(row) for row in rows if row["period"] is None]
+    if not dated:
+        return [dict(row) for row in rows]
+
+    groups = sorted({tuple(row[col] for col in group_by) for row in dated}, key=_group_order)
+    present = {(row["period"], *(row[col] for col in group_by)): row for row in dated}
+    measures = [name for name in dated[0] if name != "period" and name not in group_by]
+    empty = {name: 0 if name == "fraud_count" or name.endswith("_count") else None for name in measures}
+
+    periods: List[datetime] = []
+    period, last = dated[0]["period"], dated[-1]["period"]
+    while period <= last:
+        periods.append(period)
+        if len(periods) * len(groups) > max_points:
+            return None
+        period = next_bucket(period, granularity)
+
+    filled: List[Dict[str, Any]] = []
+    for period in periods:
+        for group in groups:
+            row = present.get((period, *group))
+            filled.append(dict(row) if row is not None else {"period": period, **dict(zip(group_by, group)), **empty})
+    return filled + undated
@@ -1,6 +1,24 @@
 import time
+from typing import List
 from ..abc import Usecase
-from ...model.health import HealthModel
+from ...model.health import (
+    HealthModel,
+    DatabasePoolModel,
+    PreparedStatementStatsModel,
+    QueryLatencyModel,
+    QueryStatsModel,
+    ResultCacheStatsModel,
+    SlowQueryModel,
+    SketchStatsModel,
+    SnapshotStatsModel,
+)
+from ...domain.supabase.instrumentation import get_instrumentation
+from ...domain.supabase.pool import all_pool_stats
+from ...domain.supabase.prepared import all_statement_cache_stats
+from ...domain.supabase.result_cache import get_result_cache
+from ..fraud_transactions.sketches import ColumnSketches, get_sketches
+from ..fraud_transactions.snapshot import SNAPSHOT_MODES, ColumnarSnapshot, get_snapshot
+from config import get_settings
 
 
 class HealthUsecase(Usecase):
@@ -10,3 +28,51 @@ class HealthUsecase(Usecase):
     def execute(self) -> HealthModel:
         uptime = time.time() - self._start_time
         return HealthModel(status="ok", uptime_seconds=round(uptime, 2))
+
+
+class DatabasePoolUsecase(Usecase):
+    def execute(self) -> List[DatabasePoolModel]:
+        return [DatabasePoolModel(**stats) for stats in all_pool_stats().values()]
+
+
+class PreparedStatementUsecase(Usecase):
+    def execute(self) -> List[PreparedStatementStatsModel]:
+        return [PreparedStatementStatsModel(name=name, **stats) for name, stats in all_statement_cache_stats().items()]
+
+
+class QueryStatsUsecase(Usecase):
+    def execute(self) -> QueryStatsModel:
+        snapshot = get_instrumentation().snapshot()
+        return QueryStatsModel(
+            slow_query_ms=snapshot["slow_query_ms"],
+            by_caller=[QueryLatencyModel(name=name, **stats) for name, stats in snapshot["by_caller"].items()],
+            by_shape=[QueryLatencyModel(name=name, **stats) for name, stats in snapshot["by_shape"].items()],
+            slow_queries=[SlowQueryModel(**event) for event in snapshot["slow_queries"]],
+        )
+
+
+class ResultCacheUsecase(Usecase):
+    def execute(self) -> ResultCacheStatsModel:
+        settings = get_settings()
+        cache = get_result_cache(settings.tool_cache_max_entries, settings.tool_cache_ttl)
+        return ResultCacheStatsModel(**cache.stats())
+
+
+class SnapshotUsecase(Usecase):
+    def execute(self) -> SnapshotStatsModel:
+        settings = get_settings()
+        if settings.tool_snapshot_mode in SNAPSHOT_MODES:
+            snapshot = get_snapshot(settings.tool_snapshot_refresh, settings.tool_snapshot_max_age)
+        else:
+            snapshot = ColumnarSnapshot()  # disabled: report an empty snapshot
+        return SnapshotStatsModel(mode=settings.tool_snapshot_mode, **snapshot.stats())
+
+
+class SketchUsecase(Usecase):
+    def execute(self) -> SketchStatsModel:
+        settings = get_settings()
+        if settings.tool_sketches:
+            sketches = get_sketches(settings.tool_sketch_refresh, settings.tool_sketch_max_age)
+        else:
+            sketches = ColumnSketches()  # disabled: report empty sketches
+        return SketchStatsModel(enabled=settings.tool_sketches, **sketches.stats())
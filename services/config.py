@@ -20,6 +20,66 @@ class Settings(BaseSettings):
     db_port: str = ""
     db_name: str = ""
 
+    # Connection pool (shared per process by every SupabaseDB instance)
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+    db_pool_max_idle: float = 300.0       # seconds before an idle connection is closed
+    db_pool_timeout: float = 30.0         # seconds to wait for a free connection
+
+    # Rows fetched per round trip by server-side (named) cursors when streaming
+    db_stream_itersize: int = 2000
+
+    # Server-side prepared statements kept per pooled connection (LRU)
+    db_prepared_statements_max: int = 64
+
+    # Bulk writes
+    db_copy_threshold: int = 1000              # bulk creates of at least this many rows use COPY
+    db_bulk_batch_size: int = 5000             # trans_num values per statement for bulk update/delete
+    ingest_batch_size: int = 5000              # rows validated and written per batch by the upload endpoint
+
+    # Schema checks at startup
+    db_ensure_schema: bool = True              # check indexes at startup (catalog lookups only unless the flags below are set)
+    db_rollups: bool = False                   # fraud_summary_tool reads day x dimension rollups (built at startup if missing)
+    db_create_indexes: bool = False            # build missing indexes (trans_num unique, filters) at startup, CONCURRENTLY
+
+    # Read replicas for read-only work: comma separated "host[:port]" entries that share
+    # the primary's user/password/database. Empty means everything goes to the primary.
+    db_read_replicas: str = ""
+    db_replica_strategy: str = "round_robin"   # or "least_latency"
+    db_replica_retry_after: float = 30.0       # seconds an unreachable replica is skipped
+
+    # Query instrumentation
+    db_slow_query_ms: float = 500.0            # statements at or above this are logged as slow
+
+    # Cost guard for SQL generated by the agent tools (EXPLAIN before running)
+    tool_max_query_cost: float = 200000.0      # planner cost units
+    tool_max_query_rows: int = 1000000         # largest row estimate of any plan node
+    tool_statement_timeout_ms: int = 5000
+    tool_count_strategy: str = "capped"        # fraud_query_tool default: exact | capped | estimate | window
+    tool_count_cap: int = 10000                # "capped" counts stop after this many matches
+    tool_result_format: str = "columnar"       # fraud_query_tool rows: columnar (column list + value lists) | records
+    tool_max_text_length: int = 0              # fraud_query_tool cuts longer text values (0 keeps them whole)
+    tool_max_time_series_points: int = 2000    # fraud_summary_tool rejects longer time series (buckets x groups)
+
+    # Result cache for the agent tools (invalidated by CRUD writes; 0 disables)
+    tool_cache_max_entries: int = 256
+    tool_cache_ttl: float = 60.0               # seconds
+    tool_closed_bucket_ttl: float = 3600.0     # seconds closed time-series buckets are reused (only the open one is requeried)
+
+    # In-process columnar snapshot for fraud_summary_tool: off | on | verify (also runs the SQL and compares)
+    tool_snapshot_mode: str = "off"
+    tool_snapshot_refresh: float = 30.0        # seconds between incremental refreshes
+    tool_snapshot_max_age: float = 900.0       # seconds before a full reload (picks up other writers' updates)
+
+    # Per-column HyperLogLog / frequent-value sketches for fraud_summary_tool's approximate distinct mode
+    tool_sketches: bool = True
+    tool_sketch_refresh: float = 30.0          # seconds between reads of the id tail (ingests here trigger one)
+    tool_sketch_max_age: float = 3600.0        # seconds before a full rebuild (reflects updates and deletes)
+
+    # fraud_batch_tool: sub-queries per call, and how many run at once (each on its own pooled connection)
+    tool_batch_max_queries: int = 8
+    tool_batch_concurrency: int = 4
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
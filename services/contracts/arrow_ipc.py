@@ -0,0 +1,40 @@
+from typing import Any, Dict, List, Optional
+import pyarrow as pa
+from .errors import AppError
+from .serialization import dumps
+
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def table_to_ipc(table: pa.Table) -> bytes:
+    """Encode a table in the Arrow IPC streaming format."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def rows_to_ipc(
+    rows: List[Dict[str, Any]], schema: Optional[pa.Schema] = None, metadata: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """Arrow IPC stream of row dicts; `schema` fixes the column types (otherwise inferred).
+
+    `metadata` values are stored JSON-encoded in the schema metadata.
+    """
+    table = pa.Table.from_pylist(rows, schema=schema)
+    if metadata:
+        table = table.replace_schema_metadata({key: dumps(value) for key, value in metadata.items()})
+    return table_to_ipc(table)
+
+
+def read_ipc(body: bytes) -> pa.Table:
+    """Decode an Arrow IPC body, in either the streaming or the file format."""
+    try:
+        return pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid:
+        pass
+    try:
+        return pa.ipc.open_file(pa.BufferReader(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise AppError(status_code=400, code="invalid_arrow", message=f"Body is not an Arrow IPC stream or file: {e}")
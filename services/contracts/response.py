@@ -9,6 +9,7 @@ T = TypeVar("T")
 class Meta(BaseModel):
     request_id: Optional[str] = None
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    next_cursor: Optional[str] = None  # continuation token of paginated listings
 
 
 class SuccessEnvelope(GenericModel, Generic[T]):
@@ -0,0 +1,39 @@
+from decimal import Decimal
+from typing import Any, Optional
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from .response import Meta
+
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """orjson encoding of plain data (dicts/DB rows, datetimes, numpy values, pydantic models)."""
+    return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, without FastAPI's validation or `jsonable_encoder` pass."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_envelope(data: Any, meta: Optional[Meta] = None, status_code: int = 200) -> FastJSONResponse:
+    """`SuccessEnvelope` shape for data that is already trusted (e.g. rows read from our own table).
+
+    Returning a Response skips the route's `response_model` validation; keep the
+    `response_model` on the route anyway so the OpenAPI schema stays accurate.
+    """
+    meta = meta or Meta()
+    return FastJSONResponse({"data": data, "meta": meta.model_dump(mode="json")}, status_code=status_code)
@@ -0,0 +1,51 @@
+import sys
+import os
+
+# Add parent directory to sys.path (uses the services' schema module and .env)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+from business.domain.supabase.connection import SupabaseDB
+from business.domain.supabase.schema import (
+    INDEXES,
+    TRANS_NUM_UNIQUE_INDEX,
+    create_indexes,
+    ensure_trans_num_unique,
+    missing_indexes,
+    trans_num_unique_exists,
+)
+from config import get_settings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Create the fraud_transactions indexes the API and agent tools expect")
+    parser.add_argument("--check", action="store_true", help="Only list missing indexes (exit 1 if any)")
+    parser.add_argument("--blocking", action="store_true",
+                        help="Plain CREATE INDEX (faster, but blocks writes) instead of CONCURRENTLY")
+    args = parser.parse_args(argv)
+
+    db = SupabaseDB(get_settings())
+    unique_exists = trans_num_unique_exists(db)
+    missing = missing_indexes(db)
+    print(f"{'✅' if unique_exists else '❌'} {TRANS_NUM_UNIQUE_INDEX} UNIQUE (trans_num)")
+    for name, (definition, _) in INDEXES.items():
+        print(f"{'❌' if name in missing else '✅'} {name} {definition}")
+    if args.check or (unique_exists and not missing):
+        return 1 if missing or not unique_exists else 0
+
+    print(f"\n🚀 Creating {len(missing) + (not unique_exists)} index(es)...")
+    created = create_indexes(db, concurrently=not args.blocking)
+    if not unique_exists:
+        if ensure_trans_num_unique(db, concurrently=not args.blocking):
+            created.insert(0, TRANS_NUM_UNIQUE_INDEX)
+        else:
+            print(f"⚠️ {TRANS_NUM_UNIQUE_INDEX} not created: duplicate trans_num values (see the log)")
+    skipped = [name for name in missing if name not in created]
+    print(f"✅ Created: {', '.join(created) or 'none'}")
+    if skipped:
+        print(f"⚠️ Skipped (extension not available): {', '.join(skipped)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
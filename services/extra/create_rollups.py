@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add parent directory to sys.path (uses the services' rollups module and .env)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+from business.domain.supabase.connection import SupabaseDB
+from business.domain.supabase.rollups import ROLLUP_TABLE, ensure_rollups, rebuild_rollups, rollups_ready
+from config import get_settings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=f"Create and backfill {ROLLUP_TABLE} and its maintenance triggers on fraud_transactions"
+    )
+    parser.add_argument("--check", action="store_true", help="Only report whether the rollups exist (exit 1 if not)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recompute the rollup from the base table even if it already exists")
+    args = parser.parse_args(argv)
+
+    db = SupabaseDB(get_settings())
+    ready = rollups_ready(db)
+    print(f"{'✅' if ready else '❌'} {ROLLUP_TABLE}")
+    if args.check:
+        return 0 if ready else 1
+
+    # Both hold a SHARE lock on fraud_transactions (writes wait) for one full GROUP BY
+    if ready and args.rebuild:
+        print("\n🚀 Rebuilding rollups...")
+        rebuild_rollups(db)
+    elif not ready:
+        print("\n🚀 Building rollups...")
+        ensure_rollups(db)
+    else:
+        return 0
+    print(f"✅ {ROLLUP_TABLE} is ready; set DB_ROLLUPS=true so fraud_summary_tool reads it")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,98 +1,276 @@
+import sys
+import os
+
+# Add parent directory to sys.path (the db target uses the services' CRUD directly)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import pandas as pd
+import pyarrow as pa
 import requests
-from datetime import datetime
-import math
-import time
-import json
 
 # ============================================================
-# CONFIG
+# CONFIG (defaults, all overridable from the command line)
 # ============================================================
-API_URL = "http://localhost:8000/fraud/v1/transactions"  # adjust if needed
+API_URL = "http://localhost:8000/fraud/v1/transactions/upload"
 CSV_PATH = "../raw_dataset/fraudTest.csv"
-CHUNK_SIZE = 10000               # adjust (start small)
+CHUNK_SIZE = 10000           # first chunk size, then adapted to TARGET_LATENCY
+MIN_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 100000
+TARGET_LATENCY = 2.0         # seconds per chunk the sizing aims for
+CONCURRENCY = 4              # chunks in flight at once
 TIMEOUT = 120                # seconds
-RETRY_LIMIT = 3              # how many times to retry if failure
-SLEEP_BETWEEN_CHUNKS = 1.0   # seconds between chunks
+RETRY_LIMIT = 3              # attempts per chunk before the run stops
+ON_CONFLICT = "nothing"      # re-sent rows are skipped ("update" overwrites them)
+
+Result = Dict[str, int]  # inserted / skipped / rejected
+
+
+# ============================================================
+# CHECKPOINT
+# ============================================================
+class Checkpoint:
+    """Committed row ranges of one CSV, saved after every chunk.
+
+    Chunks finish out of order, so the resume point is the end of the contiguous
+    committed prefix (`watermark`). Rows past it that were already loaded are
+    sent again on resume; upserts on trans_num make that harmless.
+    """
+
+    def __init__(self, path: str, csv_path: str) -> None:
+        self.path = path
+        self.source = {"csv": os.path.abspath(csv_path), "size": os.path.getsize(csv_path)}
+        self.watermark = 0
+        self.ranges: List[Tuple[int, int]] = []
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("source") != self.source:
+                raise SystemExit(f"🚨 {path} belongs to another file ({state.get('source')}); remove it to start over.")
+            self.watermark = state["watermark"]
+            self.ranges = [tuple(r) for r in state["ranges"]]  # type: ignore
+
+    def commit(self, start: int, end: int) -> None:
+        self.ranges.append((start, end))
+        self.ranges.sort()
+        while self.ranges and self.ranges[0][0] <= self.watermark:
+            self.watermark = max(self.watermark, self.ranges.pop(0)[1])
+        self._save()
+
+    def _save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "watermark": self.watermark, "ranges": self.ranges}, f)
+        os.replace(tmp, self.path)  # atomic: a crash never leaves a half-written checkpoint
+
+
+# ============================================================
+# ADAPTIVE CHUNK SIZING
+# ============================================================
+class ChunkSizer:
+    """Scale the next chunk so one upload takes about `target` seconds (smoothed, clamped)."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target: float) -> None:
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target = target
+
+    def observe(self, rows: int, seconds: float) -> None:
+        if rows <= 0 or seconds <= 0:
+            return
+        ideal = rows * self.target / seconds
+        # Move halfway and at most 2x per step, so one slow chunk does not collapse the size
+        proposed = min(max(ideal, self.size / 2), self.size * 2)
+        self.size = int(min(max((self.size + proposed) / 2, self.minimum), self.maximum))
 
 
 # ============================================================
-# LOAD DATA
+# TARGETS
 # ============================================================
-print(f"📂 Loading CSV from {CSV_PATH}...")
-df = pd.read_csv(CSV_PATH)
+def _to_arrow(chunk: pd.DataFrame) -> pa.Table:
+    # Every column is read as text; the server-side columnar validation parses it
+    return pa.Table.from_pandas(chunk, preserve_index=False)
 
-# Fix column names
-df = df.rename(columns={
-    "first": "first_name",
-    "last": "last_name"
-})
-df = df.drop(columns=["Unnamed: 0"], errors="ignore")
 
-# Fix datetime fields
-if "trans_date_trans_time" in df.columns:
-    df["trans_date_trans_time"] = pd.to_datetime(
-        df["trans_date_trans_time"], errors="coerce"
-    ).dt.strftime("%Y-%m-%dT%H:%M:%S")
+def http_target(url: str, api_key: str, on_conflict: str, timeout: float) -> Callable[[pd.DataFrame], Result]:
+    """POST each chunk as an Arrow IPC body to the upload endpoint."""
+    from contracts.arrow_ipc import ARROW_MEDIA_TYPE, table_to_ipc
 
-if "dob" in df.columns:
-    df["dob"] = pd.to_datetime(df["dob"], errors="coerce").dt.strftime("%Y-%m-%d")
+    session = requests.Session()
+    session.headers.update({"Content-Type": ARROW_MEDIA_TYPE, "X-API-Key": api_key})
+
+    def send(chunk: pd.DataFrame) -> Result:
+        response = session.post(
+            url, data=table_to_ipc(_to_arrow(chunk)), params={"on_conflict": on_conflict}, timeout=timeout
+        )
+        if response.status_code not in (200, 201):
+            raise RuntimeError(f"status {response.status_code}: {response.text[:500]}")
+        data = response.json()["data"]
+        return {"inserted": data["inserted"], "skipped": data["skipped"], "rejected": data["rejected"]}
+
+    return send
+
+
+def db_target(on_conflict: str) -> Callable[[pd.DataFrame], Result]:
+    """Validate and COPY each chunk straight into the database, skipping the HTTP API."""
+    from business.domain.supabase.connection import SupabaseDB
+    from business.usecase.fraud_transactions.columnar import to_copy_csv, validate_table
+    from business.usecase.fraud_transactions.crud import FraudTransactionCRUD
+    from config import get_settings
+
+    crud = FraudTransactionCRUD(SupabaseDB(get_settings()))
+
+    def send(chunk: pd.DataFrame) -> Result:
+        valid, rejected = validate_table(_to_arrow(chunk))
+        inserted = crud.copy_csv(to_copy_csv(valid), on_conflict=on_conflict) if valid.num_rows else 0
+        return {"inserted": inserted, "skipped": valid.num_rows - inserted, "rejected": len(rejected)}
+
+    return send
+
+
+def with_retries(send: Callable[[pd.DataFrame], Result], attempts: int) -> Callable[[pd.DataFrame], Result]:
+    def run(chunk: pd.DataFrame) -> Result:
+        attempt = 1
+        while True:
+            try:
+                return send(chunk)
+            except Exception as e:
+                if attempt >= attempts:
+                    raise
+                delay = 2 ** attempt  # exponential backoff
+                print(f"⚠️ Chunk failed ({e}); retry {attempt}/{attempts - 1} in {delay}s")
+                time.sleep(delay)
+                attempt += 1
+
+    return run
 
-total_records = len(df)
-total_chunks = math.ceil(total_records / CHUNK_SIZE)
-print(f"🚀 Starting bulk upload: {total_records} records, {total_chunks} chunks of {CHUNK_SIZE}\n")
 
 # ============================================================
-# BULK INSERT LOOP
+# LOAD LOOP
 # ============================================================
-for i in range(total_chunks):
-    start_idx = i * CHUNK_SIZE
-    end_idx = min((i + 1) * CHUNK_SIZE, total_records)
-    chunk = df.iloc[start_idx:end_idx]
-
-    payload = chunk.to_dict(orient="records")
-
-    print(f"📦 Sending chunk {i+1}/{total_chunks} ({len(payload)} records)...")
-
-    # Retry logic
-    for attempt in range(1, RETRY_LIMIT + 1):
-        try:
-            start_time = time.time()
-            response = requests.post(API_URL, json=payload, timeout=TIMEOUT)
-            duration_ms = (time.time() - start_time) * 1000
-
-            if response.status_code in [200, 201]:
-                try:
-                    result = response.json()
-                    data = result.get("data", {})
-                    rows = data.get("rows_affected", len(payload))
-                    print(f"✅ Chunk {i+1} OK — {rows} rows ({duration_ms:.2f} ms)")
-                except json.JSONDecodeError:
-                    print(f"✅ Chunk {i+1} OK — response not JSON ({duration_ms:.2f} ms)")
+def read_chunks(csv_path: str, skip_rows: int, sizer: ChunkSizer):
+    """Yield (first_row, DataFrame) pieces sized by `sizer` at the time each one is read."""
+    reader = pd.read_csv(
+        csv_path,
+        dtype=str,
+        skiprows=range(1, skip_rows + 1),  # keep the header line
+        iterator=True,
+    )
+    offset = skip_rows
+    with reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(sizer.size)
+            except StopIteration:
+                return
+            chunk = chunk.rename(columns={"first": "first_name", "last": "last_name"})
+            chunk = chunk.drop(columns=["Unnamed: 0"], errors="ignore")
+            yield offset, chunk
+            offset += len(chunk)
+
+
+def load(args: argparse.Namespace) -> int:
+    checkpoint = Checkpoint(args.checkpoint or args.csv + ".checkpoint.json", args.csv)
+    sizer = ChunkSizer(args.chunk_size, args.min_chunk_size, args.max_chunk_size, args.target_latency)
+    if args.target == "db":
+        send = db_target(args.on_conflict)
+    else:
+        send = http_target(args.url, args.api_key, args.on_conflict, args.timeout)
+    send = with_retries(send, args.retries)
+
+    if checkpoint.watermark:
+        print(f"⏩ Resuming after row {checkpoint.watermark} ({checkpoint.path})")
+    print(f"🚀 Loading {args.csv} → {args.target} with {args.concurrency} concurrent uploads\n")
+
+    totals = {"rows": 0, "inserted": 0, "skipped": 0, "rejected": 0}
+    latencies: List[float] = []
+    failed: Optional[BaseException] = None
+    started = time.perf_counter()
+
+    def timed(chunk: pd.DataFrame) -> Tuple[Result, float]:
+        t0 = time.perf_counter()
+        result = send(chunk)
+        return result, time.perf_counter() - t0
+
+    def collect(done: Set[Future], in_flight: Dict[Future, Tuple[int, int]]) -> None:
+        nonlocal failed
+        for future in done:
+            start, end = in_flight.pop(future)
+            try:
+                result, seconds = future.result()
+            except Exception as e:
+                failed = failed or e
+                print(f"🚨 Rows {start}-{end} failed after {args.retries} attempts: {e}")
+                continue
+            checkpoint.commit(start, end)
+            sizer.observe(end - start, seconds)
+            latencies.append(seconds)
+            totals["rows"] += end - start
+            for key in ("inserted", "skipped", "rejected"):
+                totals[key] += result[key]
+            print(
+                f"✅ Rows {start}-{end}: {result['inserted']} inserted, {result['skipped']} skipped, "
+                f"{result['rejected']} rejected ({seconds * 1000:.0f} ms, next chunk {sizer.size})"
+            )
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        in_flight: Dict[Future, Tuple[int, int]] = {}
+        for start, chunk in read_chunks(args.csv, checkpoint.watermark, sizer):
+            # Backpressure: never read further ahead than the uploads in flight
+            while len(in_flight) >= args.concurrency:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done, in_flight)
+            if failed:
                 break
+            in_flight[pool.submit(timed, chunk)] = (start, start + len(chunk))
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(done, in_flight)
+
+    elapsed = time.perf_counter() - started
+    print("\n📊 Summary")
+    print(f"   rows sent   {totals['rows']}  ({totals['rows'] / elapsed:,.0f} rows/s over {elapsed:.1f}s)")
+    print(f"   inserted    {totals['inserted']}")
+    print(f"   skipped     {totals['skipped']}  (already loaded)")
+    print(f"   rejected    {totals['rejected']}")
+    if latencies:
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"   chunk time  p50 {statistics.median(latencies) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms")
+    print(f"   checkpoint  row {checkpoint.watermark} ({checkpoint.path})")
+
+    if failed:
+        print("🚨 Stopped on a failed chunk; run again to resume from the checkpoint.")
+        return 1
+    print("\n✅ All done!")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parallel, resumable loader for fraudTest.csv")
+    parser.add_argument("--csv", default=CSV_PATH, help="CSV file to load")
+    parser.add_argument("--target", choices=["http", "db"], default="http",
+                        help="http: the upload endpoint; db: COPY straight into the database (uses .env)")
+    parser.add_argument("--url", default=API_URL, help="Upload endpoint for the http target")
+    parser.add_argument("--api-key", default=os.environ.get("API_KEY", ""), help="X-API-Key (default: $API_KEY)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help="Chunks in flight (db target: keep it within DB_POOL_MAX_SIZE)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="First chunk size")
+    parser.add_argument("--min-chunk-size", type=int, default=MIN_CHUNK_SIZE)
+    parser.add_argument("--max-chunk-size", type=int, default=MAX_CHUNK_SIZE)
+    parser.add_argument("--target-latency", type=float, default=TARGET_LATENCY, help="Seconds per chunk to aim for")
+    parser.add_argument("--retries", type=int, default=RETRY_LIMIT, help="Attempts per chunk")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="HTTP timeout in seconds")
+    parser.add_argument("--on-conflict", choices=["nothing", "update"], default=ON_CONFLICT)
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <csv>.checkpoint.json)")
+    return parser.parse_args(argv)
+
 
-            else:
-                # Avoid printing huge input dumps
-                try:
-                    err_json = response.json()
-                    detail = err_json.get("detail", [])
-                    msg = json.dumps(detail, indent=2)[:500] + "..." if detail else response.text
-                except Exception:
-                    msg = response.text[:500]
-                print(f"❌ Chunk {i+1} failed (status {response.status_code}): {msg}")
-                if attempt < RETRY_LIMIT:
-                    print("🔁 Retrying...")
-                    time.sleep(2)
-                else:
-                    print("🚨 Giving up on this chunk after multiple retries.")
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️ Request failed: {e}")
-            if attempt < RETRY_LIMIT:
-                print("🔁 Retrying...")
-                time.sleep(2)
-            else:
-                print("🚨 Giving up on this chunk after multiple retries.")
-
-    time.sleep(SLEEP_BETWEEN_CHUNKS)
-
-print("\n✅ All done!")
+if __name__ == "__main__":
+    sys.exit(load(parse_args()))
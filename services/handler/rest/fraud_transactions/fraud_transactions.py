@@ -1,21 +1,41 @@
-from fastapi import APIRouter, Depends, status
-from typing import List, Union
+import json
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import Response, StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
 import time
-from business.usecase.fraud_transactions.crud import FraudTransactionCRUD
+from business.usecase.fraud_transactions.columnar import ARROW_SCHEMA
+from business.usecase.fraud_transactions.crud import EXPORT_COLUMNS, AsyncFraudTransactionCRUD
+from business.usecase.fraud_transactions.export import ENCODERS, EXPORT_MEDIA_TYPES, prefetch
+from business.usecase.fraud_transactions.ingest import FraudTransactionIngest
 from business.model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
-from business.domain.supabase.connection import SupabaseDB
-from contracts.response import SuccessEnvelope
+from business.model.fraud_transactions.bulk_model import BulkDeleteRequest, BulkUpdateRequest
+from business.model.fraud_transactions.ingest_model import IngestResultModel
+from business.domain.supabase.connection import AsyncSupabaseDB
+from contracts.arrow_ipc import ARROW_MEDIA_TYPE, rows_to_ipc
+from contracts.errors import AppError
+from contracts.response import Meta, SuccessEnvelope
+from contracts.serialization import fast_envelope
 from config import get_settings
 
 router = APIRouter(prefix="/fraud/v1/transactions", tags=["Fraud Transactions"])
 
+UPLOAD_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    ARROW_MEDIA_TYPE: "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+}
+
 
 # ================= Dependency Injection =================
-def get_crud() -> FraudTransactionCRUD:
-    """Provide a CRUD instance with a Supabase DB connection."""
+def get_crud() -> AsyncFraudTransactionCRUD:
+    """Provide an async CRUD instance backed by the shared Supabase async pool."""
     settings = get_settings()
-    db = SupabaseDB(settings)
-    return FraudTransactionCRUD(db=db)
+    db = AsyncSupabaseDB(settings)
+    return AsyncFraudTransactionCRUD(db=db)
 
 
 # ================== Handler ==================
@@ -23,45 +43,146 @@ class FraudTransactionHandler:
     def __init__(self, crud):
         self._crud = crud
     
-    def get(self, limit: int = 100) -> List[FraudTransactionModel]:
-        return self._crud.read(limit=limit)
+    async def get(self, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        # Rows come from our own table: skip model validation and serialize the dicts directly
+        return await self._crud.page(limit=limit, cursor=cursor, validate=False)
     
-    def create(self, data: Union[FraudTransactionModel, list]):
+    async def create(self, data: Union[FraudTransactionModel, list], on_conflict: Optional[str] = None):
         start_time = time.perf_counter()
-        rows_affected = self._crud.create(data)
+        rows_affected = await self._crud.create(data, on_conflict=on_conflict)
         duration_ms = (time.perf_counter() - start_time) * 1000
         return {"rows_affected": rows_affected, "duration_ms": round(duration_ms, 2)}
 
-    def update(self, trans_num: str, data: dict):
+    async def upload(self, chunks: AsyncIterator[bytes], fmt: str, on_conflict: Optional[str] = None) -> IngestResultModel:
+        ingest = FraudTransactionIngest(self._crud, batch_size=get_settings().ingest_batch_size, on_conflict=on_conflict)
+        return await ingest.ingest(chunks, fmt)
+
+    async def update(self, trans_num: str, data: dict):
         start_time = time.perf_counter()
-        rows_affected = self._crud.update(trans_num, data)
+        rows_affected = await self._crud.update(trans_num, data)
         duration_ms = (time.perf_counter() - start_time) * 1000
         return {"rows_affected": rows_affected, "duration_ms": round(duration_ms, 2)}
 
-    def delete(self, trans_num: str):
+    async def delete(self, trans_num: str):
         start_time = time.perf_counter()
-        rows_affected = self._crud.delete(trans_num)
+        rows_affected = await self._crud.delete(trans_num)
         duration_ms = (time.perf_counter() - start_time) * 1000
         return {"rows_affected": rows_affected, "duration_ms": round(duration_ms, 2)}
 
+    async def export(self, filters: Dict[str, Any], fmt: str) -> AsyncIterator[Union[str, bytes]]:
+        batches = await prefetch(self._crud.export(filters=filters))
+        return ENCODERS[fmt](batches, EXPORT_COLUMNS)
+
+    async def bulk_update(self, request: BulkUpdateRequest):
+        start_time = time.perf_counter()
+        rows_affected, statements = await self._crud.bulk_update(
+            values=request.values, trans_nums=request.trans_nums, filters=request.filters, rows=request.rows
+        )
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        return {"rows_affected": rows_affected, "statements": statements, "duration_ms": round(duration_ms, 2)}
+
+    async def bulk_delete(self, request: BulkDeleteRequest):
+        start_time = time.perf_counter()
+        rows_affected, statements = await self._crud.bulk_delete(trans_nums=request.trans_nums, filters=request.filters)
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        return {"rows_affected": rows_affected, "statements": statements, "duration_ms": round(duration_ms, 2)}
+
 # ================== Endpoints ==================
 @router.get("/", response_model=SuccessEnvelope[List[FraudTransactionModel]])
 async def list_transactions(
     limit: int = 100,
-    crud: FraudTransactionCRUD = Depends(get_crud)
+    cursor: Optional[str] = None,
+    format: Literal["json", "arrow"] = "json",
+    crud: AsyncFraudTransactionCRUD = Depends(get_crud)
 ):
+    # Newest first; pass meta.next_cursor back as `cursor` for the next page
     handler = FraudTransactionHandler(crud)
-    result = handler.get(limit=limit)
-    return SuccessEnvelope[List[FraudTransactionModel]](data=result)
+    result, next_cursor = await handler.get(limit=limit, cursor=cursor)
+    if format == "arrow":
+        # Columnar body; the continuation token moves to a header
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return Response(rows_to_ipc(result, ARROW_SCHEMA), media_type=ARROW_MEDIA_TYPE, headers=headers)
+    return fast_envelope(result, meta=Meta(next_cursor=next_cursor))
 
 
+# `on_conflict=nothing|update` makes the insert idempotent on trans_num (safe to retry)
 @router.post("/", response_model=SuccessEnvelope[dict], status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     models: List[FraudTransactionModel],
-    crud: FraudTransactionCRUD = Depends(get_crud)
+    on_conflict: Optional[Literal["nothing", "update"]] = None,
+    crud: AsyncFraudTransactionCRUD = Depends(get_crud)
+):
+    handler = FraudTransactionHandler(crud)
+    result = await handler.create(models, on_conflict=on_conflict)
+    return SuccessEnvelope[dict](data=result)
+
+
+# Streaming upload: CSV (fraudTest.csv layout), NDJSON or Arrow IPC as the raw request body, e.g.
+#   curl -X POST --data-binary @fraudTest.csv -H "Content-Type: text/csv" .../fraud/v1/transactions/upload
+@router.post("/upload", response_model=SuccessEnvelope[IngestResultModel], status_code=status.HTTP_201_CREATED)
+async def upload_transactions(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson", "arrow"]] = None,
+    on_conflict: Optional[Literal["nothing", "update"]] = None,
+    crud: AsyncFraudTransactionCRUD = Depends(get_crud)
+):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or UPLOAD_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise AppError(
+            status_code=415,
+            code="unsupported_media_type",
+            message=f"Send text/csv, application/x-ndjson or {ARROW_MEDIA_TYPE}, or pass ?format=csv|ndjson|arrow.",
+        )
+
+    handler = FraudTransactionHandler(crud)
+    result = await handler.upload(request.stream(), fmt, on_conflict=on_conflict)
+    return SuccessEnvelope[IngestResultModel](data=result)
+
+
+# Streaming export straight from a server-side cursor (chunked transfer encoding), e.g.
+#   GET .../fraud/v1/transactions/export?format=csv&filters={"state": "TX", "is_fraud": true}
+@router.get("/export")
+async def export_transactions(
+    format: Literal["csv", "ndjson", "arrow"] = "csv",
+    filters: Optional[str] = None,
+    crud: AsyncFraudTransactionCRUD = Depends(get_crud)
+):
+    try:
+        parsed_filters = json.loads(filters) if filters else {}
+    except json.JSONDecodeError:
+        parsed_filters = None
+    if not isinstance(parsed_filters, dict):
+        raise AppError(status_code=400, code="invalid_filter", message="filters must be a JSON object.")
+
+    handler = FraudTransactionHandler(crud)
+    body = await handler.export(parsed_filters, format)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="fraud_transactions.{format}"'},
+    )
+
+
+# Set-based bulk update: one statement per batch, all batches in one transaction
+@router.post("/bulk/update", response_model=SuccessEnvelope[dict])
+async def bulk_update_transactions(
+    request: BulkUpdateRequest,
+    crud: AsyncFraudTransactionCRUD = Depends(get_crud)
+):
+    handler = FraudTransactionHandler(crud)
+    result = await handler.bulk_update(request)
+    return SuccessEnvelope[dict](data=result)
+
+
+# Set-based bulk delete by trans_num list or filter expression
+@router.post("/bulk/delete", response_model=SuccessEnvelope[dict])
+async def bulk_delete_transactions(
+    request: BulkDeleteRequest,
+    crud: AsyncFraudTransactionCRUD = Depends(get_crud)
 ):
     handler = FraudTransactionHandler(crud)
-    result = handler.create(models)
+    result = await handler.bulk_delete(request)
     return SuccessEnvelope[dict](data=result)
 
 
@@ -69,18 +190,18 @@ async def create_transaction(
 async def update_transaction(
     trans_num: str,
     data: dict,
-    crud: FraudTransactionCRUD = Depends(get_crud)
+    crud: AsyncFraudTransactionCRUD = Depends(get_crud)
 ):
     handler = FraudTransactionHandler(crud)
-    handler.update(trans_num, data)
+    await handler.update(trans_num, data)
     return SuccessEnvelope[str](data="Transaction updated successfully")
 
 
 @router.delete("/{trans_num}", response_model=SuccessEnvelope[str])
 async def delete_transaction(
     trans_num: str,
-    crud: FraudTransactionCRUD = Depends(get_crud)
+    crud: AsyncFraudTransactionCRUD = Depends(get_crud)
 ):
     handler = FraudTransactionHandler(crud)
-    handler.delete(trans_num)
+    await handler.delete(trans_num)
     return SuccessEnvelope[str](data="Transaction deleted successfully")
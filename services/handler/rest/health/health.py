@@ -1,8 +1,25 @@
 from fastapi import APIRouter, Request
+from typing import List
 
-from business.usecase.health.health_usecase import HealthUsecase
+from business.usecase.health.health_usecase import (
+    HealthUsecase,
+    DatabasePoolUsecase,
+    PreparedStatementUsecase,
+    QueryStatsUsecase,
+    ResultCacheUsecase,
+    SnapshotUsecase,
+    SketchUsecase,
+)
 from contracts.response import SuccessEnvelope
-from business.model.health import HealthModel
+from business.model.health import (
+    HealthModel,
+    DatabasePoolModel,
+    PreparedStatementStatsModel,
+    QueryStatsModel,
+    ResultCacheStatsModel,
+    SnapshotStatsModel,
+    SketchStatsModel,
+)
 
 router = APIRouter(prefix="/health/v1")
 
@@ -16,8 +33,68 @@ class HealthHandler:
         # No request data needed for health; call usecase
         return self._usecase.execute()
 
+
+class DatabasePoolHandler:
+
+    def __init__(self, usecase: DatabasePoolUsecase) -> None:
+        self._usecase = usecase
+
+    def handle(self, request: Request) -> List[DatabasePoolModel]:
+        return self._usecase.execute()
+
+
+class PreparedStatementHandler:
+
+    def __init__(self, usecase: PreparedStatementUsecase) -> None:
+        self._usecase = usecase
+
+    def handle(self, request: Request) -> List[PreparedStatementStatsModel]:
+        return self._usecase.execute()
+
+
+class QueryStatsHandler:
+
+    def __init__(self, usecase: QueryStatsUsecase) -> None:
+        self._usecase = usecase
+
+    def handle(self, request: Request) -> QueryStatsModel:
+        return self._usecase.execute()
+
+
+class ResultCacheHandler:
+
+    def __init__(self, usecase: ResultCacheUsecase) -> None:
+        self._usecase = usecase
+
+    def handle(self, request: Request) -> ResultCacheStatsModel:
+        return self._usecase.execute()
+
+
+class SnapshotHandler:
+
+    def __init__(self, usecase: SnapshotUsecase) -> None:
+        self._usecase = usecase
+
+    def handle(self, request: Request) -> SnapshotStatsModel:
+        return self._usecase.execute()
+
+
+class SketchHandler:
+
+    def __init__(self, usecase: SketchUsecase) -> None:
+        self._usecase = usecase
+
+    def handle(self, request: Request) -> SketchStatsModel:
+        return self._usecase.execute()
+
 default_usecase = HealthUsecase()
 default_handler = HealthHandler(default_usecase)
+pool_handler = DatabasePoolHandler(DatabasePoolUsecase())
+statement_handler = PreparedStatementHandler(PreparedStatementUsecase())
+query_stats_handler = QueryStatsHandler(QueryStatsUsecase())
+result_cache_handler = ResultCacheHandler(ResultCacheUsecase())
+snapshot_handler = SnapshotHandler(SnapshotUsecase())
+sketch_handler = SketchHandler(SketchUsecase())
 
 
 # ============== Health Check ==============
@@ -27,3 +104,57 @@ default_handler = HealthHandler(default_usecase)
 async def health_endpoint(request: Request):
     result = default_handler.handle(request)
     return SuccessEnvelope[HealthModel](data=result)
+
+
+# ============== Database Pool ==============
+# Connection pool stats (in-use, idle, waiters, checkout latency)
+# Route: GET /health/v1/db-pool
+@router.get("/db-pool", response_model=SuccessEnvelope[List[DatabasePoolModel]])
+async def db_pool_endpoint(request: Request):
+    result = pool_handler.handle(request)
+    return SuccessEnvelope[List[DatabasePoolModel]](data=result)
+
+
+# ============== Prepared Statements ==============
+# Prepared-statement cache hit rate per connection pool
+# Route: GET /health/v1/db-statements
+@router.get("/db-statements", response_model=SuccessEnvelope[List[PreparedStatementStatsModel]])
+async def db_statements_endpoint(request: Request):
+    result = statement_handler.handle(request)
+    return SuccessEnvelope[List[PreparedStatementStatsModel]](data=result)
+
+
+# ============== Query Instrumentation ==============
+# Latency histograms per caller / query shape and recent slow queries
+# Route: GET /health/v1/db-queries
+@router.get("/db-queries", response_model=SuccessEnvelope[QueryStatsModel])
+async def db_queries_endpoint(request: Request):
+    result = query_stats_handler.handle(request)
+    return SuccessEnvelope[QueryStatsModel](data=result)
+
+
+# ============== Tool Result Cache ==============
+# Hit/miss, eviction and invalidation counters of the agent tools' result cache
+# Route: GET /health/v1/tool-cache
+@router.get("/tool-cache", response_model=SuccessEnvelope[ResultCacheStatsModel])
+async def tool_cache_endpoint(request: Request):
+    result = result_cache_handler.handle(request)
+    return SuccessEnvelope[ResultCacheStatsModel](data=result)
+
+
+# ============== Tool Columnar Snapshot ==============
+# Size, freshness and served / verified counters of fraud_summary_tool's in-process snapshot
+# Route: GET /health/v1/tool-snapshot
+@router.get("/tool-snapshot", response_model=SuccessEnvelope[SnapshotStatsModel])
+async def tool_snapshot_endpoint(request: Request):
+    result = snapshot_handler.handle(request)
+    return SuccessEnvelope[SnapshotStatsModel](data=result)
+
+
+# ============== Tool Column Sketches ==============
+# Coverage and freshness of the distinct-count / frequent-value sketches (approximate distinct)
+# Route: GET /health/v1/tool-sketches
+@router.get("/tool-sketches", response_model=SuccessEnvelope[SketchStatsModel])
+async def tool_sketches_endpoint(request: Request):
+    result = sketch_handler.handle(request)
+    return SuccessEnvelope[SketchStatsModel](data=result)
@@ -2,6 +2,8 @@ from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from fastapi.security.api_key import APIKeyHeader
 from fastapi.encoders import jsonable_encoder
+from contextlib import asynccontextmanager
+import asyncio
 import datetime
 
 from handler.rest.health.health import router as health_router
@@ -12,6 +14,8 @@ from handler.rest.rag.rag import router as rag_router
 from contracts.response import ErrorEnvelope, ErrorDetail, Meta
 from contracts.errors import AppError
 from middleware.request_id import request_id_middleware
+from business.domain.supabase.pool import aclose_all_pools, close_all_pools
+from business.domain.supabase.schema import ensure_schema
 from config import get_settings
 
 # -----------------------------------------------------------------------------
@@ -35,7 +39,19 @@ async def verify_api_key(api_key: str = Depends(api_key_header)):
 # -----------------------------------------------------------------------------
 # 🌐 App setup
 # -----------------------------------------------------------------------------
-app = FastAPI(title="Services API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    if settings.db_ensure_schema:
+        # Indexes and rollups the API relies on (trans_num unique for upserts, daily summaries); logs instead of failing
+        await asyncio.to_thread(ensure_schema, settings)
+    yield
+    # Release pooled database connections on shutdown
+    close_all_pools()
+    await aclose_all_pools()
+
+
+app = FastAPI(title="Services API", lifespan=lifespan)
 
 app.middleware("http")(request_id_middleware)
 
@@ -0,0 +1,57 @@
+from datetime import date, datetime
+import pytest
+from business.model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
+from contracts.errors import AppError
+from config import get_settings
+
+
+@pytest.fixture
+def make_transaction():
+    """Build a valid transaction; keyword arguments override single fields."""
+
+    def make(trans_num: str = "t-0001", **fields) -> FraudTransactionModel:
+        row = {
+            "trans_date_trans_time": datetime(2020, 6, 21, 12, 14, 25),
+            "cc_num": 2291163933867244,
+            "merchant": "fraud_Kirlin and Sons",
+            "category": "personal_care",
+            "amt": 2.86,
+            "first_name": "Jeff",
+            "last_name": "Elliott",
+            "gender": "M",
+            "street": "351 Darlene Green",
+            "city": "Columbia",
+            "state": "SC",
+            "zip": 29209,
+            "lat": 33.9659,
+            "long": -80.9355,
+            "city_pop": 333497,
+            "job": "Mechanical engineer",
+            "dob": date(1968, 3, 19),
+            "trans_num": trans_num,
+            "unix_time": 1371816865,
+            "merch_lat": 33.986391,
+            "merch_long": -81.200714,
+            "is_fraud": False,
+        }
+        return FraudTransactionModel(**{**row, **fields})
+
+    return make
+
+
+@pytest.fixture(scope="module")
+def db():
+    if not get_settings().db_host:
+        pytest.skip("no database configured")
+    from business.domain.supabase.connection import SupabaseDB
+
+    return SupabaseDB(settings_module=get_settings())
+
+
+@pytest.fixture
+def rollback_cursor(db):
+    """Cursor whose transaction is rolled back after the test, so its writes never land."""
+    with pytest.raises(AppError, match="rollback"):
+        with db.get_cursor(caller="tests") as cursor:
+            yield cursor
+            raise AppError(status_code=500, code="rollback", message="rollback")
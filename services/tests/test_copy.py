@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+from types import SimpleNamespace
+import pytest
+from business.model.fraud_transactions.fraud_transactions_model import FraudTransactionModel
+from business.usecase.fraud_transactions import crud
+from business.usecase.fraud_transactions.crud import FraudTransactionCRUD, _copy_buffer, _copy_value
+
+
+TRICKY_TEXT = "back\\slash\ttab\nnew line\r\\N, \"quoted\" 'single' ünïcode"
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, "\\N"),
+        (True, "t"),
+        (False, "f"),
+        (datetime(2020, 6, 21, 12, 14, 25), "2020-06-21T12:14:25"),
+        (date(1968, 3, 19), "1968-03-19"),
+        (2.86, "2.86"),
+        (29209, "29209"),
+        ("a\\b\tc\nd\re", "a\\\\b\\tc\\nd\\re"),
+        ("\\N", "\\\\N"),  # a literal backslash-N is text, not NULL
+    ],
+)
+def test_copy_value(value, expected):
+    assert _copy_value(value) == expected
+
+
+def test_copy_buffer_has_one_line_per_row(make_transaction):
+    rows = [make_transaction("t-1", merchant=TRICKY_TEXT), make_transaction("t-2", job=None, is_fraud=True)]
+    lines = _copy_buffer(rows).read().split("\n")
+
+    assert lines[-1] == ""
+    first, second = (line.split("\t") for line in lines[:-1])
+    assert len(first) == len(second) == len(crud.INSERT_COLUMNS)
+    assert first[crud.INSERT_COLUMNS.index("merchant")] == _copy_value(TRICKY_TEXT)
+    assert second[crud.INSERT_COLUMNS.index("job")] == "\\N"
+    assert second[crud.INSERT_COLUMNS.index("is_fraud")] == "t"
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def copy_expert(self, sql, buffer):
+        self.statements.append(sql)
+        self.rowcount = len(buffer.read().splitlines())
+
+
+@pytest.fixture
+def fake_crud(monkeypatch):
+    cursor = FakeCursor()
+
+    @contextmanager
+    def get_cursor(**kwargs):
+        yield cursor
+
+    def execute_values(cur, query, values, page_size):
+        cur.statements.append(query)
+        cur.rowcount = len(values)
+
+    monkeypatch.setattr(crud, "execute_values", execute_values)
+    monkeypatch.setattr(crud, "_changed", lambda rows, **kwargs: rows)
+    db = SimpleNamespace(settings=SimpleNamespace(db_copy_threshold=3), get_cursor=get_cursor)
+    return FraudTransactionCRUD(db), cursor
+
+
+def test_small_creates_use_insert(fake_crud, make_transaction):
+    crud_, cursor = fake_crud
+    assert crud_.create([make_transaction(f"t-{i}") for i in range(2)]) == 2
+    assert [sql.split(" ")[0] for sql in cursor.statements] == ["INSERT"]
+
+
+def test_bulk_creates_use_copy(fake_crud, make_transaction):
+    crud_, cursor = fake_crud
+    assert crud_.create([make_transaction(f"t-{i}") for i in range(3)]) == 3
+    assert cursor.statements == [crud.COPY_QUERY]
+
+
+def test_copy_round_trip(db, rollback_cursor, make_transaction):
+    rows = [
+        make_transaction("copy-test-1", merchant=TRICKY_TEXT, job="\\N"),
+        make_transaction("copy-test-2", gender=None, job=None, dob=None, city_pop=None, is_fraud=True),
+    ]
+    FraudTransactionCRUD(db)._copy(rollback_cursor, _copy_buffer(rows), "text", None)
+    assert rollback_cursor.rowcount == 2
+
+    rollback_cursor.execute(
+        f"SELECT {', '.join(crud.INSERT_COLUMNS)} FROM fraud_transactions WHERE trans_num LIKE 'copy-test-%%' ORDER BY trans_num"
+    )
+    stored = rollback_cursor.fetchall()
+    assert [FraudTransactionModel(**row) for row in stored] == rows
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from agentic.tools.cost_guard import QueryCostGuard
+from config import get_settings
+
+
+def plan_row(cost, rows, children=()):
+    def node(rows, plans=()):
+        return {"Node Type": "Seq Scan", "Plan Rows": rows, "Plans": list(plans)}
+
+    root = {"Node Type": "Aggregate", "Total Cost": cost, "Plan Rows": rows, "Plans": [node(n) for n in children]}
+    return {"QUERY PLAN": [{"Plan": root}]}
+
+
+def test_summarize_takes_the_largest_node():
+    estimate = QueryCostGuard._summarize(plan_row(1234.5, 1, children=[10, 50_000]))
+    assert estimate == {"cost": 1234.5, "rows": 1.0, "max_rows": 50_000.0}
+
+
+def test_summarize_nested_plans():
+    row = plan_row(10, 5)
+    row["QUERY PLAN"][0]["Plan"]["Plans"] = [{"Plan Rows": 20, "Plans": [{"Plan Rows": 700}]}]
+    assert QueryCostGuard._summarize(row)["max_rows"] == 700.0
+
+
+@pytest.mark.parametrize(
+    "estimate, exceeds",
+    [
+        ({"cost": 100.0, "rows": 10.0, "max_rows": 1_000.0}, False),
+        ({"cost": 100.5, "rows": 10.0, "max_rows": 1_000.0}, True),
+        ({"cost": 1.0, "rows": 1.0, "max_rows": 1_001.0}, True),
+    ],
+)
+def test_exceeds(estimate, exceeds):
+    assert QueryCostGuard(max_cost=100, max_rows=1_000, statement_timeout_ms=500).exceeds(estimate) is exceeds
+
+
+def test_rejections():
+    guard = QueryCostGuard(max_cost=100, max_rows=1_000, statement_timeout_ms=500)
+    rejection = guard.rejection({"cost": 1234.567, "rows": 1.0, "max_rows": 4321.9})
+    assert rejection["error"] == "query_too_expensive"
+    assert (rejection["estimated_cost"], rejection["estimated_rows"]) == (1234.57, 4321)
+    assert (rejection["max_cost"], rejection["max_rows"]) == (100, 1_000)
+
+    timeout = guard.timeout_rejection()
+    assert (timeout["error"], timeout["statement_timeout_ms"]) == ("query_timeout", 500)
+    assert "500 ms" in timeout["message"]
+
+
+@pytest.fixture(scope="module")
+def query_tool():
+    if not get_settings().db_host:
+        pytest.skip("no database configured")
+    from agentic.tools.fraud_query import FraudQueryTool
+
+    return FraudQueryTool()
+
+
+def test_begin_and_estimate(query_tool):
+    guard = QueryCostGuard(max_cost=100, max_rows=1_000, statement_timeout_ms=1234)
+    with query_tool.db.get_cursor(readonly=True) as cur:
+        guard.begin(cur)
+        cur.execute("SHOW statement_timeout")
+        assert list(cur.fetchone().values()) == ["1234ms"]
+        estimate = guard.estimate(cur, "SELECT * FROM fraud_transactions WHERE amt > %s", (0,))
+    assert estimate["cost"] > 0 and estimate["max_rows"] >= estimate["rows"] > 0
+
+    async def aestimate():
+        async with query_tool.async_db.get_cursor(readonly=True) as cur:
+            await guard.abegin(cur)
+            await cur.execute("SHOW statement_timeout")
+            timeout = list((await cur.fetchone()).values())
+            return timeout, await guard.aestimate(cur, "SELECT * FROM fraud_transactions WHERE amt > %s", (0,))
+
+    timeout, async_estimate = asyncio.run(aestimate())
+    assert timeout == ["1234ms"]
+    assert async_estimate == estimate
+
+
+def test_tool_rejects_expensive_queries(query_tool, monkeypatch):
+    monkeypatch.setattr(query_tool, "guard", QueryCostGuard(max_cost=0.01, max_rows=1, statement_timeout_ms=5_000))
+    result = query_tool.run(filters={"amt": {"gt": 0}}, limit=5)
+    assert result["error"] == "query_too_expensive"
+    assert result["estimated_cost"] > result["max_cost"]
@@ -0,0 +1,77 @@
+import asyncio
+import csv
+import io
+from datetime import date, datetime
+import orjson
+import pytest
+from business.usecase.fraud_transactions.export import encode_csv, encode_ndjson, prefetch
+from contracts.errors import AppError
+
+
+COLUMNS = ["id", "trans_date_trans_time", "merchant", "amt", "job", "dob", "is_fraud"]
+BATCHES = [
+    [
+        {"id": 1, "trans_date_trans_time": datetime(2020, 6, 21, 12, 14, 25), "merchant": 'Café "Zoë", multi\nline',
+         "amt": 2.86, "job": None, "dob": date(1968, 3, 19), "is_fraud": True, "ignored": "x"},
+    ],
+    [],
+    [
+        {"id": 2, "trans_date_trans_time": datetime(2020, 6, 21, 12, 15), "merchant": "plain",
+         "amt": 29.84, "job": "Engineer", "dob": None, "is_fraud": False},
+    ],
+]
+
+
+async def batches(items=BATCHES):
+    for batch in items:
+        yield batch
+
+
+def collect(chunks):
+    async def run():
+        return [chunk async for chunk in chunks]
+
+    return asyncio.run(run())
+
+
+def test_csv_export():
+    chunks = collect(encode_csv(batches(), COLUMNS))
+    assert len(chunks) == 1 + len(BATCHES)  # header, then one chunk per batch
+
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows == [
+        COLUMNS,
+        ["1", "2020-06-21T12:14:25", 'Café "Zoë", multi\nline', "2.86", "", "1968-03-19", "1"],
+        ["2", "2020-06-21T12:15:00", "plain", "29.84", "Engineer", "", "0"],
+    ]
+
+
+def test_ndjson_export():
+    chunks = collect(encode_ndjson(batches(), COLUMNS))
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+
+    lines = b"".join(chunks).splitlines()
+    assert [orjson.loads(line) for line in lines] == [
+        {"id": 1, "trans_date_trans_time": "2020-06-21T12:14:25", "merchant": 'Café "Zoë", multi\nline',
+         "amt": 2.86, "job": None, "dob": "1968-03-19", "is_fraud": True},
+        {"id": 2, "trans_date_trans_time": "2020-06-21T12:15:00", "merchant": "plain",
+         "amt": 29.84, "job": "Engineer", "dob": None, "is_fraud": False},
+    ]
+
+
+def test_prefetch_raises_before_streaming():
+    async def failing():
+        raise AppError(status_code=400, code="invalid_filter", message="Unknown filter column(s): nope")
+        yield []
+
+    with pytest.raises(AppError) as excinfo:
+        asyncio.run(prefetch(failing()))
+    assert excinfo.value.code == "invalid_filter"
+
+
+@pytest.mark.parametrize("items", [BATCHES, []])
+def test_prefetch_keeps_every_batch(items):
+    async def run():
+        return [batch async for batch in await prefetch(batches(items))]
+
+    assert asyncio.run(run()) == items
@@ -0,0 +1,53 @@
+from business.usecase.fraud_transactions.filters import TEXT_COLUMNS, build_filter_clause, build_where, text_match
+
+
+def test_text_match():
+    assert text_match("category", "Grocery_POS") == ("lower(category) = lower(%s)", "Grocery_POS")
+    assert text_match("merchant", "fraud_%") == ("merchant ILIKE %s", "fraud_%")
+
+
+def test_text_columns():
+    assert {"merchant", "category", "gender", "job"} <= TEXT_COLUMNS
+    assert "trans_num" not in TEXT_COLUMNS  # identifier: exact equality, served by its unique index
+    assert "amt" not in TEXT_COLUMNS
+
+
+def test_build_filter_clause():
+    clauses, params = build_filter_clause({
+        "category": "gas_transport",
+        "merchant": "%Kutch%",
+        "trans_num": "abc",
+        "is_fraud": True,
+        "amt": {"gte": 100, "lt": 500},
+        "state": {"not": "NY"},
+        "unknown": 1,
+    })
+    assert clauses == [
+        "lower(category) = lower(%s)",
+        "merchant ILIKE %s",
+        "trans_num = %s",
+        "is_fraud = %s",
+        "amt < %s",
+        "amt >= %s",
+        "state != %s",
+    ]
+    assert params == ["gas_transport", "%Kutch%", "abc", True, 500, 100, "NY"]
+
+
+def test_build_filter_clause_uses_database_column_names():
+    assert build_filter_clause({"long": {"gt": 10}}) == (["long > %s"], [10])
+    assert build_filter_clause({"long_": 1}) == ([], [])
+
+
+def test_build_where():
+    assert build_where({}, {}) == ("", [])
+    assert build_where({"is_fraud": True}, {}) == ("WHERE is_fraud = %s", [True])
+    assert build_where({}, {"state": "NY", "zip": 10001}) == ("WHERE lower(state) = lower(%s) OR zip = %s", ["NY", 10001])
+    assert build_where({"is_fraud": True}, {"state": "NY", "zip": 10001}) == (
+        "WHERE is_fraud = %s AND (lower(state) = lower(%s) OR zip = %s)",
+        [True, "NY", 10001],
+    )
+
+
+def test_build_where_valid_columns():
+    assert build_where({"amt": 1, "zip": 2}, {}, valid_columns=["zip"]) == ("WHERE zip = %s", [2])
@@ -0,0 +1,86 @@
+import asyncio
+from contextlib import nullcontext
+from typing import Any, Dict
+import pytest
+from agentic.tools.base import BaseTool
+from agentic.tools.fraud_batch import FraudBatchTool
+from contracts.errors import AppError
+
+
+class FakeDB:
+    def shared_snapshot(self, caller=None):
+        return nullcontext("snapshot")
+
+
+class FakeTool(BaseTool):
+    """Parses its arguments the way the fraud tools do, so bad ones raise plain exceptions."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self.db = self.async_db = FakeDB()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return self._name
+
+    def run(self, **kwargs) -> Dict[str, Any]:
+        limit = int(kwargs.get("limit", 10))
+        filters = {k: v for k, v in kwargs.get("filters", {}).items()}
+        if filters.get("state") == "XX":
+            raise AppError(status_code=400, code="no_such_state", message="Unknown state")
+        return {"summary": [], "limit": limit}
+
+
+@pytest.fixture
+def batch() -> FraudBatchTool:
+    return FraudBatchTool(query_tool=FakeTool("fraud_query_tool"), summary_tool=FakeTool("fraud_summary_tool"))
+
+
+QUERIES = [
+    {"id": "ok", "tool": "fraud_summary_tool", "arguments": {"limit": 3}},
+    {"id": "bad_limit", "tool": "fraud_summary_tool", "arguments": {"limit": "ten"}},
+    {"id": "bad_filters", "tool": "fraud_query_tool", "arguments": {"filters": ["state", "NY"]}},
+    {"id": "rejected", "tool": "fraud_query_tool", "arguments": {"filters": {"state": "XX"}}},
+]
+
+
+def check(result: Dict[str, Any]) -> None:
+    assert result["results"]["ok"] == {"summary": [], "limit": 3}
+    assert result["failed"] == ["bad_limit", "bad_filters", "rejected"]
+    assert result["results"]["bad_limit"]["error"] == "invalid_arguments"
+    assert "ValueError" in result["results"]["bad_limit"]["message"]
+    assert result["results"]["bad_filters"]["error"] == "invalid_arguments"
+    assert result["results"]["rejected"] == {"error": "no_such_state", "message": "Unknown state"}
+
+
+def test_bad_sub_query_does_not_fail_the_batch(batch):
+    check(batch.run(queries=QUERIES))
+
+
+def test_bad_sub_query_does_not_fail_the_batch_async(batch):
+    check(asyncio.run(batch.arun(queries=QUERIES)))
+
+
+@pytest.mark.parametrize(
+    "queries, code",
+    [
+        ([], "invalid_batch"),
+        ([{"tool": "other_tool", "arguments": {}}], "invalid_batch"),
+        ([{"id": "a", "tool": "fraud_query_tool", "arguments": {}}] * 2, "invalid_batch"),
+        ([{"tool": "fraud_query_tool", "arguments": "limit=5"}], "invalid_batch"),
+        ([{"tool": "fraud_query_tool", "arguments": {}}] * 100, "batch_too_large"),
+    ],
+)
+def test_invalid_batches(batch, queries, code):
+    with pytest.raises(AppError) as excinfo:
+        batch.run(queries=queries)
+    assert excinfo.value.code == code
+
+
+def test_default_ids(batch):
+    result = batch.run(queries=[{"tool": "fraud_query_tool", "arguments": {}}, {"tool": "fraud_summary_tool", "arguments": {}}])
+    assert list(result["results"]) == ["q1", "q2"] and result["failed"] == []
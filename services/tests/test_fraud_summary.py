@@ -0,0 +1,75 @@
+import pytest
+from agentic.tools.fraud_query import FraudSummaryTool
+from contracts.errors import AppError
+
+
+@pytest.fixture(scope="module")
+def tool() -> FraudSummaryTool:
+    tool = FraudSummaryTool()
+    tool.rollups = None
+    return tool
+
+
+@pytest.mark.parametrize(
+    "metrics",
+    [
+        {"amt) FROM fraud_transactions; --": "sum"},
+        {"amt": "sum(amt)); DROP TABLE fraud_transactions; --"},
+        {"amt": "median"},
+        {"amt": ["sum"]},
+        {"is_fraud_count": "count"},
+    ],
+)
+def test_metrics_are_validated(tool, metrics):
+    for kwargs in ({"columns": ["state"]}, {"time_series": {"date_column": "trans_date_trans_time"}}):
+        with pytest.raises(AppError) as excinfo:
+            tool._build_statements(metrics=metrics, **kwargs)
+        assert (excinfo.value.status_code, excinfo.value.code) == (400, "invalid_metric")
+
+
+def test_rate_needs_a_boolean_column(tool):
+    with pytest.raises(AppError) as excinfo:
+        tool._build_statements(columns=["state"], metrics={"amt": "rate"})
+    assert excinfo.value.code == "invalid_metric"
+
+
+def test_valid_metrics(tool):
+    _, _, [(query, params)], _ = tool._build_statements(
+        columns=["state"],
+        metrics={"amt": "SUM", "is_fraud": "rate"},
+        order_by=[{"column": "amt_SUM", "order": "desc"}, {"column": "state"}],
+        limit=5,
+    )
+    assert "SUM(amt) AS amt_SUM" in query and "AVG(is_fraud::int)::double precision AS is_fraud_rate" in query
+    assert "ORDER BY amt_SUM DESC, state ASC LIMIT %s;" in query
+    assert params == [5]
+
+
+@pytest.mark.parametrize(
+    "order_by",
+    [
+        [{"column": "amt; DROP TABLE fraud_transactions", "order": "asc"}],
+        [{"column": "state", "order": "asc, (SELECT 1)"}],
+        [{"order": "asc"}],
+    ],
+)
+def test_order_by_is_validated(tool, order_by):
+    with pytest.raises(AppError) as excinfo:
+        tool._build_statements(columns=["state"], order_by=order_by)
+    assert excinfo.value.code == "invalid_order_by"
+
+
+def test_time_series_fetches_one_row_past_the_cap(tool):
+    _, _, [(query, params)], _ = tool._build_statements(
+        time_series={"date_column": "trans_date_trans_time", "granularity": "hour", "group_by": ["category"]}
+    )
+    assert query.rstrip().endswith("LIMIT %s;")
+    assert params == [tool.max_time_series_points + 1]
+
+
+def test_cap_points(tool):
+    cap = tool.max_time_series_points
+    rows = [{"period": i, "fraud_count": 1} for i in range(cap + 1)]
+    assert tool._format_result("time_series", [], [rows[:cap]]) == {"time_series": rows[:cap], "count": cap}
+    rejected = tool._format_result("time_series", [], [rows])
+    assert rejected["error"] == "too_many_points" and rejected["max_points"] == cap
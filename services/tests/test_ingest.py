@@ -0,0 +1,131 @@
+import asyncio
+import json
+import pytest
+from business.usecase.fraud_transactions.ingest import (
+    FraudTransactionIngest,
+    _validate,
+    iter_csv_records,
+    iter_ndjson_records,
+)
+from contracts.errors import AppError
+
+
+CSV_HEADER = (
+    ",trans_date_trans_time,cc_num,merchant,category,amt,first,last,gender,street,city,state,zip,"
+    "lat,long,city_pop,job,dob,trans_num,unix_time,merch_lat,merch_long,is_fraud\n"
+)
+CSV_ROW = (
+    "0,2020-06-21 12:14:25,2291163933867244,{merchant},personal_care,2.86,Jeff,Elliott,M,"
+    "351 Darlene Green,Columbia,SC,29209,33.9659,-80.9355,333497,{job},1968-03-19,{trans_num},"
+    "1371816865,33.986391,-81.200714,0\n"
+)
+
+
+def csv_body(*rows):
+    return ("\ufeff" + CSV_HEADER + "".join(CSV_ROW.format(**row) for row in rows)).encode("utf-8")
+
+
+async def chunked(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def parse(parser, body: bytes, size: int = 7):
+    async def run():
+        return [record async for record in parser(chunked(body, size))]
+
+    return asyncio.run(run())
+
+
+ROWS = [
+    {"merchant": "fraud_Kirlin and Sons", "job": "Mechanical engineer", "trans_num": "t-1"},
+    {"merchant": '"Café ""Zoë"", multi\nline"', "job": "", "trans_num": "t-2"},
+]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1 << 16])
+def test_csv_records_survive_any_chunking(size):
+    records = parse(iter_csv_records, csv_body(*ROWS), size)
+
+    assert [row for row, _ in records] == [1, 2]
+    first, second = (record for _, record in records)
+    assert first["first_name"] == "Jeff" and "first" not in first and "" not in first  # renamed, index dropped
+    assert second["merchant"] == 'Café "Zoë", multi\nline'
+    assert second["job"] is None
+
+
+def test_csv_bad_rows_are_numbered():
+    body = csv_body(ROWS[0]) + b"1,2,3\n" + CSV_ROW.format(**{**ROWS[0], "merchant": '"unterminated'}).encode()
+    records = parse(iter_csv_records, body)
+
+    assert [row for row, _ in records] == [1, 2, 3]
+    assert str(records[1][1]) == "expected 23 columns, got 3"
+    assert str(records[2][1]) == "unterminated quoted field at end of file"
+
+
+@pytest.mark.parametrize("size", [1, 5, 1 << 16])
+def test_ndjson_records(size):
+    body = b"".join(json.dumps({"trans_num": f"t-{i}", "merchant": "Zoë"}).encode() + b"\n\n" for i in range(3))
+    body += b"{not json\n" + b'{"trans_num": "t-last"}'  # no trailing newline
+
+    records = parse(iter_ndjson_records, body, size)
+    assert [row for row, _ in records] == [1, 2, 3, 4, 5]
+    assert records[0][1] == {"trans_num": "t-0", "merchant": "Zoë"}
+    assert str(records[3][1]).startswith("invalid JSON")
+    assert records[4][1] == {"trans_num": "t-last"}
+
+
+def test_validate_splits_valid_and_rejected_rows():
+    records = parse(iter_csv_records, csv_body(*ROWS))
+    records.append((3, {**records[0][1], "amt": "a lot"}))
+    records.append((4, ValueError("expected 23 columns, got 3")))
+
+    valid, rejected = _validate(records)
+    assert [row.trans_num for row in valid] == ["t-1", "t-2"]
+    assert [(row.row, row.error) for row in rejected] == [
+        (3, "amt: Input should be a valid number, unable to parse string as a number"),
+        (4, "expected 23 columns, got 3"),
+    ]
+
+
+class FakeCRUD:
+    def __init__(self, fail_batch=None):
+        self.batches = []
+        self.fail_batch = fail_batch
+
+    async def create(self, rows, on_conflict=None):
+        self.batches.append([row.trans_num for row in rows])
+        if len(self.batches) == self.fail_batch:
+            raise AppError(status_code=500, code="db_insert_failed", message="Failed to insert transactions: boom")
+        return len(rows) - 1 if on_conflict else len(rows)  # one trans_num already loaded
+
+
+def ingest(crud, body, fmt="csv", **kwargs):
+    return asyncio.run(FraudTransactionIngest(crud, **kwargs).ingest(chunked(body, 64), fmt))
+
+
+def test_ingest_writes_bounded_batches():
+    rows = [{**ROWS[0], "trans_num": f"t-{i}"} for i in range(5)]
+    crud = FakeCRUD(fail_batch=2)
+    body = csv_body(*rows[:3]) + b"1,2,3\n" + b"".join(CSV_ROW.format(**row).encode() for row in rows[3:])
+    result = ingest(crud, body, batch_size=2)
+
+    assert crud.batches == [["t-0", "t-1"], ["t-2"], ["t-3", "t-4"]]
+    assert [(b.rows, b.inserted, b.rejected, b.error) for b in result.batches] == [
+        (2, 2, 0, None),
+        (2, 0, 2, "Failed to insert transactions: boom"),  # the bad row and the refused one
+        (2, 2, 0, None),
+    ]
+    assert (result.rows, result.inserted, result.rejected) == (6, 4, 2)
+    assert [row.row for row in result.rejected_rows] == [4]
+
+
+def test_ingest_counts_skipped_rows_on_conflict():
+    result = ingest(FakeCRUD(), csv_body(*ROWS), on_conflict="nothing")
+    assert (result.inserted, result.skipped) == (1, 1)
+
+
+def test_unsupported_format():
+    with pytest.raises(AppError) as excinfo:
+        ingest(FakeCRUD(), b"", fmt="xml")
+    assert (excinfo.value.status_code, excinfo.value.code) == (415, "unsupported_format")
@@ -0,0 +1,57 @@
+from datetime import datetime
+import pytest
+from business.usecase.fraud_transactions.pagination import (
+    KEYSET_CONDITION,
+    decode_cursor,
+    encode_cursor,
+    keyset_clause,
+    split_page,
+)
+from contracts.errors import AppError
+
+
+def test_cursor_round_trip():
+    moment = datetime(2020, 6, 21, 12, 14, 25, 123456)
+    token = encode_cursor(moment, 42)
+    assert "=" not in token
+    assert decode_cursor(token) == (moment, 42)
+
+
+@pytest.mark.parametrize("token", ["", "not a cursor", encode_cursor(datetime(2020, 1, 1), 1)[:-3], "WzFd"])
+def test_decode_rejects_corrupted_tokens(token):
+    with pytest.raises(AppError) as excinfo:
+        decode_cursor(token)
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.code == "invalid_cursor"
+
+
+def test_keyset_clause():
+    moment = datetime(2020, 6, 21, 12, 0)
+    token = encode_cursor(moment, 7)
+
+    assert keyset_clause("WHERE is_fraud = %s", None) == ("WHERE is_fraud = %s", [])
+    assert keyset_clause("", token) == (f"WHERE {KEYSET_CONDITION}", [moment, 7])
+    assert keyset_clause("WHERE is_fraud = %s", token) == (f"WHERE is_fraud = %s AND {KEYSET_CONDITION}", [moment, 7])
+
+
+def test_split_page():
+    rows = [{"id": i, "trans_date_trans_time": datetime(2020, 1, 10 - i)} for i in range(4)]
+
+    page, token = split_page(rows, 3)
+    assert page == rows[:3]
+    assert decode_cursor(token) == (rows[2]["trans_date_trans_time"], 2)
+
+    assert split_page(rows, 4) == (rows, None)
+    assert split_page([], 3) == ([], None)
+
+
+def test_split_page_models():
+    class Row:
+        def __init__(self, id):
+            self.id = id
+            self.trans_date_trans_time = datetime(2020, 1, 1, id)
+
+    rows = [Row(i) for i in range(3)]
+    page, token = split_page(rows, 2)
+    assert page == rows[:2]
+    assert decode_cursor(token) == (datetime(2020, 1, 1, 1), 1)
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+import psycopg
+import psycopg2.extensions
+import pytest
+from business.domain.supabase.pool import AsyncConnectionPool, ConnectionPool
+from contracts.errors import AppError
+
+
+class FakeConnection:
+    """Just what the pools touch: no database needed."""
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.last_used = time.monotonic()
+        self.info = SimpleNamespace(transaction_status=psycopg.pq.TransactionStatus.IDLE)
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncFakeConnection(FakeConnection):
+    async def close(self):
+        self.closed = True
+
+
+async def async_connect():
+    return AsyncFakeConnection()
+
+
+@pytest.mark.parametrize("min_size, max_size", [(0, 0), (-1, 5), (6, 5)])
+def test_invalid_bounds(min_size, max_size):
+    with pytest.raises(ValueError):
+        ConnectionPool(FakeConnection, min_size=min_size, max_size=max_size)
+    with pytest.raises(ValueError):
+        AsyncConnectionPool(async_connect, min_size=min_size, max_size=max_size)
+
+
+def test_prefills_min_size_and_reuses_connections():
+    pool = ConnectionPool(FakeConnection, min_size=2, max_size=4)
+    assert pool.stats()["idle"] == 2
+
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn  # LIFO: the connection just returned
+    assert pool.stats()["connections_created"] == 2
+
+
+def test_never_exceeds_max_size_and_times_out():
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=2, timeout=0.1)
+    held = [pool.getconn(), pool.getconn()]
+
+    started = time.monotonic()
+    with pytest.raises(AppError) as excinfo:
+        pool.getconn()
+    assert time.monotonic() - started >= 0.1
+    assert (excinfo.value.status_code, excinfo.value.code) == (503, "db_pool_timeout")
+    stats = pool.stats()
+    assert (stats["size"], stats["in_use"], stats["timeouts"]) == (2, 2, 1)
+
+    # A waiter gets the connection as soon as one comes back
+    threading.Timer(0.05, pool.putconn, args=(held[0],)).start()
+    pool.timeout = 5.0
+    assert pool.getconn() is held[0]
+
+
+def test_discarded_connection_frees_its_slot():
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=1, timeout=0.1)
+    conn = pool.getconn()
+    pool.putconn(conn, discard=True)
+    assert conn.closed
+    assert pool.getconn() is not conn
+    assert pool.stats()["connections_discarded"] == 1
+
+
+def test_idle_connections_are_recycled_down_to_min_size():
+    pool = ConnectionPool(FakeConnection, min_size=1, max_size=3, max_idle=0.05)
+    conns = [pool.getconn() for _ in range(3)]
+    for conn in conns:
+        pool.putconn(conn)
+    time.sleep(0.1)
+
+    # Pruned on checkout too, not only when a connection comes back
+    pool.getconn()
+    stats = pool.stats()
+    assert (stats["size"], stats["connections_discarded"]) == (1, 2)
+    assert sum(conn.closed for conn in conns) == 2
+
+
+def test_closed_pool_refuses_checkouts():
+    pool = ConnectionPool(FakeConnection, min_size=1, max_size=1)
+    pool.close()
+    with pytest.raises(AppError) as excinfo:
+        pool.getconn()
+    assert excinfo.value.code == "db_pool_closed"
+
+
+def test_async_pool_prefills_on_first_checkout():
+    async def scenario():
+        pool = AsyncConnectionPool(async_connect, min_size=3, max_size=5)
+        assert pool.stats()["size"] == 0  # the constructor cannot await
+        conn = await pool.getconn()
+        stats = pool.stats()
+        assert (stats["size"], stats["idle"], stats["connections_created"]) == (3, 2, 3)
+        await pool.putconn(conn)
+        assert await pool.getconn() is conn
+
+    asyncio.run(scenario())
+
+
+def test_async_pool_bounds_and_timeout():
+    async def scenario():
+        pool = AsyncConnectionPool(async_connect, min_size=0, max_size=1, timeout=0.1)
+        held = await pool.getconn()
+        with pytest.raises(AppError) as excinfo:
+            await pool.getconn()
+        assert excinfo.value.code == "db_pool_timeout"
+        assert pool.stats()["size"] == 1
+
+        pool.timeout = 5.0
+        waiter = asyncio.create_task(pool.getconn())
+        await asyncio.sleep(0.05)
+        await pool.putconn(held)
+        assert await waiter is held
+
+    asyncio.run(scenario())
+
+
+def test_async_prefill_failure_leaves_no_reserved_slots():
+    async def scenario():
+        async def refuse():
+            raise OSError("connection refused")
+
+        pool = AsyncConnectionPool(refuse, min_size=2, max_size=2, timeout=0.1)
+        with pytest.raises(OSError):
+            await pool.getconn()
+        assert pool.stats()["size"] == 0
+
+    asyncio.run(scenario())
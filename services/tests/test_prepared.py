@@ -0,0 +1,167 @@
+import asyncio
+from collections import OrderedDict
+import psycopg2
+import pytest
+from business.domain.supabase.prepared import PreparedStatementCache, _statement_name, _to_positional
+from config import get_settings
+
+
+class StalePlan(psycopg2.Error):
+    pgcode = "0A000"
+
+
+class FakeConnection:
+    def __init__(self, autocommit=False):
+        self.autocommit = autocommit
+        self.prepared_statements = OrderedDict()
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakeCursor:
+    """Records statements; raises `fail` once for the next EXECUTE when set."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.fail = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.connection.log.append(sql)
+        if self.fail is not None and "EXECUTE" in sql:
+            error, self.fail = self.fail, None
+            raise error
+
+
+def test_to_positional():
+    assert _to_positional("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%' AND c IN (%s, %s)") == (
+        "SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' AND c IN ($2, $3)"
+    )
+
+
+def test_prepares_once_and_executes_after_a_savepoint():
+    cache = PreparedStatementCache(max_size=4)
+    conn = FakeConnection()
+    cur = conn.cursor()
+    sql = "SELECT * FROM t WHERE a = %s"
+    name = _statement_name(sql)
+
+    cache.execute(cur, sql, [1])
+    cache.execute(cur, sql, [2])
+    assert conn.log == [
+        f"PREPARE {name} AS SELECT * FROM t WHERE a = $1",
+        f"EXECUTE {name} (%s)",
+        f"SAVEPOINT fq_prepared; EXECUTE {name} (%s)",
+    ]
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_no_savepoint_in_autocommit():
+    cache = PreparedStatementCache()
+    conn = FakeConnection(autocommit=True)
+    cur = conn.cursor()
+    cache.execute(cur, "SELECT 1")
+    cache.execute(cur, "SELECT 1")
+    assert conn.log[-1] == f"EXECUTE {_statement_name('SELECT 1')}"
+
+
+def test_least_recently_used_statements_are_deallocated():
+    cache = PreparedStatementCache(max_size=2)
+    conn = FakeConnection()
+    cur = conn.cursor()
+    for sql in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+        cache.execute(cur, sql)
+
+    assert list(conn.prepared_statements) == ["SELECT 1", "SELECT 3"]
+    assert f"DEALLOCATE {_statement_name('SELECT 2')}" in conn.log
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidated_statement_is_prepared_again():
+    cache = PreparedStatementCache()
+    conn = FakeConnection()
+    cur = conn.cursor()
+    sql = "SELECT * FROM t"
+    name = _statement_name(sql)
+    cache.execute(cur, sql)
+    conn.log.clear()
+
+    cur.fail = StalePlan("cached plan must not change result type")
+    cache.execute(cur, sql)
+    assert conn.log == [
+        f"SAVEPOINT fq_prepared; EXECUTE {name}",
+        "ROLLBACK TO SAVEPOINT fq_prepared",
+        f"DEALLOCATE {name}",
+        f"PREPARE {name} AS SELECT * FROM t",
+        f"EXECUTE {name}",
+    ]
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_other_errors_are_raised():
+    cache = PreparedStatementCache()
+    cur = FakeConnection().cursor()
+    cache.execute(cur, "SELECT 1")
+    cur.fail = psycopg2.Error("boom")
+    with pytest.raises(psycopg2.Error):
+        cache.execute(cur, "SELECT 1")
+    assert cache.stats()["invalidations"] == 0
+
+
+QUERY = "SELECT COUNT(*) AS n FROM fraud_transactions WHERE amt > %s"
+
+
+@pytest.fixture(scope="module")
+def settings():
+    if not get_settings().db_host:
+        pytest.skip("no database configured")
+    return get_settings()
+
+
+def test_recovery_keeps_the_transaction_settings(settings):
+    from business.domain.supabase.connection import SupabaseDB
+
+    db = SupabaseDB(settings_module=settings)
+    invalidations = db.statements.stats()["invalidations"]
+    with db.get_cursor(readonly=True) as cur:
+        db.execute_prepared(cur, QUERY, [10])
+        expected = cur.fetchone()
+        cur.execute("SELECT set_config('statement_timeout', '1234', true)")
+        cur.execute(f"DEALLOCATE {cur.connection.prepared_statements[QUERY]}")  # someone else dropped it
+
+        db.execute_prepared(cur, QUERY, [10])
+        assert cur.fetchone() == expected
+        cur.execute("SHOW statement_timeout")
+        assert list(cur.fetchone().values()) == ["1234ms"]
+    assert db.statements.stats()["invalidations"] == invalidations + 1
+
+
+def test_async_recovery_keeps_the_transaction_settings(settings):
+    from business.domain.supabase.connection import AsyncSupabaseDB
+
+    async def run():
+        db = AsyncSupabaseDB(settings_module=settings)
+        invalidations = db.statements.stats()["invalidations"]
+        async with db.get_cursor(readonly=True) as cur:
+            await db.execute_prepared(cur, QUERY, [10])
+            expected = await cur.fetchone()
+            await cur.execute("SELECT set_config('statement_timeout', '4321', true)")
+            # Dropped behind psycopg's back: its client-side cache still thinks they exist
+            await cur.execute("SELECT name FROM pg_prepared_statements")
+            for row in await cur.fetchall():
+                await cur.execute(f"DEALLOCATE {row['name']}", prepare=False)
+
+            await db.execute_prepared(cur, QUERY, [10])
+            assert await cur.fetchone() == expected
+            await cur.execute("SHOW statement_timeout")
+            assert list((await cur.fetchone()).values()) == ["4321ms"]
+        assert db.statements.stats()["invalidations"] == invalidations + 1
+
+    asyncio.run(run())
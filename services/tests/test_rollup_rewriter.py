@@ -0,0 +1,88 @@
+from datetime import date, datetime
+import pytest
+from agentic.tools.rollup_rewriter import RollupRewriter, _day_boundary
+from business.domain.supabase.rollups import ROLLUP_TABLE, TOTAL_DIMENSION
+
+
+def rewrite(columns=(), metrics=None, distinct=False, filters=None, limit=10, order_by=None, time_series=None, since=None):
+    return RollupRewriter().rewrite(
+        list(columns), metrics or {}, distinct, filters or {}, limit, order_by or [], time_series, since=since
+    )
+
+
+def test_summary_by_dimension():
+    mode, columns, statements, estimates = rewrite(
+        columns=["state"],
+        metrics={"amt": "sum", "is_fraud": "rate"},
+        filters={"is_fraud": True, "trans_date_trans_time": {"gte": "2020-01-01", "lt": datetime(2020, 2, 1)}},
+        order_by=[{"column": "amt_sum", "order": "desc"}],
+        limit=5,
+    )
+    assert (mode, columns, estimates) == ("summary", ["state"], {})
+    [(query, params)] = statements
+    assert f"FROM {ROLLUP_TABLE} WHERE dimension = %s AND day >= %s AND day < %s" in query
+    assert "SUM(fraud_amt_sum)::double precision AS amt_sum" in query
+    assert "GROUP BY value HAVING SUM(fraud_count) > 0 ORDER BY amt_sum DESC LIMIT %s;" in query
+    assert params == ["state", date(2020, 1, 1), date(2020, 2, 1), 5]
+
+
+def test_dimension_filter_uses_text_match():
+    _, _, [(query, params)], _ = rewrite(columns=["category"], filters={"category": "gas_transport", "is_fraud": False})
+    assert "lower(value) = lower(%s)" in query
+    assert "(txn_count - fraud_count)" in query
+    assert params == ["category", "gas_transport", 10]
+
+
+def test_ungrouped_filters_read_the_total():
+    _, _, [(query, params)], _ = rewrite(time_series={"date_column": "trans_date_trans_time", "granularity": "month"})
+    assert "DATE_TRUNC('MONTH', day::timestamp) AS period" in query
+    assert "GROUP BY period\n" in query
+    assert params == [TOTAL_DIMENSION]
+
+
+def test_time_series_since():
+    _, _, [(query, params)], _ = rewrite(
+        time_series={"date_column": "trans_date_trans_time", "group_by": ["state"]},
+        since=datetime(2020, 3, 1),
+    )
+    assert "day >= %s" in query and "GROUP BY period, value" in query
+    assert params == ["state", date(2020, 3, 1)]
+
+
+def test_distinct():
+    mode, _, statements, estimates = rewrite(columns=["merchant"], distinct=True)
+    assert mode == "distinct"
+    assert len(statements) == 2 and 1 in estimates
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"columns": ["state", "category"]},                                   # two dimensions
+        {"columns": ["state"], "filters": {"category": "home"}},              # two dimensions
+        {"columns": ["gender"]},                                              # nullable: NULLs are not rolled up
+        {"columns": ["city"]},                                                # not a rollup dimension
+        {"columns": ["state"], "filters": {"amt": {"gt": 10}}},               # not rolled up
+        {"columns": ["state"], "filters": {"is_fraud": "true"}},              # not a boolean
+        {"columns": ["state"], "filters": {"trans_date_trans_time": {"lte": "2020-01-01"}}},
+        {"columns": ["state"], "filters": {"trans_date_trans_time": {"gte": "2020-01-01T10:00:00"}}},
+        {"columns": ["state"], "filters": {"trans_date_trans_time": "2020-01-01"}},
+        {"columns": ["state"], "metrics": {"amt": "max"}},
+        {"columns": ["state"], "metrics": {"city_pop": "sum"}},
+        {"columns": ["state"], "order_by": [{"column": "zip"}]},
+        {"columns": ["state", "category"], "distinct": True},
+        {"time_series": {"date_column": "trans_date_trans_time", "granularity": "hour"}},
+        {"time_series": {"date_column": "dob", "granularity": "day"}},
+    ],
+)
+def test_ineligible(kwargs):
+    assert rewrite(**kwargs) is None
+
+
+def test_day_boundary():
+    assert _day_boundary("2020-01-01") == date(2020, 1, 1)
+    assert _day_boundary("2020-01-01T00:00:00") == date(2020, 1, 1)
+    assert _day_boundary(date(2020, 1, 1)) == date(2020, 1, 1)
+    assert _day_boundary("2020-01-01T00:00:01") is None
+    assert _day_boundary("2020-01-01T00:00:00+07:00") is None
+    assert _day_boundary("yesterday") is None
@@ -0,0 +1,93 @@
+from collections import Counter
+import numpy as np
+import pyarrow as pa
+import pytest
+from business.usecase.fraud_transactions.sketches import ColumnSketch, FrequentItems, HyperLogLog, hash_values
+
+
+def test_hash_values_are_stable_and_spread():
+    values = np.array(["a", "b", "gas_transport", "a"], dtype=object)
+    hashes = hash_values(values)
+    assert hashes[0] == hashes[3]
+    assert len(set(hashes[:3].tolist())) == 3
+    assert np.array_equal(hash_values(np.arange(5)), hash_values(np.arange(5)))
+    # Consecutive integers land all over the 64-bit range, so HLL's leading bits are uniform
+    top = hash_values(np.arange(100_000)) >> np.uint64(60)
+    assert np.bincount(top.astype(np.intp), minlength=16).min() > 5_000
+
+
+@pytest.mark.parametrize("n", [10, 1_000, 200_000])
+def test_hyperloglog_error_bound(n):
+    sketch = HyperLogLog(precision=12)
+    values = np.arange(n) * 7919
+    for chunk in np.array_split(values, 4):
+        sketch = sketch.add(hash_values(chunk))
+    # Three standard errors (1.04 / sqrt(2 ** precision))
+    assert abs(sketch.estimate() - n) <= 3 * 1.04 / np.sqrt(2 ** 12) * n + 1
+
+
+def test_hyperloglog_ignores_duplicates_and_strings():
+    values = np.array([f"merchant_{i % 5_000}" for i in range(50_000)], dtype=object)
+    estimate = HyperLogLog(precision=14).add(hash_values(values)).estimate()
+    assert abs(estimate - 5_000) <= 3 * 1.04 / np.sqrt(2 ** 14) * 5_000
+
+
+def test_hyperloglog_add_leaves_the_original_untouched():
+    empty = HyperLogLog(precision=10)
+    empty.add(hash_values(np.arange(100)))
+    assert empty.estimate() == 0
+
+
+def _stream(seed=0):
+    """Zipf-like stream: a few heavy values over a long tail."""
+    rng = np.random.default_rng(seed)
+    values = rng.zipf(1.3, size=50_000)
+    return values[values < 100_000]
+
+
+def test_misra_gries_top_k():
+    stream = _stream()
+    truth = Counter(stream.tolist())
+    items = FrequentItems(capacity=64)
+    for batch in np.array_split(stream, 10):
+        values, counts = np.unique(batch, return_counts=True)
+        items = items.add(values.tolist(), counts)
+
+    assert len(items.counts) <= 64
+    assert items.error <= len(stream) / (64 + 1)
+    for value, count in items.counts.items():
+        assert truth[value] - items.error <= count <= truth[value]
+    # Every value above the error bound keeps a counter
+    assert {value for value, count in truth.items() if count > items.error} <= set(items.counts)
+    assert [value for value, _ in items.top(3)] == [value for value, _ in truth.most_common(3)]
+
+
+def test_misra_gries_is_exact_under_capacity():
+    items = FrequentItems(capacity=8).add(["a", "b"], np.array([3, 1])).add(["b", "c"], np.array([2, 5]))
+    assert items.error == 0
+    assert items.top(2) == [("c", 5), ("a", 3)]
+    assert items.counts == {"a": 3, "b": 3, "c": 5}
+
+
+def test_column_sketch_skips_nulls():
+    column = pa.chunked_array([["a", None, "b"], ["a", None]])
+    sketch = ColumnSketch.empty(precision=10, capacity=16).add(column)
+    assert sketch.rows == 3
+    assert sketch.items.counts == {"a": 2, "b": 1}
+    assert sketch.hll.estimate() == 2
+    assert ColumnSketch.empty(10, 16).add(pa.chunked_array([[None]], type=pa.string())).rows == 0
+
+
+def test_string_hashes_do_not_depend_on_the_batch():
+    short = np.array(["abc", "gas_transport"], dtype=object)
+    mixed = np.array(["abc", "a much longer merchant name than any other", "gas_transport", ""], dtype=object)
+    assert np.array_equal(hash_values(short), hash_values(mixed)[[0, 2]])
+    assert len(set(hash_values(np.array(["", "a", "ab", "abc"], dtype=object)).tolist())) == 4
+
+
+def test_column_sketch_appends_across_batches():
+    merchants = [f"merchant_{i}" for i in range(1_000)]
+    sketch = ColumnSketch.empty(precision=14, capacity=16).add(pa.chunked_array([merchants]))
+    # The same values again, next to one longer name: only that one is new
+    sketch = sketch.add(pa.chunked_array([merchants + ["fraud_" + "x" * 60]]))
+    assert abs(sketch.hll.estimate() - 1_001) <= 3 * 1.04 / np.sqrt(2 ** 14) * 1_001
@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from agentic.tools.snapshot_engine import SnapshotEngine, results_match
+from business.usecase.fraud_transactions.snapshot import SNAPSHOT_SCHEMA, SnapshotData
+from config import get_settings
+
+
+CATEGORIES = ["gas_transport", "grocery_pos", "home", "shopping_net"]
+STATES = ["CA", "NY", "TX"]
+
+
+def make_table(rows: int = 2_000, seed: int = 0) -> pa.Table:
+    rng = np.random.default_rng(seed)
+    start = datetime(2020, 1, 1)
+    gender = rng.choice(["M", "F", None], size=rows, p=[0.45, 0.45, 0.1])
+    columns = {
+        "id": np.arange(1, rows + 1),
+        "trans_date_trans_time": [start + timedelta(minutes=int(m)) for m in rng.integers(0, 60 * 24 * 90, rows)],
+        "cc_num": rng.integers(10 ** 15, 10 ** 16, rows),
+        "merchant": [f"merchant_{i}" for i in rng.integers(0, 50, rows)],
+        "category": rng.choice(CATEGORIES, size=rows),
+        "amt": np.round(rng.gamma(2.0, 40.0, rows), 2),
+        "first_name": ["Jane"] * rows,
+        "last_name": ["Doe"] * rows,
+        "gender": gender.tolist(),
+        "street": ["1 Main St"] * rows,
+        "city": [f"city_{i}" for i in rng.integers(0, 20, rows)],
+        "state": rng.choice(STATES, size=rows),
+        "zip": rng.integers(10000, 99999, rows),
+        "lat": rng.uniform(25, 48, rows),
+        "long": rng.uniform(-124, -67, rows),
+        "city_pop": [None if i % 17 == 0 else int(i) for i in rng.integers(100, 10 ** 6, rows)],
+        "job": [None if i % 11 == 0 else f"job_{i % 30}" for i in range(rows)],
+        "dob": [datetime(1960 + i % 40, 1 + i % 12, 1).date() for i in range(rows)],
+        "unix_time": rng.integers(1_500_000_000, 1_600_000_000, rows),
+        "merch_lat": rng.uniform(25, 48, rows),
+        "merch_long": rng.uniform(-124, -67, rows),
+        "is_fraud": rng.random(rows) < 0.1,
+    }
+    return pa.Table.from_pydict(columns, schema=SNAPSHOT_SCHEMA)
+
+
+@pytest.fixture(scope="module")
+def table() -> pa.Table:
+    return make_table()
+
+
+@pytest.fixture(scope="module")
+def data(table) -> SnapshotData:
+    return SnapshotData.from_table(table, byte_order_text=True)
+
+
+@pytest.fixture(scope="module")
+def frame(table) -> pd.DataFrame:
+    return table.to_pandas()
+
+
+def summarize(data, columns=(), metrics=None, distinct=False, filters=None, limit=20, order_by=None, time_series=None):
+    return SnapshotEngine().summarize(
+        data, list(columns), metrics or {}, distinct, filters or {}, limit, order_by or [], time_series
+    )
+
+
+def test_grouped_summary(data, frame):
+    result = summarize(
+        data,
+        columns=["category"],
+        metrics={"amt": "sum", "is_fraud": "rate", "city_pop": "max"},
+        filters={"state": "ca", "amt": {"gte": 20}},
+    )
+    selected = frame[(frame.state == "CA") & (frame.amt >= 20)]
+    expected = selected.groupby("category").agg(
+        amt_sum=("amt", "sum"), is_fraud_rate=("is_fraud", "mean"), city_pop_max=("city_pop", "max")
+    )
+    assert result["count"] == len(expected)
+    for row in result["summary"]:
+        reference = expected.loc[row["category"]]
+        assert row["amt_sum"] == pytest.approx(reference.amt_sum)
+        assert row["is_fraud_rate"] == pytest.approx(reference.is_fraud_rate)
+        assert row["city_pop_max"] == reference.city_pop_max
+
+
+def test_null_groups_and_ordering(data, frame):
+    result = summarize(
+        data, columns=["gender"], metrics={"amt": "count"}, order_by=[{"column": "gender", "order": "desc"}]
+    )
+    counts = frame.gender.value_counts()
+    # DESC puts NULLS FIRST, like Postgres
+    assert [row["gender"] for row in result["summary"]] == [None, "M", "F"]
+    assert [row["amt_count"] for row in result["summary"]] == [frame.gender.isna().sum(), counts["M"], counts["F"]]
+
+
+def test_order_by_metric_and_limit(data, frame):
+    result = summarize(
+        data, columns=["merchant"], metrics={"amt": "avg"}, order_by=[{"column": "amt_avg", "order": "desc"}], limit=5
+    )
+    expected = frame.groupby("merchant").amt.mean().sort_values(ascending=False).head(5)
+    assert [row["merchant"] for row in result["summary"]] == list(expected.index)
+    assert [row["amt_avg"] for row in result["summary"]] == pytest.approx(list(expected))
+
+
+def test_filters(data, frame):
+    result = summarize(
+        data,
+        columns=["state"],
+        metrics={"amt": "count"},
+        filters={"merchant": "MERCHANT_1%", "is_fraud": False, "category": {"not": "home"}, "job": {"lt": "job_2"}},
+    )
+    selected = frame[
+        frame.merchant.str.startswith("merchant_1") & ~frame.is_fraud & (frame.category != "home") & (frame.job < "job_2")
+    ]
+    assert {row["state"]: row["amt_count"] for row in result["summary"]} == selected.state.value_counts().to_dict()
+
+
+def test_distinct(data, frame):
+    result = summarize(data, columns=["job"], distinct=True)
+    assert result["count"] == frame.job.nunique()  # COUNT(DISTINCT) leaves NULL out
+    assert None in result["distinct_values"]["job"]  # SELECT DISTINCT keeps it
+
+
+def test_time_series(data, frame):
+    result = summarize(
+        data,
+        metrics={"amt": "sum"},
+        filters={"is_fraud": True},
+        time_series={"date_column": "trans_date_trans_time", "granularity": "week", "group_by": ["state"]},
+    )
+    selected = frame[frame.is_fraud]
+    # DATE_TRUNC('week') starts weeks on Monday
+    periods = selected.trans_date_trans_time.dt.to_period("W-SUN").dt.start_time
+    expected = selected.groupby([periods, selected.state]).amt.agg(["size", "sum"])
+    rows = result["time_series"]
+    assert [(row["period"], row["state"]) for row in rows] == list(expected.index)
+    assert [row["fraud_count"] for row in rows] == list(expected["size"])
+    assert [row["amt_sum"] for row in rows] == pytest.approx(list(expected["sum"]))
+    assert all(row["period"].weekday() == 0 for row in rows)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"columns": ["category"], "metrics": {"merchant": "sum"}},                   # SUM(text)
+        {"columns": ["category"], "filters": {"amt": "cheap"}},                       # bad cast
+        {"columns": ["category"], "filters": {"state": 5}},                           # text = integer
+        {"columns": ["unknown"]},
+        {"time_series": {"date_column": "dob", "granularity": "day"}},                # DATE_TRUNC of a date
+    ],
+)
+def test_unsupported_requests_go_to_the_database(data, kwargs):
+    assert summarize(data, **kwargs) is None
+
+
+def test_text_order_needs_byte_order_collation(table):
+    data = SnapshotData.from_table(table, byte_order_text=False)
+    assert summarize(data, columns=["state"], order_by=[{"column": "state"}]) is None
+    assert summarize(data, columns=["state"], filters={"state": {"gt": "CA"}}) is None
+    assert summarize(data, columns=["state"], filters={"state": "CA"}) is not None
+
+
+def test_append_extends_dictionaries(table, frame):
+    head, tail = table.slice(0, 1_500), table.slice(1_500)
+    data = SnapshotData.from_table(head, byte_order_text=True).append(tail)
+    assert data.rows == table.num_rows and data.max_id == table.num_rows
+    result = summarize(data, columns=["category"], metrics={"amt": "count"})
+    assert {row["category"]: row["amt_count"] for row in result["summary"]} == frame.category.value_counts().to_dict()
+
+
+# -------------------------------------------
+# Agreement with the database path (needs DB_* settings for a database with fraud_transactions)
+# -------------------------------------------
+DATABASE_REQUESTS = [
+    {"columns": ["category"], "metrics": {"amt": "sum", "is_fraud": "rate"}},
+    {"columns": ["state", "gender"], "metrics": {"amt": "avg"}, "filters": {"is_fraud": True}},
+    {"columns": ["gender"], "metrics": {"city_pop": "max"}, "order_by": [{"column": "gender", "order": "desc"}]},
+    {"columns": ["merchant"], "metrics": {"amt": "sum"}, "order_by": [{"column": "amt_sum", "order": "desc"}], "limit": 5},
+    {"columns": ["category"], "filters": {"merchant": "%kutch%", "amt": {"gte": 10, "lt": 200}}},
+    {"columns": ["job"], "distinct": True},
+    {"time_series": {"date_column": "trans_date_trans_time", "granularity": "month"}, "metrics": {"amt": "sum"}},
+]
+
+
+@pytest.fixture(scope="module")
+def summary_tool():
+    if not get_settings().db_host:
+        pytest.skip("no database configured")
+    from agentic.tools.fraud_query import FraudSummaryTool
+    from business.usecase.fraud_transactions.snapshot import ColumnarSnapshot
+
+    tool = FraudSummaryTool()
+    tool.rollups = None
+    tool.snapshot = ColumnarSnapshot()
+    return tool
+
+
+@pytest.mark.parametrize("request_args", DATABASE_REQUESTS)
+def test_agrees_with_database(summary_tool, request_args):
+    args = summary_tool._summary_args(request_args)
+    args.pop("approximate")
+    local = SnapshotEngine().summarize(summary_tool.snapshot.data(summary_tool.db), **args)
+    assert local is not None
+    remote = summary_tool._run_database(**request_args)
+    assert results_match(local, remote, args["limit"], args["order_by"])
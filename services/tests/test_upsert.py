@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+import pytest
+from business.domain.supabase.schema import trans_num_unique_exists
+from business.usecase.fraud_transactions import crud
+from business.usecase.fraud_transactions.crud import (
+    STAGE_TABLE_QUERY,
+    FraudTransactionCRUD,
+    _conflict_clause,
+    _copy_buffer,
+    _prepare_upsert,
+    _staged_insert_query,
+)
+from contracts.errors import AppError
+
+
+def test_conflict_clause():
+    assert _conflict_clause(None) == ""
+    assert _conflict_clause("nothing") == " ON CONFLICT (trans_num) DO NOTHING"
+
+    update = _conflict_clause("update")
+    assert update.startswith(" ON CONFLICT (trans_num) DO UPDATE SET ")
+    assert "amt = EXCLUDED.amt" in update and "trans_num = EXCLUDED" not in update
+
+    with pytest.raises(AppError) as excinfo:
+        _conflict_clause("replace")
+    assert (excinfo.value.status_code, excinfo.value.code) == (400, "invalid_conflict_mode")
+
+
+def test_update_keeps_the_last_row_per_trans_num(make_transaction):
+    rows = [make_transaction("a", amt=1), make_transaction("b", amt=2), make_transaction("a", amt=3)]
+    assert _prepare_upsert(rows, "nothing") == rows
+    assert [(row.trans_num, row.amt) for row in _prepare_upsert(rows, "update")] == [("a", 3), ("b", 2)]
+
+
+def test_staged_insert_query():
+    assert "DISTINCT ON" not in _staged_insert_query("nothing")
+    assert _staged_insert_query("nothing").endswith("FROM fraud_transactions_stage ON CONFLICT (trans_num) DO NOTHING")
+    assert "SELECT DISTINCT ON (trans_num)" in _staged_insert_query("update")
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def copy_expert(self, sql, buffer):
+        self.statements.append(sql)
+
+
+@pytest.mark.parametrize("on_conflict", ["nothing", "update"])
+def test_bulk_upserts_copy_through_the_stage_table(monkeypatch, make_transaction, on_conflict):
+    cursor = FakeCursor()
+
+    @contextmanager
+    def get_cursor(**kwargs):
+        yield cursor
+
+    monkeypatch.setattr(crud, "_changed", lambda rows, **kwargs: rows)
+    db = SimpleNamespace(settings=SimpleNamespace(db_copy_threshold=1), get_cursor=get_cursor)
+    FraudTransactionCRUD(db).create([make_transaction("a")], on_conflict=on_conflict)
+
+    assert cursor.statements == [
+        STAGE_TABLE_QUERY,
+        crud._copy_query("fraud_transactions_stage", "text"),
+        _staged_insert_query(on_conflict),
+    ]
+
+
+def test_invalid_conflict_mode_is_refused_before_connecting(make_transaction):
+    with pytest.raises(AppError) as excinfo:
+        FraudTransactionCRUD(object()).create([make_transaction()], on_conflict="replace")
+    assert excinfo.value.code == "invalid_conflict_mode"
+
+
+@pytest.fixture
+def upsert_cursor(db, rollback_cursor):
+    if not trans_num_unique_exists(db):
+        pytest.skip("no unique index on trans_num")
+    return rollback_cursor
+
+
+def test_upserts_are_idempotent(db, upsert_cursor, make_transaction):
+    crud_ = FraudTransactionCRUD(db)
+    rows = [make_transaction(f"upsert-test-{i}", amt=float(i)) for i in range(3)]
+
+    def copy(rows, on_conflict):
+        crud_._copy(upsert_cursor, _copy_buffer(rows), "text", on_conflict)
+        inserted = upsert_cursor.rowcount
+        upsert_cursor.execute("DROP TABLE fraud_transactions_stage")  # what the commit would do
+        return inserted
+
+    def stored():
+        upsert_cursor.execute(
+            "SELECT trans_num, amt FROM fraud_transactions WHERE trans_num LIKE 'upsert-test-%%' ORDER BY trans_num"
+        )
+        return [(row["trans_num"], row["amt"]) for row in upsert_cursor.fetchall()]
+
+    assert copy(rows, "nothing") == 3
+    assert copy(rows + [make_transaction("upsert-test-3", amt=3.0)], "nothing") == 1
+    assert stored() == [(f"upsert-test-{i}", float(i)) for i in range(4)]
+
+    # Duplicates reach the stage table as they do from copy_csv: the last one wins
+    changed = [make_transaction("upsert-test-0", amt=10.0), make_transaction("upsert-test-0", amt=20.0)]
+    assert copy(changed, "update") == 1
+    assert stored()[0] == ("upsert-test-0", 20.0)